@@ -0,0 +1,150 @@
+"""Load test for the local batch API (``python -m sonotec serve``).
+
+Starts a server on a free port (or targets ``--url``), then keeps ``--concurrency`` keep-alive
+connections busy posting random airborne batches for ``--seconds`` and reports throughput and
+latency percentiles. A health probe runs alongside to show that the event loop stays responsive
+while large batches are computed in the worker pool.
+
+    python benchmarks/api_load_test.py [--rows 1000] [--concurrency 16] [--seconds 10] [--arrow]
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sonotec.api import ARROW_TYPE, encode_arrow  # noqa: E402
+
+
+def make_batch(rows, seed):
+    rng = np.random.default_rng(seed)
+    return {
+        'R_iw': rng.uniform(20, 60, rows), 'R_jw': rng.uniform(20, 60, rows),
+        'delta_R_ijw': rng.uniform(0, 10, rows), 'K_ij': rng.uniform(0, 25, rows),
+        'S_s': rng.uniform(5, 40, rows), 'l_0': np.ones(rows), 'l_f': rng.uniform(0.5, 5, rows),
+    }
+
+
+# --- Minimal HTTP/1.1 keep-alive client ---
+async def request(reader, writer, host, method, path, body=b'', content_type='application/json'):
+    writer.write(f'{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: {content_type}\r\n'
+                 f'Content-Length: {len(body)}\r\n\r\n'.encode('latin-1') + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while (line := await reader.readline()) not in (b'\r\n', b''):
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    payload = await reader.readexactly(length)
+    return status, payload
+
+
+async def client(host, port, path, body, content_type, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            status, _ = await request(reader, writer, host, 'POST', path, body, content_type)
+            latencies.append(time.perf_counter() - started)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def health_probe(host, port, deadline, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            await request(reader, writer, host, 'GET', '/v1/health')
+            latencies.append(time.perf_counter() - started)
+            await asyncio.sleep(0.05)
+    finally:
+        writer.close()
+
+
+async def load(host, port, args):
+    batch = make_batch(args.rows, seed=0)
+    if args.arrow:
+        body, content_type = encode_arrow(batch), ARROW_TYPE
+    else:
+        body, content_type = json.dumps({k: v.tolist() for k, v in batch.items()}).encode(), 'application/json'
+
+    latencies, errors, health = [], [], []
+    started = time.perf_counter()
+    deadline = started + args.seconds
+    await asyncio.gather(
+        health_probe(host, port, deadline, health),
+        *(client(host, port, '/v1/airborne', body, content_type, deadline, latencies, errors)
+          for _ in range(args.concurrency)),
+    )
+    elapsed = time.perf_counter() - started
+
+    p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+    print(f'{len(latencies):,} requests x {args.rows:,} rows ({len(body) / 1024:,.0f} kB {content_type}) '
+          f'in {elapsed:.1f} s with {args.concurrency} connections')
+    print(f'  {len(latencies) / elapsed:,.1f} req/s, {len(latencies) * args.rows / elapsed:,.0f} rows/s, '
+          f'{len(errors)} errors')
+    print(f'  latency p50 {p50:.1f} ms, p95 {p95:.1f} ms, p99 {p99:.1f} ms')
+    print(f'  health probe p95 {np.percentile(np.array(health) * 1000, 95):.1f} ms over {len(health)} probes')
+    return 1 if errors else 0
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_for_server(host, port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'Server on {host}:{port} did not start within {timeout} s')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='existing server, e.g. http://127.0.0.1:8502 (default: start one)')
+    parser.add_argument('--rows', type=int, default=1_000, help='paths per request')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--workers', type=int, help='worker processes of the started server')
+    parser.add_argument('--arrow', action='store_true', help='send Arrow IPC instead of JSON')
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.url:
+        host, _, port = args.url.split('//')[-1].rstrip('/').partition(':')
+        port = int(port or 80)
+    else:
+        host, port = '127.0.0.1', free_port()
+        command = [sys.executable, '-m', 'sonotec', 'serve', '--host', host, '--port', str(port)]
+        if args.workers:
+            command += ['--workers', str(args.workers)]
+        server = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL)
+    try:
+        wait_for_server(host, port)
+        return asyncio.run(load(host, port, args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
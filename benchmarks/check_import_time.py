@@ -0,0 +1,58 @@
+"""Cold-import budget for the headless core.
+
+Runs ``import sonotec`` in fresh interpreters and fails (exit code 1) when the package's own
+import time exceeds the budget or when it drags in Streamlit, pandas or image libraries.
+
+    python benchmarks/check_import_time.py [--budget-ms 25] [--runs 5]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FORBIDDEN_MODULES = ('streamlit', 'pandas', 'PIL', 'pyarrow', 'openpyxl')
+
+
+# --- One cold import: cumulative microseconds of the top-level 'sonotec' entry from -X importtime ---
+def measure_once():
+    # NumPy is imported first so the figure is the package's own cost, not NumPy's
+    code = ("import numpy, sys; import sonotec; "
+            f"print(','.join(m for m in {FORBIDDEN_MODULES!r} if m in sys.modules))")
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT,
+                          capture_output=True, text=True, check=True)
+    cumulative_us = None
+    for line in proc.stderr.splitlines():
+        parts = [p.strip() for p in line.removeprefix('import time:').split('|')]
+        if len(parts) == 3 and parts[2] == 'sonotec':
+            cumulative_us = int(parts[1])
+    return cumulative_us / 1000, [m for m in proc.stdout.strip().split(',') if m]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--budget-ms', type=float, default=25.0)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    timings, leaked = [], set()
+    for _ in range(args.runs):
+        ms, modules = measure_once()
+        timings.append(ms)
+        leaked.update(modules)
+
+    best = min(timings)
+    print(f'import sonotec: best {best:.1f} ms, worst {max(timings):.1f} ms over {args.runs} runs '
+          f'(budget {args.budget_ms:.1f} ms)')
+    if leaked:
+        print(f'FAIL: importing sonotec also imported {", ".join(sorted(leaked))}')
+        return 1
+    if best > args.budget_ms:
+        print('FAIL: import time budget exceeded')
+        return 1
+    print('OK')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,305 @@
+"""Benchmark suite for the calculation paths and the page rerun cost.
+
+Times the scalar row functions against the batched engine (1e2 to 1e7 rows), input validation, ``style_table``
+rendering, one-cell project edits, opening project files, the bearing assignment search, PDF reports, result
+cache hits and a full ``main.py`` run / rerun with Streamlit's AppTest harness, and writes the results as JSON. With ``--baseline`` every case is
+compared against a stored run and the script exits with code 1 when one is slower by more than
+``--threshold``.
+
+    python benchmarks/run_benchmarks.py                              # writes benchmarks/results/latest.json
+    python benchmarks/run_benchmarks.py --save-baseline              # ... and stores it as the baseline
+    python benchmarks/run_benchmarks.py --baseline benchmarks/results/baseline.json
+    python benchmarks/run_benchmarks.py --quick --only batched       # up to 1e5 rows, batched cases only
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sonotec.core import (  # noqa: E402
+    AIRBORNE_COLUMNS, IMPACT_COLUMNS, INPUT_BOUNDS,
+    calculate_airborne_r_total, calculate_impact_level, calculate_airborne_table, calculate_impact_table,
+)
+
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+BATCHED_ROWS = (10 ** 2, 10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7)
+SCALAR_MAX_ROWS = 10 ** 4      # the row-by-row loop takes minutes beyond this
+VALIDATION_MAX_ROWS = 10 ** 6
+STYLE_ROWS = (50, 1_000, 10_000)
+PROJECT_ROWS = (10 ** 4, 5 * 10 ** 4, 10 ** 6)
+ASSIGNMENT_JUNCTIONS = (200, 2_000)
+REPORT_PAIRS = 8
+CACHE_ROWS = (10 ** 5, 10 ** 6)
+
+
+# --- Random inputs inside the number_input ranges ---
+def make_inputs(columns, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return {c: rng.uniform(*INPUT_BOUNDS[c], rows) for c in columns}
+
+
+# --- Repeat a case until min_time has passed (at least min_repeats, at most max_repeats) ---
+def measure(func, min_time=0.5, min_repeats=3, max_repeats=50):
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < min_repeats or (time.perf_counter() - started < min_time and len(timings) < max_repeats):
+        t = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - t)
+    return {'best_s': min(timings), 'median_s': statistics.median(timings), 'repeats': len(timings)}
+
+
+# --- --only filter; the generators check it before building a case's data, so skipped cases cost nothing ---
+def selected(name, only):
+    return not only or any(o in name for o in only)
+
+
+def calculation_cases(max_rows, only=None):
+    from sonotec.validation import validate_paths
+
+    formulas = {
+        'airborne': (AIRBORNE_COLUMNS, calculate_airborne_r_total, calculate_airborne_table),
+        'impact': (IMPACT_COLUMNS, calculate_impact_level, calculate_impact_table),
+    }
+    for name, (columns, scalar, batched) in formulas.items():
+        for rows in (n for n in BATCHED_ROWS if n <= min(max_rows, SCALAR_MAX_ROWS)):
+            if not selected(f'scalar_{name}[{rows:.0e}]', only):
+                continue
+            inputs = make_inputs(columns, rows)
+            records = [dict(zip(columns, values)) for values in zip(*(inputs[c].tolist() for c in columns))]
+            yield f'scalar_{name}[{rows:.0e}]', rows, lambda records=records: [scalar(r) for r in records]
+        for rows in (n for n in BATCHED_ROWS if n <= max_rows):
+            if not selected(f'batched_{name}[{rows:.0e}]', only):
+                continue
+            inputs = make_inputs(columns, rows)
+            yield f'batched_{name}[{rows:.0e}]', rows, lambda inputs=inputs: batched(inputs)
+        for rows in (n for n in BATCHED_ROWS if n <= min(max_rows, VALIDATION_MAX_ROWS)):
+            if not selected(f'validate_{name}[{rows:.0e}]', only):
+                continue
+            inputs = make_inputs(columns, rows)
+            yield f'validate_{name}[{rows:.0e}]', rows, lambda inputs=inputs, name=name: validate_paths(name, inputs)
+
+
+def style_cases(max_rows, only=None):
+    import pandas as pd
+    from sonotec.styling import style_table
+
+    for rows in (n for n in STYLE_ROWS if n <= max_rows):
+        if not selected(f'style_table[{rows:.0e}]', only):
+            continue
+        table = pd.DataFrame(make_inputs(AIRBORNE_COLUMNS, rows))
+        table['R_ij_w'], _ = calculate_airborne_table(table)
+        yield f'style_table[{rows:.0e}]', rows, lambda table=table: style_table(table, 'R_ij_w').to_html()
+
+
+# --- Project with four paths per room pair: one-cell edit (incremental) and opening the saved file ---
+def project_cases(max_rows, only=None):
+    from sonotec.project import project_from_table, load_project
+
+    for rows in (n for n in PROJECT_ROWS if n <= max_rows):
+        edit, open_ = f'project_edit_cell[{rows:.0e}]', f'project_open[{rows:.0e}]'
+        if not selected(edit, only) and not selected(open_, only):
+            continue
+        table = make_inputs(AIRBORNE_COLUMNS, rows)
+        table['pair'] = np.repeat(np.arange(rows // 4 + 1), 4)[:rows].astype(str)
+        table['path'] = np.tile(['Dd', 'Ff', 'Fd', 'Df'], rows // 4 + 1)[:rows]
+        table['R_sw'], table['delta_R_Ddw'] = np.full(rows, 50.0), np.zeros(rows)
+        project = project_from_table(table)
+        if selected(edit, only):
+            values = iter(np.random.default_rng(1).uniform(*INPUT_BOUNDS['K_ij'], 10 ** 6))
+            yield edit, None, lambda project=project, values=values: project.edit(rows // 2, 'K_ij', next(values))
+        if selected(open_, only):
+            # Removed once the case has run
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'project.sonotec')
+                project.save(path)
+                yield open_, rows, lambda path=path: load_project(path)
+
+
+# --- Synthetic building: per room pair a Dd path and Ff/Fd/Df over four random junctions ---
+def make_building(n_junctions, seed=0):
+    rng = np.random.default_rng(seed)
+    n_pairs = n_junctions
+    junction_type = rng.choice(['T', 'X'], n_junctions)
+    material = rng.choice(['CLT', 'GLT/BSH', 'LVL'], n_junctions)
+    load = rng.uniform(5, 60, n_junctions)
+    edges = np.repeat(rng.integers(0, n_junctions, (n_pairs, 4)), 3, axis=1)
+    junction = np.concatenate([np.full((n_pairs, 1), -1), edges], axis=1).reshape(-1)
+    n, j = len(junction), np.maximum(junction, 0)
+    return {
+        'pair': np.repeat(np.arange(n_pairs), 13).astype(str), 'path': np.tile(['Dd'] + ['Ff', 'Fd', 'Df'] * 4, n_pairs),
+        'junction': np.where(junction >= 0, junction.astype(str), ''),
+        'junction_type': junction_type[j], 'material': material[j], 'load': load[j],
+        'R_iw': rng.uniform(36, 46, n), 'R_jw': rng.uniform(36, 46, n), 'delta_R_ijw': np.zeros(n),
+        'K_ij': rng.uniform(6, 12, n), 'S_s': rng.uniform(10, 20, n), 'l_0': np.ones(n), 'l_f': rng.uniform(2, 5, n),
+        'R_sw': rng.uniform(58, 66, n), 'delta_R_Ddw': np.zeros(n),
+    }
+
+
+# --- Bearing assignment for the synthetic building (problem set-up + all searches) ---
+def assignment_cases(only=None):
+    from sonotec.assignment import AssignmentProblem, optimize_assignment
+    from sonotec.catalog import load_catalog
+
+    for n_junctions in ASSIGNMENT_JUNCTIONS:
+        if not selected(f'assignment[{n_junctions:.0e}]', only):
+            continue
+        table = make_building(n_junctions)
+        yield f'assignment[{n_junctions:.0e}]', None, lambda table=table: optimize_assignment(
+            AssignmentProblem('airborne', table, load_catalog(), 50.0), kicks=100)
+
+
+# --- PDF reports, one per room pair, in one process (the asset cache is warm after the first repeat) ---
+def report_cases(only=None):
+    from sonotec.report import generate_reports
+
+    name = f'reports[{REPORT_PAIRS}]'
+    if not selected(name, only):
+        return
+    table = make_building(REPORT_PAIRS)
+    with tempfile.TemporaryDirectory() as output_dir, tempfile.TemporaryDirectory() as asset_dir:
+        yield name, None, lambda: generate_reports('airborne', table, output_dir, workers=1, asset_dir=asset_dir)
+
+
+# --- Separation totals: computed from the path table vs. read from the persistent result cache ---
+def cache_cases(max_rows, only=None):
+    from sonotec.cache import ResultCache, table_digest
+    from sonotec.core import DIRECT_COLUMNS, calculate_separation_table
+
+    sizes = [n for n in CACHE_ROWS if n <= max_rows]
+    names = {rows: (f'separation_compute[{rows:.0e}]', f'separation_cache_hit[{rows:.0e}]') for rows in sizes}
+    sizes = [rows for rows in sizes if any(selected(name, only) for name in names[rows])]
+    if not sizes:
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ResultCache(directory)
+        for rows in sizes:
+            compute, hit = names[rows]
+            table = make_inputs(AIRBORNE_COLUMNS, rows)
+            table['pair'] = np.repeat(np.arange(rows // 4 + 1), 4)[:rows].astype(str)
+            table['path'] = np.tile(['Dd', 'Ff', 'Fd', 'Df'], rows // 4 + 1)[:rows]
+            table['R_sw'], table['delta_R_Ddw'] = np.full(rows, 50.0), np.zeros(rows)
+            if selected(compute, only):
+                yield compute, rows, lambda table=table: calculate_separation_table(table)
+            if selected(hit, only):
+                key = cache.key('separation', table_digest(table, AIRBORNE_COLUMNS + DIRECT_COLUMNS, ('pair', 'path')))
+                cache.put(key, calculate_separation_table(table), 'separation')
+                yield hit, rows, lambda key=key: cache.get(key)
+
+
+# --- Full script run with AppTest: cold first run, then a rerun with warm caches ---
+def app_cases(only=None):
+    from streamlit.testing.v1 import AppTest
+
+    script = os.path.join(ROOT, 'main.py')
+
+    def cold():
+        at = AppTest.from_file(script, default_timeout=300)
+        at.run()
+        if at.exception:
+            raise RuntimeError(f'main.py raised: {at.exception[0].value}')
+
+    if selected('app_first_run', only):
+        yield 'app_first_run', None, cold
+    if selected('app_rerun', only):
+        warm_app = AppTest.from_file(script, default_timeout=300)
+        warm_app.run()
+        yield 'app_rerun', None, warm_app.run
+
+
+def run_cases(cases):
+    results = {}
+    for name, rows, func in cases:
+        result = measure(func)
+        if rows:
+            result['rows'] = rows
+            result['rows_per_s'] = rows / result['median_s']
+        results[name] = result
+        throughput = f"  {result['rows_per_s']:>14,.0f} rows/s" if rows else ''
+        print(f"{name:<28} {result['median_s'] * 1000:>12.3f} ms  (best {result['best_s'] * 1000:.3f} ms, "
+              f"{result['repeats']} runs){throughput}", flush=True)
+    return results
+
+
+def metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'commit': commit, 'python': platform.python_version(),
+            'numpy': np.__version__, 'machine': platform.machine(), 'processor': platform.processor() or None,
+            'cpu_count': os.cpu_count()}
+
+
+# --- Baseline comparison: best-time ratio per case present in both runs (less noisy than the median) ---
+def compare(results, baseline, threshold):
+    regressions = []
+    print(f"\n{'case':<28} {'baseline':>12} {'current':>12} {'ratio':>7}")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result['best_s'] / baseline[name]['best_s']
+        flag = ' REGRESSION' if ratio > 1 + threshold else ''
+        print(f"{name:<28} {baseline[name]['best_s'] * 1000:>10.3f}ms {result['best_s'] * 1000:>10.3f}ms "
+              f"{ratio:>7.2f}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', default=os.path.join(RESULTS_DIR, 'latest.json'))
+    parser.add_argument('--baseline', help='results JSON to compare against')
+    parser.add_argument('--save-baseline', action='store_true', help=f'also write {RESULTS_DIR}/baseline.json')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed slowdown before a case fails (0.25 = 25%%)')
+    parser.add_argument('--max-rows', type=float, default=max(BATCHED_ROWS))
+    parser.add_argument('--quick', action='store_true', help='cap sizes at 1e5 rows')
+    parser.add_argument('--only', nargs='*', help='run only cases whose name contains one of these')
+    parser.add_argument('--skip-app', action='store_true', help='skip the AppTest page runs')
+    args = parser.parse_args(argv)
+
+    max_rows = int(min(args.max_rows, 10 ** 5) if args.quick else args.max_rows)
+    results = run_cases(calculation_cases(max_rows, args.only))
+    results.update(run_cases(style_cases(max_rows, args.only)))
+    results.update(run_cases(project_cases(max_rows, args.only)))
+    results.update(run_cases(assignment_cases(args.only)))
+    results.update(run_cases(report_cases(args.only)))
+    results.update(run_cases(cache_cases(max_rows, args.only)))
+    app_selected = any(selected(name, args.only) for name in ('app_first_run', 'app_rerun'))
+    if not args.skip_app and app_selected:
+        results.update(run_cases(app_cases(args.only)))
+
+    report = {'meta': metadata(), 'results': results}
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'\nResults written to {args.output}')
+    if args.save_baseline:
+        with open(os.path.join(RESULTS_DIR, 'baseline.json'), 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nFAIL: {len(regressions)} case(s) slower than baseline by more than {args.threshold:.0%}")
+            return 1
+        print('\nOK')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
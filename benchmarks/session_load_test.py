@@ -0,0 +1,187 @@
+"""Concurrent-session load harness for ``main.py``.
+
+Starts ``streamlit run main.py`` (or targets ``--url``) and opens N browser-like sessions on its
+websocket, speaking Streamlit's own protobuf messages the way the frontend does: a full page run,
+then rounds of interactions (single-path calculators, the shared 100k-row results table and its
+paging) sent as fragment reruns, plus a full page rerun per round. Every interaction is timed
+until the server reports the script run as finished. Reports the server's resident memory
+before and with all sessions open (total and per session) and latency percentiles.
+
+Uses only packages Streamlit itself depends on (websockets, protobuf).
+
+    python benchmarks/session_load_test.py [--sessions 50] [--rounds 5] [--think-ms 100]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import numpy as np
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.NumberInput_pb2 import NumberInput
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def rss_mb(pid):
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return float('nan')
+
+
+# --- One browser tab: widget ids and fragment ids are learned from the deltas of each run ---
+class Session:
+    def __init__(self, ws):
+        self.ws = ws
+        self.page_hash = ''
+        self.widgets = {}   # user key -> (widget id, element, fragment id)
+        self.values = {}    # widget id -> WidgetState kept across reruns, as the browser does
+
+    async def rerun(self, key=None, value=None, trigger=False, fragment=True):
+        msg = BackMsg()
+        state = msg.rerun_script
+        state.page_script_hash = self.page_hash
+        if key is not None:
+            widget_id, element, fragment_id = self.widgets[key]
+            if fragment:
+                state.fragment_id = fragment_id
+            if trigger:
+                state.widget_states.widgets.add(id=widget_id, trigger_value=True)
+            elif element.number_input.data_type == NumberInput.INT:
+                self.values[widget_id] = {'id': widget_id, 'int_value': int(value)}
+            else:
+                self.values[widget_id] = {'id': widget_id, 'double_value': float(value)}
+        for widget in self.values.values():
+            state.widget_states.widgets.add(**widget)
+
+        started = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(await self.ws.recv())
+            kind = forward.WhichOneof('type')
+            if kind == 'new_session':
+                self.page_hash = forward.new_session.page_script_hash
+            elif kind == 'delta' and forward.delta.WhichOneof('type') == 'new_element':
+                element = forward.delta.new_element
+                widget = getattr(element, element.WhichOneof('type'))
+                widget_id = getattr(widget, 'id', '')
+                if widget_id.startswith('$$ID-'):
+                    self.widgets[widget_id.split('-', 2)[2]] = (widget_id, element, forward.delta.fragment_id)
+            elif kind == 'script_finished':
+                return time.perf_counter() - started
+
+
+async def run_session(url, index, rounds, think_s, latencies, ready, release):
+    rng = np.random.default_rng(index + 1)
+    async with websockets.connect(f'{url}/_stcore/stream', subprotocols=['streamlit'], max_size=None) as ws:
+        session = Session(ws)
+        latencies.append(('first_run', await session.rerun()))
+        for _ in range(rounds):
+            steps = [
+                ('airborne', [('R_iw_air', rng.uniform(20, 60), False), ('btn_air', None, True)]),
+                ('impact', [('L_neq0w_imp', rng.uniform(40, 90), False), ('btn_imp', None, True)]),
+                ('results_table', [('btn_table_demo', None, True)]),
+                ('results_page', [('table_demo_page', rng.integers(1, 2000), False)]),
+            ]
+            for name, actions in steps:
+                for key, value, trigger in actions:
+                    latencies.append((name, await session.rerun(key, value, trigger)))
+                    await asyncio.sleep(think_s)
+            latencies.append(('page_rerun', await session.rerun()))
+        # Keep the tab open until every session has been measured
+        ready.append(index)
+        await release.wait()
+
+
+async def load(url, args, server_pid):
+    # One session first so imports and the shared caches are warm before the idle reading
+    warmup = asyncio.Event()
+    warmup.set()
+    await run_session(url, -1, 1, 0, [], [], warmup)
+    baseline = rss_mb(server_pid) if server_pid else float('nan')
+
+    latencies, ready = [], []
+    release = asyncio.Event()
+    started = time.perf_counter()
+    tasks = [asyncio.create_task(run_session(url, i, args.rounds, args.think_ms / 1000, latencies, ready, release))
+             for i in range(args.sessions)]
+    # Measure memory once every session has finished its rounds (or failed) while the others stay open
+    while len(ready) + sum(t.done() for t in tasks) < args.sessions:
+        await asyncio.sleep(0.1)
+    elapsed = time.perf_counter() - started
+    loaded = rss_mb(server_pid) if server_pid else float('nan')
+    release.set()
+    errors = [r for r in await asyncio.gather(*tasks, return_exceptions=True) if isinstance(r, Exception)]
+    return latencies, errors, elapsed, baseline, loaded
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_for_server(host, port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'App on {host}:{port} did not start within {timeout} s')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='running app, e.g. http://127.0.0.1:8501 (default: start one; RSS needs --pid)')
+    parser.add_argument('--pid', type=int, help='server process id for RSS when using --url')
+    parser.add_argument('--sessions', type=int, default=50)
+    parser.add_argument('--rounds', type=int, default=5, help='interaction rounds per session')
+    parser.add_argument('--think-ms', type=float, default=100.0, help='pause between interactions')
+    args = parser.parse_args(argv)
+
+    server, server_pid = None, args.pid
+    if args.url:
+        host, _, port = args.url.split('//')[-1].rstrip('/').partition(':')
+        port = int(port or 80)
+    else:
+        host, port = '127.0.0.1', free_port()
+        server = subprocess.Popen([sys.executable, '-m', 'streamlit', 'run', 'main.py', '--server.headless', 'true',
+                                   '--server.port', str(port), '--server.fileWatcherType', 'none'],
+                                  cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        server_pid = server.pid
+    try:
+        wait_for_server(host, port)
+        latencies, errors, elapsed, baseline, loaded = asyncio.run(load(f'ws://{host}:{port}', args, server_pid))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print(f'{args.sessions} sessions x {args.rounds} rounds in {elapsed:.1f} s')
+    print(f'Server RSS: {baseline:,.0f} MB warm and idle, {loaded:,.0f} MB with all sessions open, '
+          f'{(loaded - baseline) / args.sessions:,.2f} MB per session')
+    print(f"\n{'interaction':<16} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    names = list(dict.fromkeys(name for name, _ in latencies))
+    for name in [*names, 'all interactions']:
+        values = np.array([s for n, s in latencies
+                           if n == name or (name == 'all interactions' and n != 'first_run')]) * 1000
+        p50, p95 = np.percentile(values, [50, 95])
+        print(f'{name:<16} {len(values):>6} {p50:>9.1f} {p95:>9.1f} {values.max():>9.1f}')
+    if errors:
+        print(f'\n{len(errors)} session(s) failed, first error: {errors[0]!r}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
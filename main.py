@@ -3,65 +3,26 @@ import base64
 
 import pandas as pd
 import numpy as np # Needed for log calculations
-import math
+import time
 
 import streamlit.components.v1 as components
 
+from sonotec.profiling import PROFILING_ENABLED
+from sections.common import (
+    cached_call, cached_image, cached_airborne_r_total, cached_impact_level, profile_section, timings, timed_fragment,
+)
+from sections import (
+    bulk_upload, ifc_import, separation, building_impact, projects, path_grid, sweep, catalog, solver, assignment,
+    reports, uncertainty, bands, jobs, table_performance, sidebar,
+)
+
 # --- PAGE CONFIGURATION ---
 # This command must be the first Streamlit command in your script.
 st.set_page_config(layout="wide")
 st.set_page_config(page_title="E.u.r.o.Tec GmbH", page_icon="🔩", layout="wide")
 
-
-
-# --- HELPER FUNCTIONS ---
-
-# --- Calculation function for AIRBORNE sound ---
-def calculate_airborne_r_total(row):
-    R_iw = row['R_iw']
-    R_jw = row['R_jw']
-    delta_R_ijw = row['delta_R_ijw']
-    K_ij = row['K_ij']
-    S_s = row['S_s']
-    l_0 = row['l_0']
-    l_f = row['l_f']
-
-    if l_0 == 0 or l_f == 0 or S_s <= 0: return np.nan
-    log_arg = S_s / (l_0 * l_f)
-    if log_arg <= 0: return np.nan
-
-    log_term = 10 * np.log10(log_arg)
-    R_Total = ((R_iw + R_jw) / 2) + delta_R_ijw + K_ij + log_term
-    return R_Total
-
-# --- Calculation function for IMPACT sound ---
-def calculate_impact_level(row):
-    L_neq0w = row['L_neq0w']
-    delta_Lw = row['delta_Lw']
-    R_iw = row['R_iw']
-    R_jw = row['R_jw']
-    delta_R_jw = row['delta_R_jw']
-    K_ij = row['K_ij']
-    S_i = row['S_i']
-    l_0 = row['l_0']
-    l_ij = row['l_ij']
-
-    if l_0 == 0 or l_ij == 0 or S_i <= 0: return np.nan
-    log_arg = S_i / (l_0 * l_ij)
-    if log_arg <= 0: return np.nan
-
-    log_term = 10 * np.log10(log_arg)
-    L_nijw = L_neq0w - delta_Lw + ((R_iw - R_jw) / 2) - delta_R_jw - K_ij - log_term
-    return L_nijw
-
-# --- Styling function (reusable for any table) ---
-def style_table(df, final_col_name):
-    def highlight_final_column(s):
-        is_final_col = s.name == final_col_name
-        return ['background-color: #008080; color: white' if is_final_col else 'background-color: #F5F5DC' for _ in s]
-    
-    return df.style.apply(highlight_final_column, axis=1).format("{:.8f}", na_rep="Invalid")
-
+# Start of this full-page run, used to compare full reruns with calculator-only (fragment) reruns
+page_started = time.perf_counter()
 
 
 # --- App Layout ---
@@ -71,11 +32,11 @@ features = st.container()
 model_training = st.container()
 impact_sound_calc = st.container()
 
-with header:
+with header, profile_section("section:header"):
 
     LOGO_IMAGE = "eurotec-logo-2.png"
     # --- Add your logo to the header ---
-    st.image(LOGO_IMAGE, width=200) # Adjust width as needed
+    st.image(cached_image(LOGO_IMAGE), width=200) # Adjust width as needed
 
     st.title('Sonotec V2 Sound Proofing')
     #st.text('This is my first text!')
@@ -88,7 +49,7 @@ with header:
     #     # This is the right column, where we'll put the image
     #     st.image('sonotec_image.jpg', width=300) # Adjust width as needed
 
-with dataset:
+with dataset, profile_section("section:introduction"):
     st.header('Introduction')
     st.markdown(
     """
@@ -109,13 +70,13 @@ with dataset:
 
 
 col1, col2, col3 = st.columns([1, 4, 1])
-with col2:
-    st.image("sonotec_image.jpg",
+with col2, profile_section("section:figure_1"):
+    st.image(cached_image("sonotec_image.jpg"),
              caption="Figure 1: Sound proofing layer applications",
              use_container_width=True)
 
 
-with features:
+with features, profile_section("section:features"):
     col1, col2 = st.columns([3, 1])
     with col1:
         # This is the left column, where we'll put the text
@@ -123,7 +84,7 @@ with features:
 
     with col2:
         # This is the right column, where we'll put the image
-        st.image('airborne_noise.png', width=100) # Adjust width as needed
+        st.image(cached_image('airborne_noise.png'), width=100) # Adjust width as needed
 
 
     #st.header('Airborne noise')
@@ -178,7 +139,7 @@ with features:
 
     with col2:
         # This is the right column, where we'll put the image
-        st.image('impact_sound.png', width=100) # Adjust width as needed
+        st.image(cached_image('impact_sound.png'), width=100) # Adjust width as needed
 
 
     st.text("Impact noise (also called structure-borne noise) is sound that is generated when two objects collide, transmitting the vibration directly through a building's structure. The sound doesn't start in the air; it starts as a vibration in the material itself.")
@@ -241,15 +202,15 @@ with features:
 
 #####INSERT FIGURE#####
 col1, col2, col3 = st.columns([1, 4, 1])
-with col2:
-    st.image("sound.png",
+with col2, profile_section("section:figure_2"):
+    st.image(cached_image("sound.png"),
              caption="Figure 2: Sound transmission pathways between two rooms",
              use_container_width=True)
 
 
 st.divider()
 
-with model_training:
+with model_training, profile_section("section:model_training"):
     st.header('How to compute airborne and impact noise')
     st.subheader('Airborne noise')
 
@@ -383,8 +344,8 @@ with model_training:
 # 🧮 AIRBORNE SOUND REDUCTION INDEX CALCULATOR
 # ==============================================================
 
-with st.expander("🎵 🔊 Airborne Sound Reduction Index Calculator", expanded=False):
-
+@timed_fragment("airborne_calculator")
+def airborne_calculator():
     # --- Inputs with descriptions ---
     R_iw = st.number_input(
         r"Weighted sound reduction index of flanking element i (source), $\mathrm{R_{i,w}}$ [dB]:",
@@ -430,11 +391,11 @@ with st.expander("🎵 🔊 Airborne Sound Reduction Index Calculator", expanded
 
     # --- Calculation button ---
     if st.button("Calculate $\\mathrm{R_{ij,w}}$", key="btn_air"):
-        try:
-            R_ij_w = ((R_iw + R_jw) / 2.0) + delta_R_ijw + K_ij + 10.0 * math.log10(S_s / (l_0 * l_f))
+        R_ij_w = cached_call('airborne', cached_airborne_r_total, (R_iw, R_jw, delta_R_ijw, K_ij, S_s, l_0, l_f))
+        if np.isnan(R_ij_w):
+            st.error("Error in calculation: the coupling lengths and the area must be positive.")
+        else:
             st.session_state["R_ij_result"] = R_ij_w
-        except Exception as e:
-            st.error(f"Error in calculation: {e}")
 
     # --- Display results ---
     if "R_ij_result" in st.session_state:
@@ -452,6 +413,9 @@ with st.expander("🎵 🔊 Airborne Sound Reduction Index Calculator", expanded
         st.success(f"Result: $R_{{ij,w}}$ = {R_ij_w:.2f} dB")
         st.markdown(rf"***Please note that the calculator performs calculations only for one transmission path. For other transmission paths, the calculations should be repeated with relevant input values..!")
 
+with st.expander("🎵 🔊 Airborne Sound Reduction Index Calculator", expanded=False):
+    airborne_calculator()
+
 
 ###################################################################  
 
@@ -570,8 +534,8 @@ st.markdown("""
 # 🎧 IMPACT SOUND PRESSURE LEVEL CALCULATOR
 # ==============================================================
 
-with st.expander("🔨 Impact Sound Pressure Level Calculator", expanded=False):
-
+@timed_fragment("impact_calculator")
+def impact_calculator():
     # --- Inputs with descriptions ---
     L_neq0w = st.number_input(
         r"Equivalent weighted normalized impact sound pressure level of the bare floor, $\mathrm{L_{n,eq,0,w}}$ [dB]:",
@@ -629,17 +593,11 @@ with st.expander("🔨 Impact Sound Pressure Level Calculator", expanded=False):
 
     # --- Calculation button ---
     if st.button("Calculate $\\mathrm{L_{n,ij,w}}$", key="btn_imp"):
-        try:
-            L_nijw = (
-                L_neq0w - delta_Lw
-                + ((R_iw2 - R_jw2) / 2.0)
-                - delta_R_jw
-                - K_ij2
-                - 10.0 * math.log10(S_i / (l_0_2 * l_ij))
-            )
+        L_nijw = cached_call('impact', cached_impact_level, (L_neq0w, delta_Lw, R_iw2, R_jw2, delta_R_jw, K_ij2, S_i, l_0_2, l_ij))
+        if np.isnan(L_nijw):
+            st.error("Error in calculation: the coupling lengths and the area must be positive.")
+        else:
             st.session_state["L_nij_result"] = L_nijw
-        except Exception as e:
-            st.error(f"Error in calculation: {e}")
 
     # --- Display results ---
     if "L_nij_result" in st.session_state:
@@ -656,6 +614,18 @@ with st.expander("🔨 Impact Sound Pressure Level Calculator", expanded=False):
         st.latex(rf"\Rightarrow L_{{n,ij,w}} = {L_nijw:.2f}\ \mathrm{{dB}}")
         st.success(f"Result: $L_{{n,ij,w}}$ = {L_nijw:.2f} dB")
 
+with st.expander("🔨 Impact Sound Pressure Level Calculator", expanded=False):
+    impact_calculator()
+
+
+# ==============================================================
+# 📂 BUILDING-WIDE CALCULATIONS AND TOOLS (one module per section in sections/)
+# ==============================================================
+
+for section in (bulk_upload, ifc_import, separation, building_impact, projects, path_grid, sweep, catalog, solver,
+                assignment, reports, uncertainty, bands, jobs, table_performance, sidebar):
+    section.render()
+
 # st.markdown("---")  # horizontal line
 # st.markdown(
 #     """
@@ -668,20 +638,24 @@ with st.expander("🔨 Impact Sound Pressure Level Calculator", expanded=False):
 #     unsafe_allow_html=True
 # )
 
-st.markdown(
-    """
-    <div style='background-color:#f0f2f6; padding: 15px; border-radius: 10px; text-align: center;'>
-        <b>Developed by Global Technical Advisory team at E.u.r.o.Tec</b><br>
-        For any queries, please contact: 
-        <a href='mailto:technik@eurotec.team'>technik@eurotec.team</a>
-    </div>
-    """,
-    unsafe_allow_html=True
-)
-
-st.caption(
-    "For more information, please visit [www.eurotec.team](https://www.eurotec.team) 🌐"
-)
+with profile_section("section:footer"):
+    st.markdown(
+        """
+        <div style='background-color:#f0f2f6; padding: 15px; border-radius: 10px; text-align: center;'>
+            <b>Developed by Global Technical Advisory team at E.u.r.o.Tec</b><br>
+            For any queries, please contact: 
+            <a href='mailto:technik@eurotec.team'>technik@eurotec.team</a>
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
 
+    st.caption(
+        "For more information, please visit [www.eurotec.team](https://www.eurotec.team) 🌐"
+    )
 
 
+# --- End of the full-page run (calculator-only fragment reruns never reach this line) ---
+st.session_state["page_run_ms"] = (time.perf_counter() - page_started) * 1000
+if PROFILING_ENABLED:
+    timings().record("page", st.session_state["page_run_ms"] / 1000)
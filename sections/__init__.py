@@ -0,0 +1,5 @@
+"""Sections of the Streamlit page (``main.py``) after the single-path calculators.
+
+Each module draws one expander with ``render()``; its calculator is a fragment made with
+``sections.common.timed_fragment``, so it reruns on its own and shows its server time.
+"""
@@ -0,0 +1,76 @@
+"""Bearing assignment: cheapest variant per junction, building-wide."""
+import pandas as pd
+import streamlit as st
+
+from sonotec.batch import read_path_chunks
+from sonotec.assignment import ASSIGNMENT_COLUMNS, OBJECTIVES, AssignmentProblem, optimize_assignment, assignment_tables
+
+from sections.common import catalog_warning, results_table, shared_catalog, submit_job, timed_call, timed_fragment
+
+
+# --- Session result of an assignment (run here or as a background job) ---
+def assignment_session_result(result):
+    return {**result, "junctions": pd.DataFrame(result["junctions"]), "groups": pd.DataFrame(result["groups"])}
+
+def assign_bearings(table, formula, target, objective, kicks):
+    problem = AssignmentProblem(formula, table, shared_catalog(), target, objective)
+    assignment, info = optimize_assignment(problem, kicks=kicks)
+    junctions, groups, summary = assignment_tables(problem, assignment)
+    return assignment_session_result({"formula": formula, "junctions": junctions, "groups": groups,
+                                      "summary": summary, "info": info})
+
+@timed_fragment("assignment_calculator")
+def assignment_calculator():
+    st.markdown(
+        "Assigns one SonoTec V2 variant (or none) to every junction of the building so that every room pair / "
+        "receiving room still meets its target, at the lowest material cost or with the fewest bearings. "
+        f"Upload the building file with a `junction` id, `{'`, `'.join(ASSIGNMENT_COLUMNS[1:])}` on the flanking paths; "
+        "all paths through one junction get the same variant. \"none\" keeps the $\\mathrm{K_{ij}}$ / "
+        "$\\mathrm{\\Delta R}$ of the file. An optional `target` column overrides the target per pair/room."
+    )
+    col1, col2, col3 = st.columns(3)
+    formula = col1.radio("Formula", ["airborne", "impact"], horizontal=True, key="assign_formula",
+                         format_func={"airborne": "Airborne (R'_w per pair)", "impact": "Impact (L'n,w per room)"}.get)
+    objective = col2.radio("Minimize", list(OBJECTIVES), horizontal=True, key="assign_objective",
+                           format_func={"cost": "Material cost", "count": "Number of bearings"}.get)
+    kicks = col3.number_input("Search effort (perturbations per process)", 0, 10_000, 100, step=50, key="assign_kicks")
+    target_label = "Target R'_w (minimum) [dB]" if formula == "airborne" else "Target L'n,w (maximum) [dB]"
+    target = st.number_input(target_label, 0.0, 120.0, 53.0 if formula == "airborne" else 50.0, step=0.5, key=f"assign_target_{formula}")
+    assign_file = st.file_uploader("Building path file", type=["csv", "xlsx", "parquet"], key="assign_file")
+
+    col1, col2 = st.columns(2)
+    if col1.button("Assign bearings", key="btn_assign", disabled=assign_file is None):
+        try:
+            table = pd.concat(read_path_chunks(assign_file, assign_file.name), ignore_index=True)
+            targets = pd.to_numeric(table["target"], errors="coerce").fillna(target).to_numpy() if "target" in table else target
+            st.session_state["assign_result"] = timed_call("assignment", assign_bearings, table, formula, targets, objective, kicks)
+        except Exception as e:
+            st.error(f"Error in calculation: {e}")
+    if col2.button("Run in background", key="btn_assign_job", disabled=assign_file is None):
+        submit_job("assignment", {"formula": formula, "target": target, "objective": objective, "kicks": int(kicks)},
+                   f"{formula}, {assign_file.name}", assign_file)
+
+    # --- Display results ---
+    if "assign_result" in st.session_state:
+        result = st.session_state["assign_result"]
+        summary, info = result["summary"], result["info"]
+        catalog_warning(summary.get("catalog_version", ""))
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Material cost", f"{summary['cost']:,.0f}")
+        col2.metric("Junctions with a bearing", f"{summary['bearings']:,} / {summary['junctions']:,}")
+        col3.metric("Cannot reach the target", f"{summary['unreachable']:,} / {summary['groups']:,}")
+        col4.metric("Solve time", f"{info['seconds']:.2f} s")
+        st.caption(f"{info['restarts']} independent searches on {info['workers']} process(es); "
+                   f"plain greedy result {info['greedy_cost']:,.0f}. Pairs/rooms that no variant combination brings "
+                   "to the target are listed as not reachable and do not constrain the others.")
+        results_table(result["junctions"], "cost", key="assign_junctions")
+        results_table(result["groups"], "assigned", key="assign_groups")
+        st.download_button(
+            "Download junction assignment", result["junctions"].to_csv(index=False), file_name="bearing_assignment.csv",
+            mime="text/csv", key="btn_assign_download"
+        )
+
+
+def render():
+    with st.expander("🧩 Bearing Assignment (cheapest variant per junction, whole building)", expanded=False):
+        assignment_calculator()
@@ -0,0 +1,100 @@
+"""Frequency-band calculation (1/3-octave) and ISO 717 rating."""
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+import altair as alt
+
+from sonotec.batch import read_path_chunks
+from sonotec.bands import (
+    BANDS_STANDARD, BANDS_EXTENDED, BANDED_INPUTS, REFERENCE_AIRBORNE, REFERENCE_IMPACT, calculate_band_paths,
+    combine_band_paths, rate_airborne, rate_impact, shifted_reference,
+)
+
+from sections.common import timed_call, timed_fragment
+
+
+# --- Spectrum and shifted reference curve of one rated result ---
+def band_chart(formula, bands, spectrum, rating):
+    standard = list(BANDS_STANDARD)
+    curve = pd.DataFrame({"frequency [Hz]": [str(f) for f in bands], "value [dB]": spectrum, "curve": "calculated"})
+    reference = pd.DataFrame({"frequency [Hz]": [str(f) for f in standard],
+                              "value [dB]": shifted_reference(formula, rating), "curve": "shifted ISO 717 reference"})
+    data = pd.concat([curve, reference], ignore_index=True)
+    return alt.Chart(data).mark_line(point=True).encode(
+        x=alt.X("frequency [Hz]:N", sort=[str(f) for f in bands]),
+        y=alt.Y("value [dB]:Q", scale=alt.Scale(zero=False)),
+        color="curve:N",
+    )
+
+@timed_fragment("band_calculator")
+def band_calculator():
+    st.markdown(
+        "Evaluates the EN ISO 12354 path equations per 1/3-octave band and rates the combined spectrum per "
+        "room pair or receiving room according to ISO 717-1 ($\\mathrm{R'_{w}}$, C, $\\mathrm{C_{tr}}$) or "
+        "ISO 717-2 ($\\mathrm{L'_{n,w}}$, $\\mathrm{C_I}$)."
+    )
+    col1, col2 = st.columns(2)
+    formula = col1.radio("Formula", ["airborne", "impact"], horizontal=True, key="band_formula",
+                         format_func={"airborne": "Airborne (ISO 717-1)", "impact": "Impact (ISO 717-2)"}.get)
+    band_range = col2.radio("Bands", ["standard", "extended"], horizontal=True, key="band_range",
+                            format_func={"standard": "100–3150 Hz", "extended": "50–5000 Hz"}.get)
+    bands = BANDS_STANDARD if band_range == "standard" else BANDS_EXTENDED
+    rate = rate_airborne if formula == "airborne" else rate_impact
+    rating_name = "R_w" if formula == "airborne" else "L_nw"
+
+    # --- Rate a single spectrum typed in by hand ---
+    st.markdown("**Rate a spectrum**")
+    reference = REFERENCE_AIRBORNE if formula == "airborne" else REFERENCE_IMPACT
+    default = np.interp(np.log(bands), np.log(BANDS_STANDARD), reference)
+    spectrum = st.data_editor(
+        pd.DataFrame({"frequency [Hz]": bands, "value [dB]": default}),
+        hide_index=True, disabled=["frequency [Hz]"], key=f"band_spectrum_{formula}_{band_range}",
+    )["value [dB]"].to_numpy(dtype=float)
+    single = rate(spectrum, bands)
+    cols = st.columns(len(single))
+    for col, (name, value) in zip(cols, single.items()):
+        col.metric(name.replace("_", " "), "–" if np.isnan(value) else f"{value:.0f} dB")
+    if np.isfinite(single[rating_name]):
+        st.altair_chart(band_chart(formula, bands, spectrum, single[rating_name]), use_container_width=True)
+
+    # --- Whole building from a banded path file ---
+    st.markdown(
+        "**Building file.** Same layout as the room pair / receiving room files; the inputs "
+        f"`{', '.join(BANDED_INPUTS[formula])}` may be given per band as `<input>_<Hz>` columns "
+        "(e.g. `K_ij_500`), otherwise the single column applies to all bands."
+    )
+    band_file = st.file_uploader("Banded building path file", type=["csv", "xlsx", "parquet"], key="band_file")
+
+    if st.button("Calculate and rate all spectra", key="btn_band", disabled=band_file is None):
+        try:
+            band_started = time.perf_counter()
+            table = pd.concat(read_path_chunks(band_file, band_file.name), ignore_index=True)
+            key = "pair" if formula == "airborne" else "room"
+            values, _ = timed_call("bands", calculate_band_paths, formula, table, bands)
+            groups, spectra = combine_band_paths(formula, table[key].astype(str).to_numpy(), values)
+            ratings = rate(spectra, bands)
+            result = pd.DataFrame({key: groups, **ratings})
+            # Spectra are kept for the chart only: float32 halves the per-session footprint
+            st.session_state["band_result"] = {"formula": formula, "bands": bands, "table": result, "spectra": spectra.astype(np.float32),
+                                               "seconds": time.perf_counter() - band_started}
+        except Exception as e:
+            st.error(f"Error in calculation: {e}")
+
+    # --- Display results ---
+    if "band_result" in st.session_state:
+        band = st.session_state["band_result"]
+        st.dataframe(band["table"], hide_index=True, use_container_width=True)
+        st.caption(f"{len(band['table']):,} spectra calculated and rated in {band['seconds'] * 1000:.0f} ms.")
+        key = band["table"].columns[0]
+        selected = st.selectbox("Show spectrum of", band["table"][key], key="band_selected")
+        index = int(np.flatnonzero(band["table"][key].to_numpy() == selected)[0])
+        rating = band["table"].iloc[index, 1]
+        if np.isfinite(rating):
+            st.altair_chart(band_chart(band["formula"], band["bands"], band["spectra"][index], rating), use_container_width=True)
+
+
+def render():
+    with st.expander("🎼 Frequency-Band Calculation (1/3-octave) and ISO 717 Rating", expanded=False):
+        band_calculator()
@@ -0,0 +1,52 @@
+"""Building impact totals: apparent L'n,w per receiving room of an uploaded path table."""
+import streamlit as st
+
+from sonotec.core import IMPACT_COLUMNS, IMPACT_PATHS, IMPACT_DIRECT_COLUMNS
+
+from sections.common import cached_building_impact_table, cached_call, results_table, timed_fragment
+
+
+@timed_fragment("building_impact_calculator")
+def building_impact_calculator():
+    st.markdown(
+        "Combines the direct path and every flanking path of each receiving room energetically according to EN ISO 12354-2. "
+        "Rooms below the excited floor (vertical transmission) have a direct path `d`; "
+        "rooms reached only through flanking paths are rated as diagonal transmission."
+    )
+    st.latex(r"L'_{n,w} = 10 \log_{10}\left(10^{L_{n,d,w}/10} + \sum_{j} 10^{L_{n,ij,w}/10}\right)")
+    st.latex(r"L_{n,d,w} = L_{n,eq,0,w} - \Delta L_w - \Delta L_{d,w}")
+    st.markdown(
+        f"Upload one row per path with the columns `room` and `path` (`{'`, `'.join(IMPACT_PATHS)}`). "
+        f"Direct `d` rows need `{', '.join(IMPACT_DIRECT_COLUMNS)}` (`delta_R_jw` is the lining on the receiving side, "
+        "$\\mathrm{\\Delta L_{d,w}}$); "
+        f"flanking rows use the same inputs as the impact calculator: `{', '.join(IMPACT_COLUMNS)}`."
+    )
+
+    building_impact_file = st.file_uploader("Building impact path file", type=["csv", "xlsx", "parquet"], key="building_impact_file")
+
+    if st.button("Calculate $\\mathrm{L'_{n,w}}$ for all receiving rooms", key="btn_building_impact", disabled=building_impact_file is None):
+        try:
+            st.session_state["building_impact_result"] = cached_call(
+                'building impact', cached_building_impact_table, building_impact_file.getvalue(), building_impact_file.name
+            )
+        except Exception as e:
+            st.error(f"Error in calculation: {e}")
+
+    # --- Display results ---
+    if "building_impact_result" in st.session_state:
+        building_impact = st.session_state["building_impact_result"]
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Receiving rooms", f"{len(building_impact):,}")
+        col2.metric("Diagonal rooms", f"{int((building_impact['transmission'] == 'diagonal').sum()):,}")
+        col3.metric("Rooms with invalid paths", f"{int((~building_impact['valid']).sum()):,}")
+        results_table(building_impact, "Ln_w_apparent", key="building_impact_table")
+        st.download_button(
+            "Download receiving room results", building_impact.to_csv(index=False), file_name="impact_results.csv",
+            mime="text/csv", key="btn_building_impact_download"
+        )
+
+
+def render():
+    with st.expander("🏠 Apparent Impact Sound Pressure Level per Receiving Room (all paths)", expanded=False):
+        building_impact_calculator()
@@ -0,0 +1,109 @@
+"""Bulk project upload: many transmission paths from one file, streamed in chunks."""
+import os
+import tempfile
+
+import pandas as pd
+import streamlit as st
+
+from sonotec.core import AIRBORNE_COLUMNS, IMPACT_COLUMNS
+from sonotec.batch import BULK_CHUNK_ROWS, stream_path_file
+
+from sections.common import results_table, submit_job, timed_call, timed_fragment
+
+
+# --- Input checks of a bulk run: rows per check, then the first rows with findings ---
+def show_validation(stats, key):
+    if not stats.get("issues"):
+        return
+    st.markdown(f"**Input checks:** {stats['invalid']:,} rows with errors (no result), "
+                f"{stats['warnings']:,} more with warnings (outside the calculator's ranges or implausible)")
+    st.dataframe(pd.DataFrame(stats["issues"]).drop(columns="check"), hide_index=True, use_container_width=True)
+    examples = stats["issue_examples"]
+    if examples is not None and len(examples):
+        result_col = "R_ij_w" if stats["mode"] == "airborne" else "L_nij_w"
+        examples = examples.drop(columns="error_code").reset_index().astype({"row": str})
+        results_table(examples, result_col, key=key, issues_col="issues")
+
+@timed_fragment("bulk_upload_calculator")
+def bulk_upload_calculator():
+    st.markdown(
+        "Upload a **CSV**, **XLSX** or **Parquet** file with one row per transmission path. "
+        f"Airborne paths need the columns `{', '.join(AIRBORNE_COLUMNS)}`; "
+        f"impact paths need `{', '.join(IMPACT_COLUMNS)}`. "
+        "The file is processed in chunks, so large projects do not have to fit in memory at once."
+    )
+
+    uploaded_file = st.file_uploader("Project file", type=["csv", "xlsx", "parquet"], key="bulk_file")
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        bulk_mode = st.selectbox(
+            "Path type", ["auto", "airborne", "impact"], key="bulk_mode",
+            format_func={"auto": "Auto-detect from columns", "airborne": "Airborne (R_ij,w)", "impact": "Impact (L_n,ij,w)"}.get
+        )
+    with col2:
+        bulk_format = st.selectbox(
+            "Output format", ["csv", "parquet"], key="bulk_format",
+            format_func={"csv": "CSV (gzip-compressed)", "parquet": "Parquet"}.get
+        )
+    with col3:
+        bulk_chunk_rows = st.number_input(
+            "Rows per chunk", min_value=1_000, max_value=1_000_000, value=BULK_CHUNK_ROWS, step=10_000, key="bulk_chunk_rows"
+        )
+
+    col1, col2 = st.columns(2)
+    if col2.button("Run in background", key="btn_bulk_job", disabled=uploaded_file is None):
+        suffix = ".parquet" if bulk_format == "parquet" else ".csv.gz"
+        stem = os.path.splitext(uploaded_file.name)[0]
+        submit_job("batch", {"mode": bulk_mode, "format": bulk_format, "chunk_rows": int(bulk_chunk_rows),
+                             "output": f"results{suffix}", "result_name": f"{stem}_results{suffix}"},
+                   uploaded_file.name, uploaded_file)
+    if col1.button("Calculate all paths", key="btn_bulk", disabled=uploaded_file is None):
+        # Drop the previous output file of this session before writing a new one
+        previous = st.session_state.pop("bulk_result", None)
+        if previous and os.path.exists(previous["path"]):
+            os.remove(previous["path"])
+
+        suffix = ".parquet" if bulk_format == "parquet" else ".csv.gz"
+        out_fd, out_path = tempfile.mkstemp(prefix="sonotec_", suffix=suffix)
+        os.close(out_fd)
+
+        status = st.empty()
+        def show_progress(rows, seconds):
+            status.info(f"Processed {rows:,} rows ({rows / seconds if seconds > 0 else 0:,.0f} rows/s)")
+
+        try:
+            stats = timed_call("bulk", stream_path_file, uploaded_file, uploaded_file.name, bulk_mode, out_path, bulk_format,
+                                     chunk_rows=int(bulk_chunk_rows), on_progress=show_progress)
+            stem = os.path.splitext(uploaded_file.name)[0]
+            st.session_state["bulk_result"] = {**stats, "path": out_path, "file_name": f"{stem}_results{suffix}"}
+            status.empty()
+        except Exception as e:
+            os.remove(out_path)
+            status.empty()
+            st.error(f"Error in calculation: {e}")
+
+    # --- Display results ---
+    if "bulk_result" in st.session_state:
+        bulk = st.session_state["bulk_result"]
+
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Rows", f"{bulk['rows']:,}")
+        col2.metric("Invalid rows", f"{bulk['invalid']:,}")
+        col3.metric("Rows / second", f"{bulk['rows_per_second']:,.0f}")
+        col4.metric("Peak memory", "n/a" if bulk['peak_memory_mb'] is None else f"{bulk['peak_memory_mb']:,.0f} MB")
+
+        if os.path.exists(bulk["path"]):
+            with open(bulk["path"], "rb") as result_file:
+                st.download_button(
+                    "Download results", result_file, file_name=bulk["file_name"], key="btn_bulk_download",
+                    mime="application/octet-stream" if bulk["path"].endswith(".parquet") else "application/gzip"
+                )
+        st.caption(f"Computed {bulk['mode']} paths in {bulk['seconds']:.2f} s. Invalid rows are marked with valid = False; "
+                   "the columns error_code and issues of the download tell why.")
+        show_validation(bulk, key="bulk_issues")
+
+
+def render():
+    with st.expander("📂 Bulk Project Upload (many transmission paths)", expanded=False):
+        bulk_upload_calculator()
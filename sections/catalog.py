@@ -0,0 +1,73 @@
+"""SonoTec V2 product catalog lookups."""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from sonotec.core import (
+    calculate_separation_paths, combine_airborne_paths, calculate_impact_paths, combine_impact_paths,
+)
+from sonotec.batch import read_path_chunks
+
+from sections.common import catalog_selectors, catalog_warning, shared_catalog, timed_call, timed_fragment
+
+
+@timed_fragment("catalog_calculator")
+def catalog_calculator():
+    catalog = shared_catalog()
+
+    catalog_warning(catalog.version)
+    st.caption(f"Catalog version {catalog.version}: {len(catalog.variants)} variants, "
+               f"{len(catalog.junction_types)} junction types, {len(catalog.materials)} materials.")
+    st.dataframe(pd.DataFrame(catalog.lookup(*catalog_selectors(catalog, "catalog"))), hide_index=True, use_container_width=True)
+
+    st.markdown(
+        "**Compare all variants across a project.** Upload a building file (room pairs or receiving rooms) "
+        "with the columns `junction_type`, `material` and `load` [kN/m] on the flanking paths. "
+        "For every variant, its $\\mathrm{K_{ij}}$ and $\\mathrm{\\Delta R}$ replace the values on all flanking paths."
+    )
+    formula = st.radio("Formula", ["airborne", "impact"], horizontal=True, key="catalog_formula",
+                       format_func={"airborne": "Airborne (R'_w per pair)", "impact": "Impact (L'n,w per room)"}.get)
+    catalog_file = st.file_uploader("Building path file", type=["csv", "xlsx", "parquet"], key="catalog_file")
+
+    if st.button("Compare variants", key="btn_catalog", disabled=catalog_file is None):
+        try:
+            table = pd.concat(read_path_chunks(catalog_file, catalog_file.name), ignore_index=True)
+            missing = [c for c in ("junction_type", "material", "load") if c not in table]
+            if missing:
+                raise ValueError(f"Missing column(s): {', '.join(missing)}")
+            if formula == "airborne":
+                key, path_result = "pair", calculate_separation_paths(table)[0]
+                adjustable = (table["path"].astype(str) != "Dd").to_numpy()
+            else:
+                key, (path_result, _, is_direct) = "room", calculate_impact_paths(table)
+                adjustable = ~is_direct
+            groups = table[key].astype(str).to_numpy()
+
+            # paths x variants in one broadcast; each variant is then combined per pair/room
+            codes = catalog.key_codes(table["junction_type"].astype(str), table["material"].astype(str),
+                                      pd.to_numeric(table["load"], errors="coerce"))
+            flanking = table[adjustable].reset_index(drop=True)
+            per_variant = np.tile(path_result[:, None], (1, len(catalog.variants)))
+            per_variant[adjustable] = timed_call("catalog", catalog.compare_variants, formula, flanking, codes[adjustable])
+
+            def combine(values):
+                if formula == "airborne":
+                    return combine_airborne_paths(groups, values)["R_w_apparent"]
+                return combine_impact_paths(groups, values, ~adjustable)["Ln_w_apparent"]
+
+            comparison = {key: np.unique(groups), "current": combine(path_result)}
+            for v, name in enumerate(catalog.variants):
+                comparison[name] = combine(per_variant[:, v])
+            st.session_state["catalog_result"] = pd.DataFrame(comparison)
+        except Exception as e:
+            st.error(f"Error in calculation: {e}")
+
+    # --- Display results ---
+    if "catalog_result" in st.session_state:
+        st.dataframe(st.session_state["catalog_result"], hide_index=True, use_container_width=True)
+        st.caption("Empty cells: the variant is not available for the junction type, material or load of at least one path.")
+
+
+def render():
+    with st.expander("📚 SonoTec V2 Product Catalog", expanded=False):
+        catalog_calculator()
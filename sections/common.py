@@ -0,0 +1,281 @@
+"""Helpers shared by the sections of the page: caches, profiling, background jobs, results table.
+
+Everything here lives once per server process (module state and ``st.cache_resource``), so all
+sessions share the counters, caches and the job queue.
+"""
+import functools
+import io
+import math
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from sonotec.core import (
+    AIRBORNE_COLUMNS, IMPACT_COLUMNS, DIRECT_COLUMNS, calculate_airborne_r_total, calculate_impact_level,
+    calculate_separation_paths, combine_airborne_paths, calculate_impact_paths, combine_impact_paths,
+)
+from sonotec.batch import read_path_chunks
+from sonotec.catalog import load_catalog, is_placeholder
+from sonotec.ifc import ifc_path_table
+from sonotec.styling import style_table
+from sonotec.profiling import PROFILING_ENABLED, PROFILE_FILE, PROFILE_LOG, DISABLED_SECTION, Timings
+from sonotec.jobs import JobQueue, input_file_name
+from sonotec.cache import ResultCache, TableHasher
+
+# --- CACHE LAYER ---
+# Results are memoized per input tuple / uploaded table content with a TTL and a bounded
+# number of entries (oldest entries are evicted first). Images are read once per process.
+# Large immutable results (tables, catalog, images) use st.cache_resource: every session gets a
+# reference to the same object instead of its own unpickled copy, so they must never be mutated.
+CACHE_TTL_SECONDS = 60 * 60
+CACHE_MAX_ENTRIES = 500
+
+# --- Hit/miss counters shared by all sessions of this server process ---
+class CacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = Counter()
+        self._misses = Counter()
+
+    def call(self, name):
+        with self._lock:
+            self._calls[name] += 1
+
+    def miss(self, name):
+        with self._lock:
+            self._misses[name] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return [
+                {'cache': name, 'calls': calls, 'hits': calls - self._misses[name], 'misses': self._misses[name],
+                 'hit rate': (calls - self._misses[name]) / calls if calls else 0.0}
+                for name, calls in sorted(self._calls.items())
+            ]
+
+@st.cache_resource
+def cache_stats():
+    return CacheStats()
+
+# --- Opt-in timing instrumentation (SONOTEC_PROFILE=1), shared by all sessions of this server process ---
+@st.cache_resource
+def timings():
+    return Timings(metrics_file=PROFILE_FILE, log_file=PROFILE_LOG)
+
+def profile_section(name):
+    return timings().section(name) if PROFILING_ENABLED else DISABLED_SECTION
+
+def timed_call(name, func, *args, **kwargs):
+    with profile_section(f"calc:{name}"):
+        return func(*args, **kwargs)
+
+# --- Run a cached function and count the call (its body counts the miss) ---
+def cached_call(name, func, *args):
+    cache_stats().call(name)
+    return timed_call(name, func, *args)
+
+@st.cache_resource(show_spinner=False)
+def load_image_bytes(path):
+    cache_stats().miss('images')
+    with open(path, 'rb') as image_file:
+        return image_file.read()
+
+def cached_image(path):
+    return cached_call('images', load_image_bytes, path)
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def cached_airborne_r_total(inputs):
+    cache_stats().miss('airborne')
+    return float(calculate_airborne_r_total(dict(zip(AIRBORNE_COLUMNS, inputs))))
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def cached_impact_level(inputs):
+    cache_stats().miss('impact')
+    return float(calculate_impact_level(dict(zip(IMPACT_COLUMNS, inputs))))
+
+# --- Persistent result cache on disk (needs pyarrow): building totals survive server restarts ---
+@st.cache_resource
+def result_cache():
+    try:
+        import pyarrow  # noqa: F401  optional dependency, only needed for the result cache
+    except ImportError:
+        return None
+    return ResultCache()
+
+# Totals of an uploaded path table from the disk cache, or computed chunk by chunk and stored.
+# A repeated upload is found by its raw bytes; the same table from another file format by its content.
+def persistent_totals(namespace, data, file_name, labels, inputs, compute):
+    chunks = read_path_chunks(io.BytesIO(data), file_name)
+    cache = result_cache()
+    if cache is None:
+        return compute(chunks, TableHasher(inputs, labels))
+    source = cache.source_key(namespace, data, file_name)
+    cache_stats().call(f'{namespace} (disk)')
+    columns = cache.get(source)
+    if columns is None:
+        cache_stats().miss(f'{namespace} (disk)')
+        hasher = TableHasher(inputs, labels)
+        columns = compute(chunks, hasher)
+        key = cache.key(namespace, hasher.hexdigest())
+        cache.put(key, columns, namespace)
+        cache.alias(source, key)
+    return columns
+
+def separation_totals(chunks, hasher):
+    # Only the pair key and the path result are kept per chunk, the inputs are dropped
+    pair_parts, R_parts = [], []
+    for chunk in chunks:
+        R_path, _ = calculate_separation_paths(chunk)
+        hasher.update(chunk)
+        pair_parts.append(chunk['pair'].astype(str).to_numpy())
+        R_parts.append(R_path)
+    return combine_airborne_paths(np.concatenate(pair_parts), np.concatenate(R_parts))
+
+def building_impact_totals(chunks, hasher):
+    # Only the room key, the path result and the direct flag are kept per chunk
+    room_parts, L_parts, direct_parts = [], [], []
+    for chunk in chunks:
+        L_path, _, is_direct = calculate_impact_paths(chunk)
+        hasher.update(chunk)
+        room_parts.append(chunk['room'].astype(str).to_numpy())
+        L_parts.append(L_path)
+        direct_parts.append(is_direct)
+    return combine_impact_paths(np.concatenate(room_parts), np.concatenate(L_parts), np.concatenate(direct_parts))
+
+# --- Uploaded building tables: keyed by the file content hash, one shared read-only result per file ---
+# copy=False keeps the numeric columns of a disk cache hit on the memory-mapped file
+@st.cache_resource(ttl=CACHE_TTL_SECONDS, max_entries=32, show_spinner=False)
+def cached_separation_table(data, file_name):
+    cache_stats().miss('separation')
+    return pd.DataFrame(persistent_totals('separation', data, file_name, ('pair', 'path'),
+                                          AIRBORNE_COLUMNS + DIRECT_COLUMNS, separation_totals), copy=False)
+
+@st.cache_resource(ttl=CACHE_TTL_SECONDS, max_entries=32, show_spinner=False)
+def cached_building_impact_table(data, file_name):
+    cache_stats().miss('building impact')
+    return pd.DataFrame(persistent_totals('building impact', data, file_name, ('room', 'path'),
+                                          IMPACT_COLUMNS, building_impact_totals), copy=False)
+
+# --- IFC models: one shared path table per model content and options ---
+@st.cache_resource(ttl=CACHE_TTL_SECONDS, max_entries=8, show_spinner=False)
+def cached_ifc_table(data, formula, tolerance):
+    cache_stats().miss('ifc')
+    parse_started = time.perf_counter()
+    table, stats = ifc_path_table(io.BytesIO(data), formula, tolerance)
+    return pd.DataFrame(table), {**stats, 'seconds': time.perf_counter() - parse_started}, formula
+
+# --- Current inputs of the single-path calculators (widget key, default) per formula input ---
+CALCULATOR_INPUT_KEYS = {
+    'airborne': {'R_iw': ('R_iw_air', 10.0), 'R_jw': ('R_jw_air', 10.0), 'delta_R_ijw': ('delta_R_ijw_air', 5.0),
+                 'K_ij': ('K_ij_air', 10.0), 'S_s': ('S_s_air', 10.0), 'l_0': ('l_0_air', 1.0), 'l_f': ('l_f_air', 1.0)},
+    'impact': {'L_neq0w': ('L_neq0w_imp', 20.0), 'delta_Lw': ('delta_Lw_imp', 10.0), 'R_iw': ('R_iw_imp', 20.0),
+               'R_jw': ('R_jw_imp', 15.0), 'delta_R_jw': ('delta_R_jw_imp', 5.0), 'K_ij': ('K_ij_imp', 15.0),
+               'S_i': ('S_i_imp', 10.0), 'l_0': ('l_0_impact', 10.0), 'l_ij': ('l_ij', 10.0)},
+}
+
+def calculator_inputs(formula):
+    return {column: float(st.session_state.get(key, default)) for column, (key, default) in CALCULATOR_INPUT_KEYS[formula].items()}
+
+# --- SonoTec V2 product catalog, loaded and indexed once per process ---
+@st.cache_resource(show_spinner=False)
+def shared_catalog():
+    return load_catalog()
+
+# --- Results based on a placeholder catalog are marked wherever they are shown ---
+def catalog_warning(version):
+    if is_placeholder(version):
+        st.warning(f"Catalog version {version} holds placeholder values for development, not SonoTec V2 product data. "
+                   "Set SONOTEC_CATALOG to the catalog file before using these results for project work.", icon="⚠️")
+
+# --- Junction type / material / load pickers for catalog lookups ---
+def catalog_selectors(catalog, key):
+    col1, col2, col3 = st.columns(3)
+    junction_type = col1.selectbox("Junction type", catalog.junction_types, key=f"{key}_junction")
+    material = col2.selectbox("Material", catalog.materials, key=f"{key}_material")
+    load = col3.number_input("Line load [kN/m]", float(catalog.load_edges[0]), float(catalog.load_edges[-1]),
+                             float(np.median(catalog.load_edges)), step=1.0, key=f"{key}_load")
+    return junction_type, material, load
+
+# --- Background jobs: one queue and its worker processes per server process (see sonotec/jobs.py) ---
+# SONOTEC_JOB_WORKERS=0 starts no workers here, for workers run with `python -m sonotec worker`
+JOB_WORKERS = int(os.environ.get("SONOTEC_JOB_WORKERS", max(1, (os.cpu_count() or 1) // 2)))
+JOB_POLL_SECONDS = 2
+
+@st.cache_resource
+def job_queue():
+    return JobQueue()
+
+# Workers start with the first submitted job (or when the jobs section finds queued jobs after a
+# restart), not on the first page load
+@st.cache_resource
+def job_workers():
+    return job_queue().start_workers(JOB_WORKERS) if JOB_WORKERS else []
+
+# The owner token lives in the URL, so a reload or a bookmarked link finds the same jobs again. It is
+# only created with the first job; None for visitors who never queued one.
+def job_owner(create=False):
+    if create and "owner" not in st.query_params:
+        st.query_params["owner"] = uuid.uuid4().hex[:12]
+    return st.query_params.get("owner")
+
+# The upload is saved in the job directory as input.<extension>; its own name only labels the job
+def submit_job(kind, params, label, upload=None):
+    try:
+        files = None
+        if upload is not None:
+            params = {**params, "input": input_file_name(upload.name)}
+            files = {params["input"]: upload.getvalue()}
+        job_queue().submit(job_owner(create=True), kind, params, label, files)
+        job_workers()
+    except Exception as e:
+        st.error(f"Error in calculation: {e}")
+        return
+    st.session_state["jobs_expanded"] = True
+    st.toast(f"Queued in the background: {label}")
+    st.rerun()
+
+# --- Per-interaction server time: this calculator's fragment run vs. the last full-page run ---
+def show_rerun_timing(started, name):
+    fragment_ms = (time.perf_counter() - started) * 1000
+    if PROFILING_ENABLED:
+        timings().record(f"fragment:{name}", fragment_ms / 1000)
+    page_ms = st.session_state.get("page_run_ms")
+    note = f" · full page rerun: {page_ms:.1f} ms" if page_ms is not None else ""
+    st.caption(f"⏱️ Server time for this calculator: {fragment_ms:.1f} ms{note}")
+
+# --- A calculator that reruns on its own when its inputs change, with its server time shown below it ---
+def timed_fragment(name, run_every=None):
+    def decorate(calculator):
+        @functools.wraps(calculator)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            calculator(*args, **kwargs)
+            show_rerun_timing(started, name)
+        return st.fragment(timed, run_every=run_every)
+    return decorate
+
+# --- Paginated results table: only the visible page is sliced, formatted and sent to the browser ---
+RESULTS_PAGE_SIZE = 50
+
+def results_table(df, final_col_name, key, page_size=RESULTS_PAGE_SIZE, issues_col=None):
+    n_pages = max(1, math.ceil(len(df) / page_size))
+    col1, col2 = st.columns([1, 4])
+    page = col1.number_input(f"Page (of {n_pages:,})", 1, n_pages, 1, key=f"{key}_page")
+
+    render_started = time.perf_counter()
+    start = (int(page) - 1) * page_size
+    page_df = df.iloc[start:start + page_size]
+    issues = page_df[issues_col] if issues_col else None
+    html = style_table(page_df, final_col_name, issues).hide(axis='index').to_html()
+    render_ms = (time.perf_counter() - render_started) * 1000
+
+    st.html(html)
+    col2.caption(f"Rows {start + 1:,}–{start + len(page_df):,} of {len(df):,} · "
+                 f"page rendered in {render_ms:.1f} ms · {len(html.encode()):,} bytes sent")
+    return {'render_ms': render_ms, 'payload_bytes': len(html.encode())}
@@ -0,0 +1,48 @@
+"""IFC import: areas and junction lengths of the path table from the building model."""
+import streamlit as st
+
+from sections.common import cached_call, cached_ifc_table, results_table, timed_fragment
+
+
+@timed_fragment("ifc_import_calculator")
+def ifc_import_calculator():
+    st.markdown(
+        "Reads walls and slabs from an IFC model in one streaming pass and builds the flanking-path table "
+        "with $\\mathrm{S_s}$ / $\\mathrm{S_i}$ and the junction lengths $\\mathrm{l_f}$ / $\\mathrm{l_{ij}}$ filled in. "
+        "Each separating wall or slab becomes one room pair (or receiving room); fill in the acoustic columns "
+        "and upload the table in the sections below."
+    )
+
+    ifc_file = st.file_uploader("IFC model", type=["ifc"], key="ifc_file")
+    col1, col2 = st.columns(2)
+    ifc_formula = col1.radio("Table for", ["airborne", "impact"], horizontal=True, key="ifc_formula",
+                             format_func=lambda f: "R'w per room pair" if f == "airborne" else "L'n,w per receiving room")
+    ifc_tolerance = col2.number_input("Contact tolerance (m)", 0.0, 0.5, 0.02, step=0.01, format="%.2f", key="ifc_tolerance")
+
+    if st.button("Extract flanking paths", key="btn_ifc", disabled=ifc_file is None):
+        try:
+            st.session_state["ifc_result"] = cached_call('ifc', cached_ifc_table, ifc_file.getvalue(), ifc_formula, ifc_tolerance)
+        except Exception as e:
+            st.error(f"Error in calculation: {e}")
+
+    # --- Display results ---
+    if "ifc_result" in st.session_state:
+        paths, stats, formula = st.session_state["ifc_result"]
+
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Walls / slabs", f"{stats['walls']:,} / {stats['slabs']:,}")
+        col2.metric("Junctions", f"{stats['junctions']:,}")
+        col3.metric("Paths", f"{len(paths):,}")
+        col4.metric("Parse time", f"{stats['seconds']:.1f} s")
+        if stats['unresolved']:
+            st.warning(f"{stats['unresolved']:,} elements have no extruded body geometry and take part in no junction.")
+        results_table(paths, "l_f" if formula == "airborne" else "l_ij", key="ifc_table")
+        st.download_button(
+            "Download flanking-path table", paths.to_csv(index=False), file_name=f"ifc_{formula}_paths.csv",
+            mime="text/csv", key="btn_ifc_download"
+        )
+
+
+def render():
+    with st.expander("🏗️ IFC Import (areas and junction lengths)", expanded=False):
+        ifc_import_calculator()
@@ -0,0 +1,97 @@
+"""Background jobs of this page: progress, cancel and results."""
+import os
+
+import pandas as pd
+import streamlit as st
+
+from sonotec.jobs import MAX_RUNNING_PER_OWNER
+
+from sections.common import (
+    JOB_POLL_SECONDS, JOB_WORKERS, RESULTS_PAGE_SIZE, job_owner, job_queue, job_workers, timed_fragment,
+)
+from sections.assignment import assignment_session_result
+from sections.reports import report_download
+from sections.sweep import sweep_session_result
+from sections.uncertainty import mc_session_result
+
+
+JOB_STATUS_ICONS = {"queued": "🕒", "running": "⚙️", "done": "✅", "failed": "❌", "cancelled": "⛔"}
+
+# --- Put a finished sweep / Monte Carlo / assignment result into its calculator section ---
+def open_job_result(job, result):
+    seconds = job["finished"] - job["started"]
+    if job["kind"] == "sweep":
+        st.session_state["sweep_result"] = sweep_session_result(result["formula"], result, seconds)
+    elif job["kind"] == "monte-carlo":
+        st.session_state["mc_result"] = mc_session_result(result["columns"], seconds, result["samples"], result["scope"])
+    elif job["kind"] == "assignment":
+        st.session_state["assign_result"] = assignment_session_result(result)
+
+def job_result_actions(queue, job):
+    result = queue.result(job["id"])
+    if result is None:
+        return
+    if job["kind"] in ("sweep", "monte-carlo", "assignment"):
+        if st.button("Open in calculator", key=f"btn_job_open_{job['id']}"):
+            open_job_result(job, result)
+            st.rerun()
+    elif job["kind"] == "batch" and os.path.exists(result["path"]):
+        st.caption(f"{result['rows']:,} {result['mode']} rows, {result['invalid']:,} invalid.")
+        with open(result["path"], "rb") as result_file:
+            st.download_button(
+                "Download results", result_file, file_name=result["file_name"], key=f"btn_job_download_{job['id']}",
+                mime="application/octet-stream" if result["path"].endswith(".parquet") else "application/gzip"
+            )
+    elif job["kind"] == "reports" and all(os.path.exists(output) for output in result["outputs"]):
+        st.caption(f"{result['reports']:,} reports, {result['pages']:,} pages."
+                   + (" Every page is marked: placeholder catalog values." if result.get("watermark") else ""))
+        data, file_name, mime = report_download(result["outputs"], result["scope"])
+        st.download_button("Download reports", data, file_name=file_name, mime=mime, key=f"btn_job_download_{job['id']}")
+
+JOBS_EMPTY_TEXT = ("No background jobs yet. Use “Run in background” in the bulk upload, sweep, bearing assignment, "
+                   "report or Monte Carlo sections.")
+
+def jobs_panel(live):
+    queue = job_queue()
+    jobs = queue.jobs(job_owner())
+    if not jobs:
+        st.caption(JOBS_EMPTY_TEXT)
+    for job in jobs:
+        st.markdown(f"{JOB_STATUS_ICONS[job['status']]} **{job['kind']}**: {job['label']} ({job['status']})")
+        if job["status"] in ("queued", "running"):
+            st.progress(job["progress"], text=job["message"] or ("Waiting for a worker ..." if job["status"] == "queued" else None))
+            partial = queue.partial(job["id"]) if job["kind"] == "monte-carlo" else None
+            if partial is not None:
+                st.dataframe(pd.DataFrame(partial).head(RESULTS_PAGE_SIZE), hide_index=True, use_container_width=True)
+            if st.button("Cancel", key=f"btn_job_cancel_{job['id']}", disabled=bool(job["cancel"])):
+                queue.cancel(job["id"])
+                st.rerun(scope="fragment")
+            continue
+        if job["status"] == "failed":
+            st.error(f"Error in calculation: {job['error']}")
+        elif job["status"] == "done":
+            job_result_actions(queue, job)
+        if st.button("Remove", key=f"btn_job_remove_{job['id']}"):
+            queue.delete(job["id"])
+            st.rerun(scope="fragment")
+    st.caption(f"Jobs run in {JOB_WORKERS} worker process(es) at a lower priority, at most {MAX_RUNNING_PER_OWNER} per "
+               "user at a time; they continue when this page is closed. Bookmark this page's URL to find them again.")
+    # Stop polling once the last job finished
+    if live and not queue.active(job_owner()):
+        st.rerun()
+
+live_jobs_panel = timed_fragment("jobs_panel", run_every=JOB_POLL_SECONDS)(jobs_panel)
+static_jobs_panel = timed_fragment("jobs_panel")(jobs_panel)
+
+
+def render():
+    # Nothing here opens the job database or starts workers for visitors without an owner token
+    with st.expander("⏳ Background Jobs", expanded=st.session_state.get("jobs_expanded", False)):
+        if job_owner() is None:
+            st.caption(JOBS_EMPTY_TEXT)
+        elif job_queue().active(job_owner()):
+            # Queued jobs of a restarted server need workers again
+            job_workers()
+            live_jobs_panel(True)
+        else:
+            static_jobs_panel(False)
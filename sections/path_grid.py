@@ -0,0 +1,129 @@
+"""Path grid: all paths of a room pair / room in an editable table with live totals."""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from sonotec.core import IMPACT_PATHS, IMPACT_DIRECT_COLUMNS
+from sonotec.project import project_from_table
+
+from sections.common import calculator_inputs, timed_fragment
+
+
+GRID_KINDS = {'separation': "Separation (R'w per room pair)", 'building-impact': "Impact (L'n,w per receiving room)"}
+GRID_DIRECT_DEFAULTS = {'R_sw': 52.0, 'delta_R_Ddw': 0.0}
+
+# --- Starting grid: one room pair / room with every path type, flanking inputs from the single-path calculators ---
+def grid_seed(kind):
+    if kind == 'separation':
+        flanking = calculator_inputs('airborne')
+        rows = [{'pair': 'Room 1 / Room 2', 'path': 'Dd', **GRID_DIRECT_DEFAULTS}]
+        rows += [{'pair': 'Room 1 / Room 2', 'path': path, **flanking} for path in ('Ff', 'Fd', 'Df')]
+    else:
+        flanking = calculator_inputs('impact')
+        direct = {c: flanking[c] for c in IMPACT_DIRECT_COLUMNS}
+        rows = [{'room': 'Room 1', 'path': 'd', **direct}]
+        rows += [{'room': 'Room 1', 'path': path, **flanking} for path in IMPACT_PATHS[1:]]
+    return project_from_table(pd.DataFrame(rows), kind=kind, name='grid')
+
+# --- Apply the cells of the editor state that differ from the project, one project edit per column ---
+def apply_grid_edits(project, edited_rows):
+    pending = {}
+    for row, cells in edited_rows.items():
+        for column, value in cells.items():
+            if column not in project.columns:
+                continue
+            if column in project.input_columns:
+                value = np.nan if value is None else float(value)
+                current = project.columns[column][row]
+                if value == current or (np.isnan(value) and np.isnan(current)):
+                    continue
+            elif value is None or value == project.columns[column][row]:
+                continue
+            rows, values = pending.setdefault(column, ([], []))
+            rows.append(int(row))
+            values.append(value)
+
+    summary = {'changed_rows': 0, 'groups': 0, 'seconds': 0.0}
+    for column, (rows, values) in pending.items():
+        stats = project.edit(rows, column, np.array(values, dtype=object if column not in project.input_columns else float))
+        summary = {name: summary[name] + stats[name] for name in summary}
+    return summary if pending else None
+
+@timed_fragment("path_grid_calculator")
+def path_grid_calculator():
+    st.markdown(
+        "Every row is one transmission path. Edit any cell: the path result and the energetic total of its "
+        "room pair / room update right away, and only the edited paths are recomputed. "
+        "Inputs a path type does not use can stay empty."
+    )
+    col1, col2 = st.columns([2, 1])
+    kind = col1.radio("Formula", list(GRID_KINDS), format_func=GRID_KINDS.get, horizontal=True, key="grid_kind")
+    live = col2.toggle("Live totals", True, key="grid_live",
+                       help="Off: edits are collected in the browser and applied together with 'Update totals'.")
+
+    project_key = f"grid_project_{kind}"
+    if project_key not in st.session_state:
+        st.session_state[project_key] = grid_seed(kind)
+        st.session_state[f"{project_key}_version"] = 0
+    project = st.session_state[project_key]
+    spec = project.spec
+    # A new key gives the editor a fresh state after rows were added or removed
+    editor_key = f"grid_editor_{kind}_{st.session_state[f'{project_key}_version']}"
+
+    # --- Diff the editor state against the project before drawing, so the grid shows the new results ---
+    if editor_key in st.session_state:
+        try:
+            edit = apply_grid_edits(project, st.session_state[editor_key]["edited_rows"])
+            if edit is not None:
+                st.session_state["grid_edit"] = edit
+        except Exception as e:
+            st.error(f"Error in calculation: {e}")
+
+    # --- Adding or removing paths changes the rows: rebuild the (small) project with a fresh editor ---
+    col1, col2, col3, col4 = st.columns(4)
+    new_group = col1.text_input(f"New path: {spec['group']}", str(project.groups[0]) if len(project.groups) else "",
+                                key=f"grid_new_group_{kind}")
+    new_path = col2.selectbox("Path type", list(spec['paths']), index=1, key=f"grid_new_path_{kind}")
+    remove_row = col3.number_input("Row to remove", 0, max(len(project) - 1, 0), len(project) - 1, key=f"grid_remove_{kind}")
+    add = col4.button("Add path", key="btn_grid_add")
+    remove = col4.button("Remove path", key="btn_grid_remove", disabled=len(project) <= 1)
+    if add or remove:
+        table = pd.DataFrame(project.path_table()).drop(columns=[spec['result'], 'valid'])
+        if add:
+            defaults = calculator_inputs('airborne' if kind == 'separation' else 'impact')
+            table = pd.concat([table, pd.DataFrame([{spec['group']: new_group, 'path': new_path, **defaults}])],
+                              ignore_index=True)
+        else:
+            table = table.drop(index=remove_row).reset_index(drop=True)
+        project = st.session_state[project_key] = project_from_table(table, kind=kind, name='grid')
+        st.session_state[f"{project_key}_version"] += 1
+        editor_key = f"grid_editor_{kind}_{st.session_state[f'{project_key}_version']}"
+        st.session_state.pop("grid_edit", None)
+
+    grid = pd.DataFrame(project.path_table()).drop(columns='valid')
+    # Live: every committed cell reruns this fragment. Off: the editor sits in a form, so edits stay in the
+    # browser until "Update totals" submits them together.
+    with st.container() if live else st.form(f"grid_form_{kind}", border=False):
+        st.data_editor(
+            grid, key=editor_key, num_rows="fixed", hide_index=False, use_container_width=True,
+            column_config={
+                spec['group']: st.column_config.TextColumn(spec['group'], required=True),
+                'path': st.column_config.SelectboxColumn('path', options=list(spec['paths']), required=True),
+                **{c: st.column_config.NumberColumn(c, format="%.1f") for c in project.input_columns},
+                spec['result']: st.column_config.NumberColumn(f"{spec['result']} [dB]", format="%.1f", disabled=True),
+            },
+        )
+        if not live:
+            st.form_submit_button("Update totals")
+    if "grid_edit" in st.session_state:
+        edit = st.session_state["grid_edit"]
+        st.caption(f"Last update: {edit['changed_rows']:,} path(s), {edit['groups']:,} total(s) recomputed in "
+                   f"{edit['seconds'] * 1000:.2f} ms")
+
+    totals = pd.DataFrame(project.totals_table())
+    st.dataframe(totals.style.format({spec['total']: '{:.1f} dB'}), hide_index=True, use_container_width=True)
+
+
+def render():
+    with st.expander("🧮 Path Grid (all paths with live totals)", expanded=False):
+        path_grid_calculator()
@@ -0,0 +1,82 @@
+"""Projects: save, open and edit a building's path table."""
+import io
+import os
+
+import pandas as pd
+import streamlit as st
+
+from sonotec.batch import read_path_chunks
+from sonotec.project import PROJECT_EXTENSION, project_from_table, load_project
+
+from sections.common import results_table, timed_call, timed_fragment
+
+
+def open_project(data, file_name):
+    if file_name.lower().endswith(PROJECT_EXTENSION):
+        return load_project(data)
+    table = pd.concat(read_path_chunks(io.BytesIO(data), file_name), ignore_index=True)
+    return project_from_table(table, name=os.path.splitext(file_name)[0])
+
+def project_file_bytes(project):
+    buffer = io.BytesIO()
+    project.save(buffer)
+    return buffer.getvalue()
+
+@timed_fragment("project_calculator")
+def project_calculator():
+    st.markdown(
+        "Open a separation (`pair`) or building impact (`room`) path table as a project, edit single values and "
+        f"save it as a `{PROJECT_EXTENSION}` file (Arrow, opened memory-mapped). "
+        "An edit recomputes only the paths whose inputs changed and the room pairs / rooms they belong to."
+    )
+
+    project_file = st.file_uploader("Path table or project file", type=["csv", "xlsx", "parquet", PROJECT_EXTENSION[1:]],
+                                    key="project_file")
+    if st.button("Open project", key="btn_project_open", disabled=project_file is None):
+        try:
+            st.session_state["project"] = timed_call("project_open", open_project, project_file.getvalue(), project_file.name)
+            st.session_state.pop("project_edit", None)
+        except Exception as e:
+            st.error(f"Error opening project: {e}")
+
+    # --- The open project is this session's own, mutable state ---
+    if "project" in st.session_state:
+        project = st.session_state["project"]
+        spec = project.spec
+
+        col1, col2, col3, col4 = st.columns(4)
+        row = col1.number_input("Path (row)", 0, max(len(project) - 1, 0), 0, key="project_row")
+        column = col2.selectbox("Column", [spec['group'], 'path', *project.input_columns], key="project_column")
+        current = project.columns[column][row]
+        if column in (spec['group'], 'path'):
+            value = col3.text_input("New value", str(current), key=f"project_value_{column}_{row}")
+        else:
+            value = col3.number_input("New value", value=float(current), key=f"project_value_{column}_{row}")
+        col4.metric(f"{spec['result']} of this path", f"{project.result[row]:.1f} dB")
+
+        if st.button("Apply edit", key="btn_project_edit"):
+            try:
+                st.session_state["project_edit"] = timed_call("project_edit", project.edit, row, column, value)
+            except Exception as e:
+                st.error(f"Error in calculation: {e}")
+        if "project_edit" in st.session_state:
+            edit = st.session_state["project_edit"]
+            st.caption(f"Last edit: {edit['changed_rows']:,} path(s) and {edit['groups']:,} "
+                       f"{'room pair(s)' if project.kind == 'separation' else 'room(s)'} recomputed in "
+                       f"{edit['seconds'] * 1000:.2f} ms")
+
+        totals = pd.DataFrame(project.totals_table())
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Paths", f"{len(project):,}")
+        col2.metric("Room pairs" if project.kind == 'separation' else "Receiving rooms", f"{len(totals):,}")
+        col3.metric("Invalid", f"{int((~totals['valid']).sum()):,}")
+        results_table(totals, spec['total'], key="project_totals")
+        st.download_button(
+            "Save project", lambda: project_file_bytes(project), file_name=f"{project.name}{PROJECT_EXTENSION}",
+            mime="application/vnd.apache.arrow.file", key="btn_project_save"
+        )
+
+
+def render():
+    with st.expander("🗂️ Projects (save, open and edit path tables)", expanded=False):
+        project_calculator()
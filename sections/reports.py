@@ -0,0 +1,78 @@
+"""Calculation reports (PDF)."""
+import io
+import os
+import tempfile
+import zipfile
+
+import pandas as pd
+import streamlit as st
+
+from sonotec.batch import read_path_chunks
+from sonotec.report import generate_reports
+
+from sections.common import submit_job, timed_call, timed_fragment
+
+
+# --- Generated PDFs as one download: the PDF itself for a project report, a zip archive otherwise ---
+def report_download(outputs, scope):
+    if scope == "project":
+        with open(outputs[0], "rb") as report_file:
+            return report_file.read(), os.path.basename(outputs[0]), "application/pdf"
+    buffer = io.BytesIO()
+    # PDFs are already compressed, so they are stored as they are
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+        for output in outputs:
+            archive.write(output, os.path.basename(output))
+    return buffer.getvalue(), "sonotec_reports.zip", "application/zip"
+
+@timed_fragment("report_calculator")
+def report_calculator():
+    st.markdown(
+        "Creates a PDF calculation report with the EN ISO 12354 formulas, every path with its values substituted, "
+        "the path table and the apparent total, per room pair / receiving room or for the whole project. "
+        "Upload the same path file as for the totals above. The pages are rendered in worker processes; "
+        "formulas and charts that occur in several reports are rendered only once."
+    )
+    col1, col2 = st.columns(2)
+    formula = col1.radio("Formula", ["airborne", "impact"], horizontal=True, key="report_formula",
+                         format_func={"airborne": "Airborne (R'_w per pair)", "impact": "Impact (L'n,w per room)"}.get)
+    scope = col2.radio("One PDF per", ["group", "project"], horizontal=True, key="report_scope",
+                       format_func={"group": "Room pair / room", "project": "Project"}.get)
+    project_name = st.text_input("Project name", "Project", key="report_project")
+    report_file = st.file_uploader("Building path file", type=["csv", "xlsx", "parquet"], key="report_file")
+
+    col1, col2 = st.columns(2)
+    if col2.button("Run in background", key="btn_report_job", disabled=report_file is None):
+        submit_job("reports", {"formula": formula, "scope": scope, "project": project_name or "Project"},
+                   f"{formula}, {report_file.name}", report_file)
+    if col1.button("Generate reports", key="btn_report", disabled=report_file is None):
+        try:
+            table = pd.concat(read_path_chunks(report_file, report_file.name), ignore_index=True)
+            progress = st.progress(0.0, text="Rendering reports ...")
+            with tempfile.TemporaryDirectory() as output_dir:
+                outputs, stats = timed_call(
+                    "reports", generate_reports, formula, table, output_dir, scope, project_name or "Project",
+                    progress=lambda done, total: progress.progress(done / total, text=f"{done:,} / {total:,} reports")
+                )
+                st.session_state["report_result"] = (*report_download(outputs, scope), stats)
+        except Exception as e:
+            st.error(f"Error in calculation: {e}")
+
+    # --- Display results ---
+    if "report_result" in st.session_state:
+        data, file_name, mime, stats = st.session_state["report_result"]
+        if stats["watermark"]:
+            st.warning("The path file has K_ij / ΔR values from a placeholder catalog (`catalog_version` column); "
+                       "every page is marked as not for project work.", icon="⚠️")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Reports", f"{stats['reports']:,}")
+        col2.metric("Pages", f"{stats['pages']:,}")
+        col3.metric("Generation time", f"{stats['seconds']:.1f} s")
+        st.caption(f"{stats['workers']} worker process(es); {stats['assets_rendered']:,} formula/chart images rendered, "
+                   f"{stats['assets_reused']:,} reused from the asset cache.")
+        st.download_button("Download reports", data, file_name=file_name, mime=mime, key="btn_report_download")
+
+
+def render():
+    with st.expander("📄 Calculation Reports (PDF)", expanded=False):
+        report_calculator()
@@ -0,0 +1,46 @@
+"""Separation totals: apparent R'w per room pair of an uploaded path table."""
+import streamlit as st
+
+from sonotec.core import AIRBORNE_COLUMNS, DIRECT_COLUMNS
+
+from sections.common import cached_call, cached_separation_table, results_table, timed_fragment
+
+
+@timed_fragment("separation_calculator")
+def separation_calculator():
+    st.markdown(
+        "Combines the direct path and every flanking path of each room pair energetically according to EN ISO 12354-1:"
+    )
+    st.latex(r"R'_{w} = -10 \log_{10}\left(10^{-R_{Dd,w}/10} + \sum_{F=f} 10^{-R_{Ff,w}/10} + \sum_{f} 10^{-R_{Df,w}/10} + \sum_{F} 10^{-R_{Fd,w}/10}\right)")
+    st.markdown(
+        "Upload one row per path with the columns `pair` and `path` (`Dd`, `Ff`, `Fd` or `Df`). "
+        f"`Dd` rows need `{', '.join(DIRECT_COLUMNS)}`; flanking rows need `{', '.join(AIRBORNE_COLUMNS)}`."
+    )
+
+    separation_file = st.file_uploader("Building path file", type=["csv", "xlsx", "parquet"], key="separation_file")
+
+    if st.button("Calculate $\\mathrm{R'_{w}}$ for all room pairs", key="btn_separation", disabled=separation_file is None):
+        try:
+            st.session_state["separation_result"] = cached_call(
+                'separation', cached_separation_table, separation_file.getvalue(), separation_file.name
+            )
+        except Exception as e:
+            st.error(f"Error in calculation: {e}")
+
+    # --- Display results ---
+    if "separation_result" in st.session_state:
+        separation = st.session_state["separation_result"]
+
+        col1, col2 = st.columns(2)
+        col1.metric("Room pairs", f"{len(separation):,}")
+        col2.metric("Pairs with invalid paths", f"{int((~separation['valid']).sum()):,}")
+        results_table(separation, "R_w_apparent", key="separation_table")
+        st.download_button(
+            "Download room pair results", separation.to_csv(index=False), file_name="separation_results.csv",
+            mime="text/csv", key="btn_separation_download"
+        )
+
+
+def render():
+    with st.expander("🏢 Apparent Sound Reduction Index per Room Pair (all paths)", expanded=False):
+        separation_calculator()
@@ -0,0 +1,53 @@
+"""Sidebar panels: cache statistics and, with SONOTEC_PROFILE=1, profiling."""
+import pandas as pd
+import streamlit as st
+
+from sonotec.profiling import PROFILING_ENABLED, PROFILE_FILE, PROFILE_LOG
+
+from sections.common import (
+    CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS, cache_stats, cached_building_impact_table, cached_separation_table,
+    profile_section, result_cache, timings,
+)
+
+
+def render():
+    with st.sidebar.expander("⚙️ Cache statistics", expanded=False), profile_section("section:sidebar"):
+        stats = cache_stats().snapshot()
+        if stats:
+            st.dataframe(pd.DataFrame(stats).style.format({'hit rate': '{:.0%}'}), hide_index=True, use_container_width=True)
+        else:
+            st.caption("No cached calls yet.")
+        st.caption(f"Counters cover all sessions of this server process. Results are kept for "
+                   f"{CACHE_TTL_SECONDS // 60} min, at most {CACHE_MAX_ENTRIES} entries per calculator.")
+        disk = result_cache()
+        if disk is not None:
+            disk_stats = disk.stats()
+            st.caption(f"Building totals on disk (kept across restarts): {disk_stats['entries']:,} entries, "
+                       f"{disk_stats['bytes'] / 1024 ** 2:,.1f} of {disk_stats['max_bytes'] / 1024 ** 2:,.0f} MB "
+                       f"in `{disk_stats['directory']}`.")
+        if st.button("Clear result caches", key="btn_clear_cache"):
+            st.cache_data.clear()
+            cached_separation_table.clear()
+            cached_building_impact_table.clear()
+            if disk is not None:
+                disk.clear()
+
+    # --- Profiling panel, only with SONOTEC_PROFILE=1 ---
+    if PROFILING_ENABLED:
+        with st.sidebar.expander("⏱️ Profiling", expanded=False):
+            profile = timings().snapshot()
+            if profile:
+                st.dataframe(pd.DataFrame(profile).style.format(precision=1), hide_index=True, use_container_width=True)
+            else:
+                st.caption("No timings recorded yet.")
+            st.caption("`section:` page blocks of full runs, `fragment:` calculator reruns, `calc:` calculations, "
+                       "`page` whole runs. Percentiles over the last samples, all sessions of this server process.")
+            if PROFILE_FILE:
+                st.caption(f"Prometheus metrics: `{PROFILE_FILE}`")
+            if PROFILE_LOG:
+                st.caption(f"Sample log: `{PROFILE_LOG}`")
+            col1, col2 = st.columns(2)
+            if col1.button("Write metrics now", key="btn_profile_flush", disabled=not (PROFILE_FILE or PROFILE_LOG)):
+                timings().flush()
+            if col2.button("Reset timings", key="btn_profile_reset"):
+                timings().reset()
@@ -0,0 +1,112 @@
+"""Target-driven design: required K_ij / ΔR and the cheapest bearing variant."""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from sonotec.core import calculate_separation_paths, calculate_impact_paths
+from sonotec.batch import read_path_chunks
+from sonotec.solver import SOLVABLE_INPUTS, solve_path, solve_groups, required_path_values, select_cheapest_variant
+
+from sections.common import (
+    calculator_inputs, catalog_selectors, catalog_warning, shared_catalog, timed_call, timed_fragment,
+)
+
+
+# Variant column that has to meet the solved input
+SOLVER_VARIANT_COLUMN = {'K_ij': 'K_ij', 'delta_R_ijw': 'delta_R', 'delta_R_jw': 'delta_R'}
+
+# --- Cheapest variant name for every requirement ("–" when no variant is good enough) ---
+def variant_names(variants, solve_for, required):
+    choice = select_cheapest_variant(required, variants[SOLVER_VARIANT_COLUMN[solve_for]], variants["cost"])
+    names = np.append(variants["variant"].astype(str).to_numpy(), "–")
+    return names[np.where(choice >= 0, choice, len(names) - 1)]
+
+@timed_fragment("solver_calculator")
+def solver_calculator():
+    st.markdown(
+        "Solves for the minimum $\\mathrm{K_{ij}}$ or $\\mathrm{\\Delta R}$ needed to reach a target "
+        "$\\mathrm{R_{ij,w}}$ / $\\mathrm{R'_{w}}$ (minimum) or $\\mathrm{L_{n,ij,w}}$ / $\\mathrm{L'_{n,w}}$ (maximum), "
+        "and picks the cheapest bearing variant that delivers it."
+    )
+
+    st.markdown("**Bearing variants**")
+    variant_source = st.radio("Variant source", ["catalog", "custom"], horizontal=True, key="solver_variant_source",
+                              format_func={"catalog": "SonoTec V2 catalog", "custom": "Custom table"}.get)
+    if variant_source == "catalog":
+        catalog = shared_catalog()
+        catalog_warning(catalog.version)
+        variants = pd.DataFrame(catalog.lookup(*catalog_selectors(catalog, "solver")))
+        st.dataframe(variants, hide_index=True, use_container_width=True)
+    else:
+        variants = st.data_editor(
+            pd.DataFrame({"variant": pd.Series(dtype=str), "K_ij": pd.Series(dtype=float),
+                          "delta_R": pd.Series(dtype=float), "cost": pd.Series(dtype=float)}),
+            num_rows="dynamic", hide_index=True, use_container_width=True, key="solver_variants",
+        ).dropna(subset=["variant", "cost"])
+
+    col1, col2, col3 = st.columns(3)
+    formula = col1.radio("Formula", ["airborne", "impact"], horizontal=True, key="solver_formula",
+                         format_func={"airborne": "Airborne", "impact": "Impact"}.get)
+    solve_for = col2.selectbox("Solve for", SOLVABLE_INPUTS[formula], key=f"solver_for_{formula}")
+    scope = col3.radio("Scope", ["path", "building"], horizontal=True, key="solver_scope",
+                       format_func={"path": "Single path (calculator inputs)", "building": "Building file"}.get)
+    target_label = "Target R_ij,w / R'_w (minimum) [dB]" if formula == "airborne" else "Target L_n,ij,w / L'n,w (maximum) [dB]"
+    target = st.number_input(target_label, 0.0, 120.0, 53.0 if formula == "airborne" else 50.0, step=0.5, key=f"solver_target_{formula}")
+
+    if scope == "path":
+        inputs = calculator_inputs(formula)
+        solution = timed_call("solver", solve_path, formula, inputs, target, solve_for)
+        if not solution["valid"]:
+            st.error("Error in calculation: the coupling lengths and the area must be positive.")
+        else:
+            variant = variant_names(variants, solve_for, np.atleast_1d(solution["required"]))[0]
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Current result", f"{float(solution['result']):.2f} dB")
+            col2.metric(f"Minimum {solve_for}", f"{max(float(solution['required']), 0.0):.2f} dB",
+                        f"{float(solution['increment']):+.2f} dB", delta_color="off")
+            col3.metric("Cheapest variant", variant)
+            if solution["met"]:
+                st.success("The current inputs already reach the target.")
+
+    else:
+        st.markdown(
+            "Upload the building file used by the room pair (airborne) or receiving room (impact) calculator. "
+            "Flanking paths are adjustable unless the file has an `adjustable` column; "
+            "an optional `target` column overrides the target per pair/room."
+        )
+        solver_file = st.file_uploader("Building path file", type=["csv", "xlsx", "parquet"], key="solver_file")
+
+        if st.button("Solve for all room pairs", key="btn_solver", disabled=solver_file is None):
+            try:
+                table = pd.concat(read_path_chunks(solver_file, solver_file.name), ignore_index=True)
+                key, is_direct = ("pair", table["path"].astype(str) == "Dd") if formula == "airborne" else \
+                                 ("room", table["path"].astype(str) == "d")
+                path_result = calculate_separation_paths(table)[0] if formula == "airborne" else calculate_impact_paths(table)[0]
+                adjustable = table["adjustable"].astype(bool).to_numpy() if "adjustable" in table else ~is_direct.to_numpy()
+                targets = pd.to_numeric(table["target"], errors="coerce").fillna(target).to_numpy() if "target" in table else target
+
+                solution = timed_call("solver", solve_groups, formula, table[key].astype(str).to_numpy(), path_result, adjustable, targets)
+                current = pd.to_numeric(table[solve_for], errors="coerce") if solve_for in table else pd.Series(0.0, index=table.index)
+                _, group_required = required_path_values(solution, current.to_numpy(), adjustable)
+                st.session_state["solver_result"] = pd.DataFrame({
+                    key: solution["group"], "current": solution["apparent"], "target": solution["target"],
+                    "uplift": solution["increment"], f"required {solve_for}": group_required,
+                    "variant": variant_names(variants, solve_for, group_required), "feasible": solution["feasible"],
+                })
+            except Exception as e:
+                st.error(f"Error in calculation: {e}")
+
+        # --- Display results ---
+        if "solver_result" in st.session_state:
+            solver = st.session_state["solver_result"]
+            col1, col2 = st.columns(2)
+            col1.metric("Already met", f"{int((solver['uplift'] == 0).sum()):,} / {len(solver):,}")
+            col2.metric("Not reachable with bearings", f"{int((~solver['feasible']).sum()):,}")
+            st.dataframe(solver, use_container_width=True, hide_index=True)
+            st.caption("Uplift is the uniform increase of the solved input on all adjustable paths of a pair/room. "
+                       "Not reachable means the fixed (e.g. direct) paths alone already exceed the target.")
+
+
+def render():
+    with st.expander("🎯 Target-Driven Design (required K_ij / ΔR and bearing variant)", expanded=False):
+        solver_calculator()
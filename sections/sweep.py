@@ -0,0 +1,111 @@
+"""Parameter sweep and sensitivity explorer."""
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+import altair as alt
+
+from sonotec.core import INPUT_BOUNDS
+from sonotec.sweep import sweep_summary
+
+from sections.common import CALCULATOR_INPUT_KEYS, submit_job, timed_call, timed_fragment
+
+
+SWEEP_MAX_POINTS = 20_000_000
+SWEEP_HEATMAP_CELLS = 80
+
+# --- Session result of a sweep (run here or as a background job) ---
+def sweep_session_result(formula, summary, seconds):
+    return {**summary, "formula": formula, "result_name": "R_ij_w" if formula == "airborne" else "L_nij_w",
+            "tornado": pd.DataFrame(summary["tornado"]), "seconds": seconds}
+
+@timed_fragment("sweep_calculator")
+def sweep_calculator():
+    formula = st.radio("Formula", ["airborne", "impact"], horizontal=True, key="sweep_formula",
+                       format_func={"airborne": "Airborne (R_ij,w)", "impact": "Impact (L_n,ij,w)"}.get)
+    result_name = "R_ij_w" if formula == "airborne" else "L_nij_w"
+    baseline_keys = CALCULATOR_INPUT_KEYS[formula]
+
+    swept = st.multiselect("Inputs to sweep", list(baseline_keys), default=["K_ij", "l_f" if formula == "airborne" else "l_ij"],
+                           key=f"sweep_inputs_{formula}")
+
+    # --- Baseline (fixed) values and ranges of the swept inputs ---
+    baseline, ranges = {}, {}
+    for column, (calc_key, default) in baseline_keys.items():
+        low_bound, high_bound = INPUT_BOUNDS[column]
+        value = float(st.session_state.get(calc_key, default))
+        if column not in swept:
+            baseline[column] = value
+            continue
+        col1, col2, col3, col4 = st.columns(4)
+        col1.markdown(f"`{column}`")
+        baseline[column] = col2.number_input("Baseline", low_bound, high_bound, value, key=f"sweep_{formula}_{column}_base")
+        low = col3.number_input("From", low_bound, high_bound, low_bound if low_bound > 0 else 0.0, key=f"sweep_{formula}_{column}_low")
+        high = col4.number_input("To", low_bound, high_bound, high_bound, key=f"sweep_{formula}_{column}_high")
+        steps = col1.number_input("Steps", 2, 5_000, 50, key=f"sweep_{formula}_{column}_steps")
+        ranges[column] = np.linspace(low, high, int(steps))
+
+    n_points = int(np.prod([len(v) for v in ranges.values()], dtype=np.int64)) if ranges else 0
+    st.caption(f"Grid size: {n_points:,} points (limit {SWEEP_MAX_POINTS:,}). Inputs that are not swept use the values of the calculator above.")
+
+    col1, col2 = st.columns(2)
+    if col1.button("Run sweep", key="btn_sweep", disabled=not ranges or n_points > SWEEP_MAX_POINTS):
+        try:
+            sweep_started = time.perf_counter()
+            # Only the downsampled views are kept in the session, not the full grid
+            summary = timed_call("sweep", sweep_summary, formula, baseline, ranges, SWEEP_HEATMAP_CELLS)
+            st.session_state["sweep_result"] = sweep_session_result(formula, summary, time.perf_counter() - sweep_started)
+        except Exception as e:
+            st.error(f"Error in calculation: {e}")
+    if col2.button("Run in background", key="btn_sweep_job", disabled=not ranges or n_points > SWEEP_MAX_POINTS):
+        submit_job("sweep", {"formula": formula, "baseline": baseline, "ranges": ranges, "max_cells": SWEEP_HEATMAP_CELLS},
+                   f"{formula}, {' × '.join(ranges)} ({n_points:,} points)")
+
+    # --- Display results ---
+    if "sweep_result" in st.session_state:
+        sweep = st.session_state["sweep_result"]
+        name = sweep["result_name"]
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Grid points", f"{sweep['n_points']:,}")
+        col2.metric(f"Range of {name}", f"{sweep['min']:.1f} … {sweep['max']:.1f} dB")
+        col3.metric("Evaluation time", f"{sweep['seconds'] * 1000:.0f} ms")
+
+        if len(sweep["axes"]) == 2:
+            x, y = sweep["axes"]
+            xx, yy = np.meshgrid(sweep["view_axes"][0], sweep["view_axes"][1], indexing="ij")
+            heatmap = pd.DataFrame({x: xx.ravel(), y: yy.ravel(), name: sweep["view"].ravel()})
+            st.altair_chart(
+                alt.Chart(heatmap).mark_rect().encode(
+                    x=alt.X(f"{x}:Q", bin=alt.Bin(maxbins=SWEEP_HEATMAP_CELLS)),
+                    y=alt.Y(f"{y}:Q", bin=alt.Bin(maxbins=SWEEP_HEATMAP_CELLS)),
+                    color=alt.Color(f"{name}:Q", scale=alt.Scale(scheme="viridis")),
+                    tooltip=[x, y, alt.Tooltip(f"{name}:Q", format=".2f")],
+                ),
+                use_container_width=True,
+            )
+        else:
+            line = pd.DataFrame({sweep["axes"][0]: sweep["view_axes"][0], name: sweep["view"]})
+            st.line_chart(line, x=sweep["axes"][0], y=name)
+        st.caption("Axes that are not plotted are reduced to their worst case "
+                   "(lowest R_ij,w / highest L_n,ij,w), and large grids are downsampled block-wise before display.")
+
+        st.markdown(f"**Sensitivity (tornado)** around the baseline {name} = {sweep['baseline']:.2f} dB")
+        tornado = sweep["tornado"].assign(
+            result_low=lambda d: d["result_low"] - sweep["baseline"],
+            result_high=lambda d: d["result_high"] - sweep["baseline"],
+        ).melt(id_vars=["input"], value_vars=["result_low", "result_high"], var_name="end", value_name="change")
+        st.altair_chart(
+            alt.Chart(tornado).mark_bar().encode(
+                x=alt.X("change:Q", title=f"Change of {name} [dB]"),
+                y=alt.Y("input:N", sort=list(sweep["tornado"]["input"]), title=None),
+                color=alt.Color("end:N", legend=alt.Legend(title="Input at")),
+            ),
+            use_container_width=True,
+        )
+
+
+def render():
+    with st.expander("📈 Parameter Sweep and Sensitivity Explorer", expanded=False):
+        sweep_calculator()
@@ -0,0 +1,60 @@
+"""Results table performance demo."""
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from sonotec.core import calculate_airborne_table
+from sonotec.styling import style_table
+
+from sections.common import results_table, timed_fragment
+
+
+TABLE_DEMO_ROWS = 100_000
+TABLE_LEGACY_SAMPLE_ROWS = 1_000
+
+# --- Demo result, built once per process and shared by every session ---
+@st.cache_resource(show_spinner=False)
+def table_demo_data():
+    rng = np.random.default_rng(0)
+    demo = pd.DataFrame({
+        'R_iw': rng.uniform(20, 60, TABLE_DEMO_ROWS), 'R_jw': rng.uniform(20, 60, TABLE_DEMO_ROWS),
+        'delta_R_ijw': rng.uniform(0, 10, TABLE_DEMO_ROWS), 'K_ij': rng.uniform(0, 25, TABLE_DEMO_ROWS),
+        'S_s': rng.uniform(5, 40, TABLE_DEMO_ROWS), 'l_0': 1.0, 'l_f': rng.uniform(0.0, 5, TABLE_DEMO_ROWS),
+    })
+    demo['R_ij_w'], _ = calculate_airborne_table(demo)
+
+    legacy_started = time.perf_counter()
+    legacy_html = style_table(demo.head(TABLE_LEGACY_SAMPLE_ROWS), 'R_ij_w').to_html()
+    scale = TABLE_DEMO_ROWS / TABLE_LEGACY_SAMPLE_ROWS
+    return {
+        "table": demo,
+        "legacy_ms": (time.perf_counter() - legacy_started) * 1000 * scale,
+        "legacy_bytes": len(legacy_html.encode()) * scale,
+    }
+
+@timed_fragment("table_performance_calculator")
+def table_performance_calculator():
+    st.markdown(
+        f"Renders a {TABLE_DEMO_ROWS:,}-row airborne result through the paginated results table and compares it "
+        "with styling the whole table at once (extrapolated from a "
+        f"{TABLE_LEGACY_SAMPLE_ROWS:,}-row sample, since the full table would stall the page)."
+    )
+    if st.button(f"Render {TABLE_DEMO_ROWS:,}-row result", key="btn_table_demo"):
+        # The session only remembers that the demo is shown; the table itself is shared
+        st.session_state["table_demo"] = True
+
+    if st.session_state.get("table_demo"):
+        demo = table_demo_data()
+        page = results_table(demo["table"], 'R_ij_w', key="table_demo")
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Page render time", f"{page['render_ms']:.1f} ms")
+        col2.metric("Page payload", f"{page['payload_bytes'] / 1024:,.1f} kB")
+        col3.metric("Full table render (est.)", f"{demo['legacy_ms'] / 1000:,.1f} s")
+        col4.metric("Full table payload (est.)", f"{demo['legacy_bytes'] / 1024 ** 2:,.1f} MB")
+
+
+def render():
+    with st.expander("📋 Results Table Performance", expanded=False):
+        table_performance_calculator()
@@ -0,0 +1,108 @@
+"""Uncertainty of the results (Monte Carlo)."""
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from sonotec.batch import read_path_chunks
+from sonotec.uncertainty import DISTRIBUTIONS, monte_carlo_columns
+
+from sections.common import calculator_inputs, submit_job, timed_call, timed_fragment
+
+
+MC_PERCENTILES = (5, 50, 95)
+
+# Inputs marked "from test results" and their default scatter (distribution, width in dB)
+MC_DEFAULT_SPREADS = {
+    'airborne': {'K_ij': ('normal', 1.5), 'delta_R_ijw': ('normal', 1.0)},
+    'impact': {'K_ij': ('normal', 1.5), 'delta_R_jw': ('normal', 1.0)},
+}
+
+# --- Session result of a Monte Carlo run (run here or as a background job) ---
+def mc_session_result(columns, seconds, samples, scope):
+    return {"table": pd.DataFrame(columns), "seconds": seconds, "samples": samples, "scope": scope}
+
+# --- Histogram bin width of the percentiles (it follows each path's scatter) and clipped samples ---
+def mc_resolution_note(table):
+    if "resolution" not in table:
+        return ""
+    low, high = table["resolution"].min(), table["resolution"].max()
+    note = f"Percentiles are interpolated within histogram bins of {low:.3f}" + (f"–{high:.3f}" if high > low else "") + " dB."
+    clipped = int(table["clipped samples"].sum())
+    if clipped:
+        note += (f" {clipped:,} samples fell beyond the histogram span and were counted in its outermost bins, "
+                 "so the outer percentiles may be too close to the nominal value.")
+    return note
+
+@timed_fragment("uncertainty_calculator")
+def uncertainty_calculator():
+    st.markdown(
+        "Propagates the measurement scatter of the inputs :blue[(from test results)] through the path formulas "
+        "and reports percentiles instead of a single value. For the normal distribution the width is the standard "
+        "deviation, for uniform and triangular distributions it is the half-width."
+    )
+    col1, col2 = st.columns(2)
+    formula = col1.radio("Formula", ["airborne", "impact"], horizontal=True, key="mc_formula",
+                         format_func={"airborne": "Airborne", "impact": "Impact"}.get)
+    scope = col2.radio("Scope", ["path", "building"], horizontal=True, key="mc_scope",
+                       format_func={"path": "Single path (calculator inputs)", "building": "Building file"}.get)
+
+    spreads = {}
+    for column, (kind, width) in MC_DEFAULT_SPREADS[formula].items():
+        col1, col2, col3 = st.columns(3)
+        col1.markdown(f"`{column}`")
+        kind = col2.selectbox("Distribution", DISTRIBUTIONS, DISTRIBUTIONS.index(kind), key=f"mc_{formula}_{column}_kind")
+        width = col3.number_input("Width [dB]", 0.0, 20.0, width, step=0.1, key=f"mc_{formula}_{column}_width")
+        spreads[column] = (kind, width)
+
+    col1, col2, col3 = st.columns(3)
+    n_samples = col1.number_input("Samples per path", 10_000, 10_000_000, 1_000_000, step=100_000, key="mc_samples")
+    seed = col2.number_input("Random seed", 0, 2**31 - 1, 12354, key="mc_seed")
+    processes = col3.number_input("Processes", 1, os.cpu_count() or 1, 1, key="mc_processes")
+
+    mc_file = None
+    if scope == "building":
+        st.caption("Upload the building file used by the room pair (airborne) or receiving room (impact) calculator. "
+                   "The K_ij scatter is not applied to direct paths.")
+        mc_file = st.file_uploader("Building path file", type=["csv", "xlsx", "parquet"], key="mc_file")
+
+    inputs = {c: np.array([v]) for c, v in calculator_inputs(formula).items()} if scope == "path" else None
+    col1, col2 = st.columns(2)
+    if col1.button("Run Monte Carlo", key="btn_mc", disabled=scope == "building" and mc_file is None):
+        try:
+            mc_started = time.perf_counter()
+            table = pd.concat(read_path_chunks(mc_file, mc_file.name), ignore_index=True) if scope == "building" else None
+            columns = timed_call("monte_carlo", monte_carlo_columns, formula, spreads, int(n_samples), int(seed), MC_PERCENTILES,
+                                 int(processes), inputs=inputs, table=table)
+            st.session_state["mc_result"] = mc_session_result(columns, time.perf_counter() - mc_started, int(n_samples), scope)
+        except Exception as e:
+            st.error(f"Error in calculation: {e}")
+    if col2.button("Run in background", key="btn_mc_job", disabled=scope == "building" and mc_file is None):
+        params = {"formula": formula, "spreads": spreads, "n_samples": int(n_samples), "seed": int(seed),
+                  "percentiles": MC_PERCENTILES, "inputs": inputs}
+        if scope == "building":
+            submit_job("monte-carlo", params, f"{formula}, {mc_file.name}, {int(n_samples):,} samples", mc_file)
+        else:
+            submit_job("monte-carlo", params, f"{formula}, single path, {int(n_samples):,} samples")
+
+    # --- Display results ---
+    if "mc_result" in st.session_state:
+        mc = st.session_state["mc_result"]
+        if mc["scope"] == "path":
+            row = mc["table"].iloc[0]
+            cols = st.columns(2 + len(MC_PERCENTILES))
+            cols[0].metric("Nominal", f"{row['nominal']:.2f} dB")
+            cols[1].metric("Std. deviation", f"{row['std']:.2f} dB")
+            for col, q in zip(cols[2:], MC_PERCENTILES):
+                col.metric(f"P{q}", f"{row[f'P{q}']:.2f} dB")
+        else:
+            st.dataframe(mc["table"], hide_index=True, use_container_width=True)
+        st.caption(f"{mc['samples']:,} samples per path in {mc['seconds']:.2f} s; the same seed reproduces the same result. "
+                   + mc_resolution_note(mc["table"]))
+
+
+def render():
+    with st.expander("🎲 Uncertainty of the Results (Monte Carlo)", expanded=False):
+        uncertainty_calculator()
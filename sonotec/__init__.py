@@ -0,0 +1,54 @@
+"""SonoTec V2 sound insulation calculations (EN ISO 12354-1/-2) without the Streamlit page.
+
+Only the NumPy-based core is imported here; file handling lives in ``sonotec.batch`` and is
+imported on demand.
+"""
+from sonotec.core import (
+    AIRBORNE_COLUMNS,
+    IMPACT_COLUMNS,
+    SEPARATION_PATHS,
+    DIRECT_COLUMNS,
+    IMPACT_PATHS,
+    IMPACT_DIRECT_COLUMNS,
+    FORMULAS,
+    INPUT_BOUNDS,
+    calculate_airborne_r_total_vectorized,
+    calculate_impact_level_vectorized,
+    calculate_airborne_table,
+    calculate_impact_table,
+    calculate_airborne_r_total,
+    calculate_impact_level,
+    calculate_direct_r_vectorized,
+    calculate_separation_paths,
+    combine_airborne_paths,
+    calculate_separation_table,
+    calculate_direct_impact_vectorized,
+    calculate_impact_paths,
+    combine_impact_paths,
+    calculate_building_impact_table,
+)
+
+__all__ = [
+    'AIRBORNE_COLUMNS',
+    'IMPACT_COLUMNS',
+    'SEPARATION_PATHS',
+    'DIRECT_COLUMNS',
+    'IMPACT_PATHS',
+    'IMPACT_DIRECT_COLUMNS',
+    'FORMULAS',
+    'INPUT_BOUNDS',
+    'calculate_airborne_r_total_vectorized',
+    'calculate_impact_level_vectorized',
+    'calculate_airborne_table',
+    'calculate_impact_table',
+    'calculate_airborne_r_total',
+    'calculate_impact_level',
+    'calculate_direct_r_vectorized',
+    'calculate_separation_paths',
+    'combine_airborne_paths',
+    'calculate_separation_table',
+    'calculate_direct_impact_vectorized',
+    'calculate_impact_paths',
+    'combine_impact_paths',
+    'calculate_building_impact_table',
+]
@@ -0,0 +1,5 @@
+import sys
+
+from sonotec.cli import main
+
+sys.exit(main())
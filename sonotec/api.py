@@ -0,0 +1,274 @@
+"""Local HTTP/JSON batch API: ``python -m sonotec serve``.
+
+Stdlib asyncio HTTP/1.1 server (keep-alive, Content-Length bodies) in front of the vectorized
+engine. Request bodies are column-oriented JSON ``{"R_iw": [...], ...}``, row-oriented JSON
+``{"paths": [{...}, ...]}`` or an Arrow IPC stream (Content-Type ``application/vnd.apache.arrow.stream``,
+needs pyarrow). Responses are JSON unless the client sends ``Accept: application/vnd.apache.arrow.stream``.
+
+    POST /v1/airborne          R_ij,w per path      (AIRBORNE_COLUMNS)
+    POST /v1/impact            L_n,ij,w per path    (IMPACT_COLUMNS)
+    POST /v1/separation        R'_w per pair        (pair, path + Dd / flanking columns)
+    POST /v1/building-impact   L'n,w per room       (room, path + direct / flanking columns)
+    GET  /v1/health
+"""
+import asyncio
+import json
+import math
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from sonotec.core import (
+    AIRBORNE_COLUMNS, IMPACT_COLUMNS,
+    calculate_airborne_table, calculate_impact_table,
+    calculate_separation_table, calculate_building_impact_table,
+)
+from sonotec.validation import validate_paths
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8502
+ARROW_TYPE = 'application/vnd.apache.arrow.stream'
+MAX_BODY_BYTES = 256 * 1024 * 1024
+# Bodies up to this size (a few thousand rows) are handled on the event loop; sending them to a worker
+# costs more. Larger ones are decoded, computed and encoded in a worker process.
+INLINE_MAX_BYTES = 256 * 1024
+KEY_COLUMNS = ('pair', 'room', 'path')
+
+
+# --- Endpoint registry: path -> (required columns, table engine -> result columns) ---
+# error_code: validation findings per row (bit flags, see sonotec.validation.checks)
+def _airborne(table):
+    R_ij_w, valid = calculate_airborne_table(table)
+    return {'R_ij_w': R_ij_w, 'valid': valid, 'error_code': validate_paths('airborne', table)[0]}
+
+def _impact(table):
+    L_nij_w, valid = calculate_impact_table(table)
+    return {'L_nij_w': L_nij_w, 'valid': valid, 'error_code': validate_paths('impact', table)[0]}
+
+ENDPOINTS = {
+    '/v1/airborne': (AIRBORNE_COLUMNS, _airborne),
+    '/v1/impact': (IMPACT_COLUMNS, _impact),
+    '/v1/separation': (('pair', 'path'), calculate_separation_table),
+    '/v1/building-impact': (('room', 'path'), calculate_building_impact_table),
+}
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+    # Raised in worker processes too
+    def __reduce__(self):
+        return ApiError, (self.status, str(self))
+
+
+# --- Request decoding: JSON (column or row oriented) or Arrow IPC -> dict of NumPy columns ---
+def _as_column(name, values):
+    try:
+        # null / missing values become NaN and are reported as invalid rows
+        column = np.asarray(values).astype(str) if name in KEY_COLUMNS else np.asarray(values, dtype=float)
+    except (TypeError, ValueError):
+        raise ApiError(400, f"Column '{name}' must hold {'labels' if name in KEY_COLUMNS else 'numbers'}")
+    if column.ndim != 1:
+        raise ApiError(400, f"Column '{name}' must be a flat list of values")
+    return column
+
+def decode_json(body):
+    try:
+        payload = json.loads(body)
+    except (UnicodeDecodeError, ValueError) as e:
+        raise ApiError(400, f'Invalid JSON: {e}')
+    if isinstance(payload, dict) and 'paths' in payload:
+        rows = payload['paths']
+        if not isinstance(rows, list) or not all(isinstance(r, dict) for r in rows):
+            raise ApiError(400, "'paths' must be a list of objects")
+        names = dict.fromkeys(k for r in rows for k in r)
+        payload = {name: [r.get(name) for r in rows] for name in names}
+    if not isinstance(payload, dict) or not all(isinstance(v, list) for v in payload.values()):
+        raise ApiError(400, "Body must be {column: [values]} or {'paths': [{column: value}]}")
+    return {name: _as_column(name, values) for name, values in payload.items()}
+
+def decode_arrow(body):
+    try:
+        import pyarrow as pa  # optional dependency, only needed for Arrow payloads
+    except ImportError:
+        raise ApiError(415, 'Arrow payloads need pyarrow on the server')
+    try:
+        table = pa.ipc.open_stream(body).read_all()
+    except pa.ArrowInvalid as e:
+        raise ApiError(400, f'Invalid Arrow stream: {e}')
+    return {name: _as_column(name, table.column(name).to_numpy(zero_copy_only=False)) for name in table.column_names}
+
+
+# --- Response encoding ---
+def encode_json(result):
+    # NaN and infinities are not valid JSON: invalid rows are returned as null
+    columns = {}
+    for name, values in result.items():
+        values = np.asarray(values)
+        if values.dtype.kind == 'f':
+            columns[name] = [v if math.isfinite(v) else None for v in values.tolist()]
+        else:
+            columns[name] = values.tolist()
+    return json.dumps(columns, separators=(',', ':')).encode()
+
+def encode_arrow(result):
+    import pyarrow as pa  # optional dependency, only needed for Arrow payloads
+    sink = pa.BufferOutputStream()
+    table = pa.table({name: np.asarray(values) for name, values in result.items()})
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+# --- One batch ---
+def compute(endpoint, columns):
+    required, engine = ENDPOINTS[endpoint]
+    missing = [c for c in required if c not in columns]
+    if missing:
+        raise ValueError(f"Missing column(s): {', '.join(missing)}")
+    lengths = {len(v) for v in columns.values()}
+    if len(lengths) > 1:
+        raise ValueError('All columns must have the same length')
+    return engine(columns)
+
+# --- One request body -> (rows, content type, response body): on the event loop for small bodies,
+# in a worker process otherwise, so parsing and serializing a large batch never block other clients ---
+def process(endpoint, content_type, accept, body):
+    columns = decode_arrow(body) if content_type == ARROW_TYPE else decode_json(body)
+    try:
+        result = compute(endpoint, columns)
+    except ValueError as e:
+        raise ApiError(422, str(e))
+    n_rows = len(next(iter(columns.values()), ()))
+    if ARROW_TYPE in accept:
+        return n_rows, ARROW_TYPE, encode_arrow(result)
+    return n_rows, 'application/json', encode_json(result)
+
+
+class BatchServer:
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = None
+        self.requests = 0
+        self.rows = 0
+
+    async def _run(self, endpoint, content_type, accept, body):
+        if len(body) <= INLINE_MAX_BYTES:
+            n_rows, content_type, payload = process(endpoint, content_type, accept, body)
+        else:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(self.workers)
+            n_rows, content_type, payload = await asyncio.get_running_loop().run_in_executor(
+                self.pool, process, endpoint, content_type, accept, body)
+        self.rows += n_rows
+        return content_type, payload
+
+    async def handle_request(self, method, target, headers, body):
+        path = target.split('?', 1)[0]
+        if path == '/v1/health':
+            return 200, 'application/json', json.dumps(
+                {'status': 'ok', 'workers': self.workers, 'requests': self.requests, 'rows': self.rows}).encode()
+        if path not in ENDPOINTS:
+            raise ApiError(404, f"Unknown endpoint '{path}'")
+        if method != 'POST':
+            raise ApiError(405, 'Use POST')
+
+        content_type = headers.get('content-type', 'application/json').split(';')[0].strip()
+        content_type, payload = await self._run(path, content_type, headers.get('accept', ''), body)
+        return 200, content_type, payload
+
+    # --- HTTP/1.1 connection loop with keep-alive ---
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request_line = await reader.readline()
+                except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+                    break
+                if not request_line.strip():
+                    break
+                keep_alive = await self._serve_one(request_line, reader, writer)
+                await writer.drain()
+                self.requests += 1
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _serve_one(self, request_line, reader, writer):
+        keep_alive = True
+        try:
+            try:
+                method, target, version = request_line.decode('latin-1').split()
+            except ValueError:
+                raise ApiError(400, 'Malformed request line')
+            headers = {}
+            while True:
+                try:
+                    line = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    # The rest of the oversized line is still unread: answer and close the connection
+                    keep_alive = False
+                    raise ApiError(431, 'Request header line too long')
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+
+            length = headers.get('content-length', '0')
+            if not length.isdigit():
+                keep_alive = False
+                raise ApiError(400, 'Invalid Content-Length')
+            length = int(length)
+            if length > MAX_BODY_BYTES:
+                keep_alive = False
+                raise ApiError(413, f'Body larger than {MAX_BODY_BYTES // 1024 ** 2} MB')
+            body = await reader.readexactly(length) if length else b''
+            try:
+                status, content_type, payload = await self.handle_request(method, target, headers, body)
+            except ApiError:
+                raise
+            except Exception as e:
+                # An input the checks above let through must not drop the connection without a reply
+                traceback.print_exc()
+                raise ApiError(500, f'Internal error: {type(e).__name__}')
+        except ApiError as e:
+            status, content_type, payload = e.status, 'application/json', json.dumps({'error': str(e)}).encode()
+
+        reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                  413: 'Payload Too Large', 415: 'Unsupported Media Type', 422: 'Unprocessable Entity',
+                  431: 'Request Header Fields Too Large', 500: 'Internal Server Error'}[status]
+        writer.write(f'HTTP/1.1 {status} {reason}\r\nContent-Type: {content_type}\r\n'
+                     f'Content-Length: {len(payload)}\r\nConnection: {"keep-alive" if keep_alive else "close"}\r\n\r\n'
+                     .encode('latin-1') + payload)
+        return keep_alive
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT, ready=None):
+        server = await asyncio.start_server(self.handle_connection, host, port, limit=64 * 1024)
+        if ready is not None:
+            ready(server)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if self.pool is not None:
+                self.pool.shutdown(cancel_futures=True)
+
+
+def run(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None):
+    batch_server = BatchServer(workers)
+    def ready(server):
+        address = server.sockets[0].getsockname()
+        print(f'SonoTec batch API on http://{address[0]}:{address[1]} ({batch_server.workers} workers)', flush=True)
+    try:
+        asyncio.run(batch_server.serve(host, port, ready))
+    except KeyboardInterrupt:
+        pass
+    return 0
@@ -0,0 +1,252 @@
+"""Building-wide bearing assignment: the cheapest SonoTec V2 variant (or none) for every junction.
+
+Every flanking path names the junction it crosses (``junction`` column) and carries the junction
+type, material and load used for the catalog lookup; all paths of a junction get the same
+variant. "none" keeps the path's own K_ij / delta R from the file. Every room pair (receiving room)
+must keep its apparent R'_w above (L'n,w below) its target.
+
+The results of all paths for all options are evaluated once, as a (paths x options) matrix of
+transmitted energies. The search keeps the energy sum of every room pair / room, so evaluating a
+move only sums the paths of the junction that changes. Local search starts from the best-performing
+option per junction and applies the feasible moves with the largest saving, in batches of moves
+that touch disjoint room pairs. It is repeated from perturbed solutions (iterated local search),
+with independent restarts spread over worker processes.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+
+import numpy as np
+
+from sonotec.core import FORMULAS, calculate_separation_paths, calculate_impact_paths, _group_codes
+
+ASSIGNMENT_COLUMNS = ('junction', 'junction_type', 'material', 'load')
+OBJECTIVES = ('cost', 'count')
+NO_BEARING = 'none'
+
+# Per formula: grouping column, direct path label, coupling length column, sign of the energetic sum
+_FORMULA_SPEC = {
+    'airborne': ('pair', 'Dd', 'l_f', -1),
+    'impact': ('room', 'd', 'l_ij', 1),
+}
+
+# Relative slack allowed on the energy limit (rounding of the incremental sums)
+_TOLERANCE = 1e-9
+
+
+class AssignmentProblem:
+    def __init__(self, formula, table, catalog, target, objective='cost'):
+        if objective not in OBJECTIVES:
+            raise ValueError(f"Unknown objective '{objective}', expected one of {', '.join(OBJECTIVES)}")
+        key, direct_label, length_column, sign = _FORMULA_SPEC[formula]
+        missing = [c for c in (key, 'path', *ASSIGNMENT_COLUMNS, *FORMULAS[formula][0]) if c not in table]
+        if missing:
+            raise ValueError(f"Missing column(s): {', '.join(missing)}")
+        self.formula, self.objective, self.sign, self.key = formula, objective, sign, key
+        self.variants = np.array([NO_BEARING, *catalog.variants], dtype=object)
+        self.catalog_version = catalog.version
+
+        # --- Path results as entered (option "none") and the per-group targets ---
+        path = np.asarray(table['path']).astype(str)
+        if formula == 'airborne':
+            path_result, _ = calculate_separation_paths(table)
+        else:
+            path_result, _, _ = calculate_impact_paths(table)
+        self.groups, group_codes = _group_codes(np.asarray(table[key]).astype(str))
+        n_groups = len(self.groups)
+        target = np.broadcast_to(np.asarray(target, dtype=float), path.shape)
+        self.target = np.full(n_groups, -np.inf if sign < 0 else np.inf)
+        (np.maximum if sign < 0 else np.minimum).at(self.target, group_codes, target)
+        self.limit = 10 ** (sign * self.target / 10)
+
+        junction = np.asarray(table['junction'], dtype=object)
+        has_junction = np.array([j is not None and str(j) not in ('', 'nan', 'None') for j in junction], dtype=bool)
+        adjustable = has_junction & (path != direct_label)
+
+        # --- Fixed paths: direct paths and paths without a junction ---
+        energy = 10 ** (sign * path_result / 10)
+        fixed = ~adjustable
+        self.fixed_energy = np.bincount(group_codes[fixed], weights=np.where(np.isfinite(energy[fixed]), energy[fixed], 0.0),
+                                        minlength=n_groups)
+        invalid = np.bincount(group_codes[fixed], weights=~np.isfinite(energy[fixed]), minlength=n_groups) > 0
+
+        # --- Adjustable paths sorted by (junction, group), so both are contiguous runs ---
+        rows = np.flatnonzero(adjustable)
+        if len(rows) == 0:
+            raise ValueError("No flanking path names a junction; fill in the 'junction' column")
+        self.junctions, junction_codes = _group_codes(junction[rows].astype(str))
+        order = np.lexsort((group_codes[rows], junction_codes))
+        rows, junction_codes = rows[order], junction_codes[order]
+        self.path_group = group_codes[rows]
+        self.path_junction = junction_codes
+        n_junctions = len(self.junctions)
+
+        flanking = {c: np.asarray(table[c], dtype=float)[rows] for c in FORMULAS[formula][0]}
+        codes = catalog.key_codes(np.asarray(table['junction_type']).astype(str)[rows],
+                                  np.asarray(table['material']).astype(str)[rows],
+                                  np.asarray(table['load'], dtype=float)[rows])
+        results = np.column_stack([path_result[rows], catalog.compare_variants(formula, flanking, codes)])
+        with np.errstate(over='ignore'):
+            self.path_energy = 10 ** (sign * results / 10)
+        new_pair = np.r_[True, (np.diff(junction_codes) != 0) | (np.diff(self.path_group) != 0)]
+        self.pair_start = np.flatnonzero(new_pair)
+        self.pair_group = self.path_group[new_pair]
+        self.junction_pair_start = np.searchsorted(junction_codes[new_pair], np.arange(n_junctions + 1))
+        self.junction_start = np.searchsorted(junction_codes, np.arange(n_junctions + 1))
+
+        # --- Options per junction: allowed only where every path of the junction has a result ---
+        first = self.junction_start[:-1]
+        allowed = np.logical_and.reduceat(np.isfinite(self.path_energy), first, axis=0)
+        no_option = ~allowed.any(axis=1)
+        if no_option.any():
+            raise ValueError(f"No applicable variant for junction(s) {', '.join(self.junctions[no_option][:10].astype(str))} "
+                             "(junction type, material or load outside the catalog, and no K_ij / delta R in the file)")
+        self.junction_type = np.asarray(table['junction_type']).astype(str)[rows][first]
+        self.material = np.asarray(table['material']).astype(str)[rows][first]
+        self.load = np.asarray(table['load'], dtype=float)[rows][first]
+        self.length = np.maximum.reduceat(np.asarray(table[length_column], dtype=float)[rows], first)
+        _, _, cost_per_m = catalog.variant_tables(codes[first])
+        self.material_cost = np.column_stack([np.zeros(n_junctions), cost_per_m * self.length[:, None]])
+        option_cost = self.material_cost if objective == 'cost' else \
+            np.column_stack([np.zeros(n_junctions), np.ones((n_junctions, len(catalog.variants)))])
+        self.option_cost = np.where(allowed, option_cost, np.inf)
+
+        # --- Start: best-performing option per junction (energy relative to the group limits) ---
+        relative = np.where(np.isfinite(self.path_energy), self.path_energy / self.limit[self.path_group, None], np.inf)
+        performance = np.add.reduceat(relative, first, axis=0)
+        self.start = np.argmin(np.where(allowed, performance, np.inf), axis=1)
+
+        # Groups the best options cannot bring to the target do not constrain the search
+        self.valid = ~invalid
+        self.reachable = self.valid & (self.group_energy(self.start) <= self.limit * (1 + _TOLERANCE))
+        self.search_limit = np.where(self.reachable, self.limit, np.inf)
+
+    @property
+    def n_junctions(self):
+        return len(self.junctions)
+
+    def group_energy(self, assignment):
+        chosen = self.path_energy[np.arange(len(self.path_group)), assignment[self.path_junction]]
+        return self.fixed_energy + np.bincount(self.path_group, weights=chosen, minlength=len(self.groups))
+
+    def apparent(self, assignment):
+        with np.errstate(divide='ignore'):
+            return np.where(self.valid, self.sign * 10 * np.log10(self.group_energy(assignment)), np.nan)
+
+    def feasible(self, assignment):
+        return bool(np.all(self.group_energy(assignment) <= self.search_limit * (1 + _TOLERANCE)))
+
+    def cost(self, assignment):
+        return float(self.option_cost[np.arange(self.n_junctions), assignment].sum())
+
+
+# --- Local search: apply the best feasible saving move per junction, in rounds of disjoint moves ---
+# A move changes one junction's option; its energy change is summed per (junction, group) pair
+# over that junction's paths only, and it is feasible if every touched group keeps its limit.
+def descend(problem, assignment, rng=None):
+    assignment = assignment.copy()
+    junction_ids = np.arange(problem.n_junctions)
+    path_ids = np.arange(len(problem.path_group))
+    pair_limit = problem.search_limit[problem.pair_group][:, None] * _TOLERANCE
+    while True:
+        slack = problem.search_limit - problem.group_energy(assignment)
+        current = problem.path_energy[path_ids, assignment[problem.path_junction]]
+        pair_delta = np.add.reduceat(problem.path_energy - current[:, None], problem.pair_start, axis=0)
+        with np.errstate(invalid='ignore'):
+            margin = slack[problem.pair_group][:, None] - pair_delta + pair_limit
+            ok = np.minimum.reduceat(margin, problem.junction_pair_start[:-1], axis=0) >= 0
+        saving = problem.option_cost[junction_ids, assignment][:, None] - problem.option_cost
+        saving = np.where(ok & np.isfinite(problem.option_cost), saving, -np.inf)
+        best = np.argmax(saving, axis=1)
+        gain = saving[junction_ids, best]
+        candidates = np.flatnonzero(gain > 0)
+        if len(candidates) == 0:
+            return assignment
+        # Largest saving first; with an rng the order is perturbed a little to diversify restarts
+        weight = gain[candidates] * (1 + 0.1 * rng.random(len(candidates)) if rng is not None else 1)
+        touched = np.zeros(len(problem.groups), dtype=bool)
+        for j in candidates[np.argsort(-weight, kind='stable')]:
+            groups = problem.pair_group[problem.junction_pair_start[j]:problem.junction_pair_start[j + 1]]
+            if touched[groups].any():
+                continue
+            touched[groups] = True
+            assignment[j] = best[j]
+
+
+# --- Iterated local search: reset the junctions around a few random room pairs, descend, keep if cheaper ---
+def search(problem, seed=0, kicks=100, time_limit=None, kick_groups=3):
+    started = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    best = descend(problem, problem.start, rng if seed else None)
+    best_cost = problem.cost(best)
+
+    # Junctions touching each group, for group-local kicks
+    pair_junction = np.repeat(np.arange(problem.n_junctions), np.diff(problem.junction_pair_start))
+    by_group = np.argsort(problem.pair_group, kind='stable')
+    group_start = np.searchsorted(problem.pair_group[by_group], np.arange(len(problem.groups) + 1))
+    touched_groups = np.flatnonzero(np.diff(group_start) > 0)
+
+    for _ in range(kicks if len(touched_groups) else 0):
+        if time_limit is not None and time.perf_counter() - started > time_limit:
+            break
+        trial = best.copy()
+        for g in rng.choice(touched_groups, min(kick_groups, len(touched_groups)), replace=False):
+            junctions = pair_junction[by_group[group_start[g]:group_start[g + 1]]]
+            trial[junctions] = problem.start[junctions]
+        if not problem.feasible(trial):
+            continue
+        trial = descend(problem, trial, rng)
+        trial_cost = problem.cost(trial)
+        if trial_cost < best_cost - 1e-9:
+            best, best_cost = trial, trial_cost
+    return best, best_cost
+
+
+# --- Independent searches (seed 0 is the plain greedy descent) in parallel; the cheapest wins ---
+# on_progress(done, restarts, best cost so far) is called after every finished search.
+def optimize_assignment(problem, restarts=None, kicks=100, time_limit=None, workers=None, on_progress=None):
+    started = time.perf_counter()
+    restarts = restarts or os.cpu_count() or 1
+    workers = min(workers or os.cpu_count() or 1, restarts)
+    seeds = range(restarts)
+    runs = []
+    with ExitStack() as stack:
+        if workers > 1:
+            pool = stack.enter_context(ProcessPoolExecutor(workers))
+            searches = pool.map(search, [problem] * restarts, seeds, [kicks] * restarts, [time_limit] * restarts)
+        else:
+            searches = (search(problem, seed, kicks, time_limit) for seed in seeds)
+        for run in searches:
+            runs.append(run)
+            if on_progress is not None:
+                on_progress(len(runs), restarts, min(cost for _, cost in runs))
+    assignment, _ = min(runs, key=lambda run: run[1])
+    return assignment, {'restarts': restarts, 'workers': workers, 'seconds': time.perf_counter() - started,
+                        'greedy_cost': runs[0][1]}
+
+
+# --- Per junction: chosen variant and cost; per room pair / room: before and after against the target ---
+def assignment_tables(problem, assignment):
+    junction_ids = np.arange(problem.n_junctions)
+    junctions = {
+        'junction': problem.junctions, 'junction_type': problem.junction_type, 'material': problem.material,
+        'load': problem.load, 'length': problem.length, 'variant': problem.variants[assignment],
+        'cost': problem.material_cost[junction_ids, assignment],
+        # Travels with the exported table, so results from a placeholder catalog stay recognizable
+        'catalog_version': np.full(problem.n_junctions, problem.catalog_version, dtype=object),
+    }
+    before = problem.apparent(np.zeros(problem.n_junctions, dtype=np.intp))
+    after = problem.apparent(assignment)
+    met = after >= problem.target if problem.sign < 0 else after <= problem.target
+    groups = {
+        problem.key: problem.groups, 'without_bearings': before, 'assigned': after, 'target': problem.target,
+        'met': met & problem.valid, 'reachable': problem.reachable,
+    }
+    summary = {
+        'cost': float(junctions['cost'].sum()), 'bearings': int((assignment > 0).sum()),
+        'junctions': problem.n_junctions, 'groups': len(problem.groups),
+        'unreachable': int((problem.valid & ~problem.reachable).sum()), 'invalid': int((~problem.valid).sum()),
+        'catalog_version': problem.catalog_version,
+    }
+    return junctions, groups, summary
@@ -0,0 +1,192 @@
+"""1/3-octave band calculations (EN ISO 12354) and ISO 717-1/-2 single-number ratings.
+
+Path equations are evaluated as bands x paths matrices with the same vectorized engine as the
+weighted values. Ratings shift the reference curve for all spectra at once with a vectorized
+bisection over the shift instead of stepping one dB at a time per spectrum.
+"""
+import numpy as np
+
+from sonotec.core import (
+    AIRBORNE_COLUMNS, IMPACT_COLUMNS, DIRECT_COLUMNS, IMPACT_DIRECT_COLUMNS,
+    calculate_airborne_r_total_vectorized, calculate_impact_level_vectorized,
+    calculate_direct_r_vectorized, calculate_direct_impact_vectorized,
+    _group_codes, _energetic_sum,
+)
+
+# 1/3-octave band centre frequencies in Hz
+BANDS_EXTENDED = (50, 63, 80, 100, 125, 160, 200, 250, 315, 400, 500, 630, 800, 1000, 1250, 1600, 2000, 2500, 3150, 4000, 5000)
+BANDS_STANDARD = BANDS_EXTENDED[3:19]
+
+# ISO 717-1 / ISO 717-2 reference values, 100-3150 Hz
+REFERENCE_AIRBORNE = np.array([33, 36, 39, 42, 45, 48, 51, 52, 53, 54, 55, 56, 56, 56, 56, 56], dtype=float)
+REFERENCE_IMPACT = np.array([62, 62, 62, 62, 62, 62, 61, 60, 59, 58, 57, 54, 51, 48, 45, 42], dtype=float)
+
+# ISO 717-1 Table 4 sound level spectra for C (No. 1, A-weighted pink noise) and C_tr (No. 2, urban traffic),
+# 50-5000 Hz. No. 1 is normalized to 0 dB A-weighted per frequency range, so its values for the ranges up to
+# 5000 Hz are 1 dB lower than for the ranges up to 3150 Hz; No. 2 has the same values for every range.
+SPECTRUM_1 = np.array([-40, -36, -33, -29, -26, -23, -21, -19, -17, -15, -13, -12, -11, -10, -9, -9, -9, -9, -9, -9, -9], dtype=float)
+SPECTRUM_1_5000 = np.array([-41, -37, -34, -30, -27, -24, -22, -20, -18, -16, -14, -13, -12, -11, -10, -10, -10, -10, -10,
+                            -10, -10], dtype=float)
+SPECTRUM_2 = np.array([-25, -23, -21, -20, -20, -18, -16, -15, -14, -13, -12, -11, -9, -8, -9, -10, -11, -13, -15, -16, -18], dtype=float)
+
+MAX_UNFAVOURABLE_DEVIATION = 32.0
+
+# Formula inputs that may vary per band; the remaining inputs are geometry and stay per path
+BANDED_INPUTS = {
+    'airborne': ('R_iw', 'R_jw', 'delta_R_ijw', 'K_ij', 'R_sw', 'delta_R_Ddw'),
+    'impact': ('L_neq0w', 'delta_Lw', 'R_iw', 'R_jw', 'delta_R_jw', 'K_ij'),
+}
+
+
+def _band_slice(bands, low, high):
+    bands = tuple(bands)
+    return slice(bands.index(low), bands.index(high) + 1)
+
+
+# --- (bands x paths) matrix of one input: columns '<input>_<Hz>', or a single '<input>' column for all bands ---
+def band_matrix(table, column, bands=BANDS_STANDARD):
+    banded = [f'{column}_{f}' for f in bands]
+    if all(c in table for c in banded):
+        return np.stack([np.asarray(table[c], dtype=float) for c in banded])
+    if column in table:
+        return np.broadcast_to(np.asarray(table[column], dtype=float), (len(bands), len(np.asarray(table[column]))))
+    missing = [c for c in banded if c not in table]
+    raise ValueError(f"Missing band column(s) for {column}: {', '.join(missing[:3])}{' ...' if len(missing) > 3 else ''}")
+
+
+def _inputs(table, formula, columns, rows, bands):
+    return [band_matrix(table, c, bands)[:, rows] if c in BANDED_INPUTS[formula]
+            else np.asarray(table[c], dtype=float)[rows] for c in columns]
+
+
+# --- Per-band path values of a building table, shape (bands, paths) ---
+# Airborne: Dd rows use R_s + delta_R_Dd, Ff/Fd/Df rows Formula 20 per band.
+# Impact:   d rows use L_n,eq,0 - delta_L - delta_L_d, the flanking rows EN ISO 12354-2 per band.
+def calculate_band_paths(formula, table, bands=BANDS_STANDARD):
+    path = np.asarray(table['path']).astype(str)
+    if formula == 'airborne':
+        direct_label, flanking_labels = 'Dd', ('Ff', 'Fd', 'Df')
+        direct_columns, flanking_columns = DIRECT_COLUMNS, AIRBORNE_COLUMNS
+        direct_engine, flanking_engine = calculate_direct_r_vectorized, calculate_airborne_r_total_vectorized
+    else:
+        direct_label, flanking_labels = 'd', ('ij', 'Df', 'DFf')
+        direct_columns, flanking_columns = IMPACT_DIRECT_COLUMNS, IMPACT_COLUMNS
+        direct_engine, flanking_engine = calculate_direct_impact_vectorized, calculate_impact_level_vectorized
+
+    is_direct = path == direct_label
+    is_flanking = np.isin(path, flanking_labels)
+    values = np.full((len(bands), len(path)), np.nan)
+    if is_direct.any():
+        values[:, is_direct], _ = direct_engine(*_inputs(table, formula, direct_columns, is_direct, bands))
+    if is_flanking.any():
+        values[:, is_flanking], _ = flanking_engine(*_inputs(table, formula, flanking_columns, is_flanking, bands))
+    return values, is_direct
+
+
+# --- Energetic sum per group and band: (bands, paths) -> (groups, bands) ---
+def combine_band_paths(formula, group, values):
+    groups, codes = _group_codes(group)
+    n_bands, n_paths = values.shape
+    band_codes = (np.arange(n_bands)[:, None] * len(groups) + codes[None, :]).ravel()
+    combined, _ = _energetic_sum(band_codes, n_bands * len(groups), values.ravel(), -1 if formula == 'airborne' else 1)
+    return groups, combined.reshape(n_bands, len(groups)).T
+
+
+# --- Largest (airborne) / smallest (impact) shift that keeps the unfavourable deviations <= 32 dB ---
+def _shift_reference(values, reference, airborne, step):
+    # Work on an integer grid of `step` dB so the bisection is exact
+    scale = 1.0 / step
+    gap = (values - reference) * scale
+    # Beyond the largest (airborne) / smallest (impact) gap every band deviates, so the sum passes 32 dB
+    # within this many steps
+    margin = np.ceil(MAX_UNFAVOURABLE_DEVIATION * scale / values.shape[-1]) + 1
+    with np.errstate(invalid='ignore'):
+        lo = np.floor(np.nanmin(gap, axis=-1)) if airborne else np.floor(np.nanmin(gap, axis=-1)) - margin
+        hi = np.ceil(np.nanmax(gap, axis=-1)) + margin if airborne else np.ceil(np.nanmax(gap, axis=-1))
+
+    def deviation(shift):
+        diff = (reference + shift[..., None] * step - values) if airborne else (values - reference - shift[..., None] * step)
+        return np.sum(np.maximum(diff, 0.0), axis=-1)
+
+    # Airborne: deviation(lo) = 0 <= 32 and grows with the shift; find the last shift still <= 32.
+    # Impact:   deviation(hi) = 0 <= 32 and shrinks with the shift; find the first shift <= 32.
+    if airborne:
+        hi = np.maximum(hi, lo + 1)
+        while True:
+            open_ = hi - lo > 1
+            if not open_.any():
+                return lo
+            mid = np.floor((lo + hi) / 2)
+            ok = deviation(mid) <= MAX_UNFAVOURABLE_DEVIATION
+            lo = np.where(open_ & ok, mid, lo)
+            hi = np.where(open_ & ~ok, mid, hi)
+    lo = np.minimum(lo, hi - 1)
+    while True:
+        open_ = hi - lo > 1
+        if not open_.any():
+            return hi
+        mid = np.floor((lo + hi) / 2)
+        ok = deviation(mid) <= MAX_UNFAVOURABLE_DEVIATION
+        hi = np.where(open_ & ok, mid, hi)
+        lo = np.where(open_ & ~ok, mid, lo)
+
+
+def _check_bands(spectra, bands):
+    spectra = np.asarray(spectra, dtype=float)
+    bands = tuple(bands)
+    if spectra.shape[-1] != len(bands):
+        raise ValueError(f"Spectra have {spectra.shape[-1]} bands, expected {len(bands)}")
+    if not set(BANDS_STANDARD).issubset(bands):
+        raise ValueError("Ratings need at least the 1/3-octave bands 100-3150 Hz")
+    return spectra, bands
+
+
+# --- ISO 717-1: R_w (or R'_w) with C, C_tr and, for 50-5000 Hz spectra, C_50-3150 ... C_tr,50-5000 ---
+def rate_airborne(spectra, bands=BANDS_STANDARD, step=1.0):
+    spectra, bands = _check_bands(spectra, bands)
+    standard = spectra[..., _band_slice(bands, 100, 3150)]
+    shift = _shift_reference(standard, REFERENCE_AIRBORNE, airborne=True, step=step)
+    R_w = REFERENCE_AIRBORNE[7] + shift * step
+    valid = np.all(np.isfinite(standard), axis=-1)
+
+    def adaptation(spectrum, low, high):
+        part = _band_slice(bands, low, high)
+        full = _band_slice(BANDS_EXTENDED, low, high)
+        with np.errstate(over='ignore'):
+            X_A = -10 * np.log10(np.sum(10 ** ((spectrum[full] - spectra[..., part]) / 10), axis=-1))
+        return np.round(X_A - R_w) + 0.0  # + 0.0 turns -0.0 into 0.0
+
+    out = {'R_w': R_w, 'C': adaptation(SPECTRUM_1, 100, 3150), 'C_tr': adaptation(SPECTRUM_2, 100, 3150)}
+    if bands[0] <= 50 and bands[-1] >= 5000:
+        out['C_50_3150'] = adaptation(SPECTRUM_1, 50, 3150)
+        out['C_tr_50_3150'] = adaptation(SPECTRUM_2, 50, 3150)
+        out['C_50_5000'] = adaptation(SPECTRUM_1_5000, 50, 5000)
+        out['C_tr_50_5000'] = adaptation(SPECTRUM_2, 50, 5000)
+    return {name: np.where(valid, value, np.nan) for name, value in out.items()}
+
+
+# --- ISO 717-2: L_n,w (or L'n,w) with C_I and, for spectra from 50 Hz, C_I,50-2500 ---
+def rate_impact(spectra, bands=BANDS_STANDARD, step=1.0):
+    spectra, bands = _check_bands(spectra, bands)
+    standard = spectra[..., _band_slice(bands, 100, 3150)]
+    shift = _shift_reference(standard, REFERENCE_IMPACT, airborne=False, step=step)
+    L_nw = REFERENCE_IMPACT[7] + shift * step
+    valid = np.all(np.isfinite(standard), axis=-1)
+
+    def adaptation(low):
+        part = _band_slice(bands, low, 2500)
+        with np.errstate(over='ignore'):
+            L_sum = 10 * np.log10(np.sum(10 ** (spectra[..., part] / 10), axis=-1))
+        return np.round(L_sum - 15 - L_nw) + 0.0
+
+    out = {'L_nw': L_nw, 'C_I': adaptation(100)}
+    if bands[0] <= 50:
+        out['C_I_50_2500'] = adaptation(50)
+    return {name: np.where(valid, value, np.nan) for name, value in out.items()}
+
+
+# --- Shifted reference curve (100-3150 Hz) for plotting a rated spectrum ---
+def shifted_reference(formula, rating):
+    if formula == 'airborne':
+        return REFERENCE_AIRBORNE + (np.asarray(rating, dtype=float)[..., None] - REFERENCE_AIRBORNE[7])
+    return REFERENCE_IMPACT + (np.asarray(rating, dtype=float)[..., None] - REFERENCE_IMPACT[7])
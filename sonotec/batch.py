@@ -0,0 +1,161 @@
+"""Chunked file processing for project path tables (CSV, XLSX, Parquet)."""
+import gzip
+import itertools
+import os
+import sys
+import time
+from contextlib import ExitStack
+
+import pandas as pd
+
+from sonotec.core import AIRBORNE_COLUMNS, IMPACT_COLUMNS, calculate_airborne_table, calculate_impact_table
+from sonotec.validation import validate_paths, describe_codes, summarize, combine_summaries, summary_rows
+
+
+# --- Bulk upload: read a path file in bounded-memory chunks ---
+BULK_CHUNK_ROWS = 50_000
+# Rows with validation findings kept as examples for the bulk upload summary
+ISSUE_EXAMPLES = 50
+
+def read_path_chunks(file, file_name, chunk_rows=BULK_CHUNK_ROWS):
+    extension = os.path.splitext(file_name)[1].lower()
+
+    if extension == '.csv':
+        yield from pd.read_csv(file, chunksize=chunk_rows)
+
+    elif extension == '.parquet':
+        import pyarrow.parquet as pq  # optional dependency, only needed for Parquet
+        for batch in pq.ParquetFile(file).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+
+    elif extension == '.xlsx':
+        import openpyxl  # optional dependency, only needed for Excel
+        workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            columns = [str(c) for c in next(rows, ())]
+            buffer = []
+            for values in rows:
+                buffer.append(values)
+                if len(buffer) == chunk_rows:
+                    yield pd.DataFrame(buffer, columns=columns)
+                    buffer = []
+            if buffer:
+                yield pd.DataFrame(buffer, columns=columns)
+        finally:
+            workbook.close()
+
+    else:
+        raise ValueError(f"Unsupported file type '{extension}'. Please upload a CSV, XLSX or Parquet file.")
+
+# --- Bulk upload: compute one chunk with the airborne or impact engine ---
+def compute_path_chunk(chunk, mode):
+    if mode == 'airborne':
+        columns, result_col, engine = AIRBORNE_COLUMNS, 'R_ij_w', calculate_airborne_table
+    else:
+        columns, result_col, engine = IMPACT_COLUMNS, 'L_nij_w', calculate_impact_table
+
+    missing = [c for c in columns if c not in chunk.columns]
+    if missing:
+        raise ValueError(f"Missing column(s) for {mode} paths: {', '.join(missing)}")
+
+    inputs = chunk[list(columns)].apply(pd.to_numeric, errors='coerce').astype(float)
+    result, valid = engine(inputs)
+    codes, _ = validate_paths(mode, inputs)
+    chunk = chunk.copy()
+    # Inputs as read by the engine, float64 in every chunk (a reader may type one chunk's column as integers)
+    chunk[list(columns)] = inputs
+    chunk[result_col] = result
+    chunk['valid'] = valid
+    # Why a row is invalid (errors) or questionable (warnings), see sonotec.validation
+    chunk['error_code'] = codes
+    chunk['issues'] = describe_codes(mode, codes)
+    return chunk
+
+# --- Bulk upload: detect which formula a file is meant for from its header ---
+def detect_path_mode(columns):
+    columns = set(columns)
+    if columns.issuperset(IMPACT_COLUMNS):
+        return 'impact'
+    if columns.issuperset(AIRBORNE_COLUMNS):
+        return 'airborne'
+    return None
+
+# --- Process peak resident memory in MB (None where the platform can't tell) ---
+def peak_memory_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in kB on Linux and in bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+# --- Parquet schema of a bulk result from its first chunk: inputs and results have fixed types; another
+# column without a value in the first chunk says nothing about its type and is stored as text ---
+def _parquet_schema(table, mode):
+    import pyarrow as pa  # optional dependency, only needed for Parquet
+    typed = {*(AIRBORNE_COLUMNS if mode == 'airborne' else IMPACT_COLUMNS), 'R_ij_w', 'L_nij_w', 'valid', 'error_code'}
+    empty = [f.name for f in table.schema if f.name not in typed and table.column(f.name).null_count == len(table)]
+    if not empty:
+        return table.schema
+    return pa.schema([f.with_type(pa.string()) if f.name in empty else f for f in table.schema])
+
+# --- Bulk upload: stream all chunks through the engine into an output file ---
+def stream_path_file(file, file_name, mode, out_path, out_format, chunk_rows=BULK_CHUNK_ROWS, on_progress=None):
+    chunks = read_path_chunks(file, file_name, chunk_rows)
+    first = next(chunks, None)
+    if first is None:
+        raise ValueError("The uploaded file contains no rows.")
+    if mode == 'auto':
+        mode = detect_path_mode(first.columns)
+        if mode is None:
+            raise ValueError(
+                "Could not detect the path type. Airborne files need the columns "
+                f"{', '.join(AIRBORNE_COLUMNS)}; impact files need {', '.join(IMPACT_COLUMNS)}."
+            )
+
+    rows = invalid = 0
+    summaries, examples = [], []
+    start = time.perf_counter()
+    with ExitStack() as stack:
+        if out_format == 'parquet':
+            import pyarrow as pa  # optional dependency, only needed for Parquet
+            import pyarrow.parquet as pq
+            writer = None
+        else:
+            out_file = stack.enter_context(gzip.open(out_path, 'wt', compresslevel=5, newline=''))
+
+        for chunk in itertools.chain([first], chunks):
+            result = compute_path_chunk(chunk, mode)
+            if out_format == 'parquet':
+                table = pa.Table.from_pandas(result, preserve_index=False)
+                if writer is None:
+                    writer = stack.enter_context(pq.ParquetWriter(out_path, _parquet_schema(table, mode)))
+                if not table.schema.equals(writer.schema):
+                    # The file's schema is the first chunk's; other columns may be typed differently per chunk
+                    try:
+                        table = table.cast(writer.schema)
+                    except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+                        raise ValueError(f"The column types from row {rows + 1:,} on differ from the first rows: {e}")
+                writer.write_table(table)
+            else:
+                result.to_csv(out_file, header=rows == 0, index=False)
+
+            summaries.append(summarize(mode, result['error_code'].to_numpy()))
+            if sum(len(e) for e in examples) < ISSUE_EXAMPLES:
+                # Numbered by position in the file (1 = first data row); chunk indexes differ per reader
+                flagged = (result['error_code'].to_numpy() != 0).nonzero()[0][:ISSUE_EXAMPLES]
+                examples.append(result.iloc[flagged].set_axis(flagged + rows + 1).rename_axis('row'))
+            rows += len(result)
+            invalid += int((~result['valid']).sum())
+            if on_progress is not None:
+                on_progress(rows, time.perf_counter() - start)
+
+    elapsed = time.perf_counter() - start
+    validation = combine_summaries(summaries)
+    return {'mode': mode, 'rows': rows, 'invalid': invalid, 'warnings': validation['warnings'],
+            'issues': summary_rows(mode, validation),
+            'issue_examples': pd.concat(examples).head(ISSUE_EXAMPLES) if examples else None, 'seconds': elapsed,
+            'rows_per_second': rows / elapsed if elapsed > 0 else float('nan'),
+            'peak_memory_mb': peak_memory_mb()}
@@ -0,0 +1,292 @@
+"""Persistent result cache: computed tables on disk, keyed by their content, shared by processes.
+
+An entry is one uncompressed Arrow IPC file named by the sha256 of its key: the normalized input
+table (only the columns a calculation reads, as float64 / str, independent of the file format and
+of how it was split into chunks), the formula fingerprint and the catalog version. Hits are
+memory-mapped: numeric columns come back as read-only arrays on the mapped file (wrap them with
+``copy=False`` to keep it that way), labels and booleans are decoded. Entries survive server restarts;
+the least recently used ones are evicted once the cache outgrows ``max_bytes``.
+
+The formula fingerprint hashes ``sonotec.core.FORMULA_VERSION``, the source of ``sonotec.core`` and
+what the path formulas and the energetic summation return for fixed probe inputs, with one probe row
+per guard, so entries computed with other formulas or guards are never served.
+
+Several processes (server workers, background jobs) may share one directory: files are written to
+a temporary name and renamed into place, and the index is a SQLite database in WAL mode. pyarrow is
+an optional dependency, only needed to read and write entries.
+"""
+import functools
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from contextlib import closing, contextmanager
+
+import numpy as np
+
+from sonotec import core
+from sonotec.core import (
+    AIRBORNE_COLUMNS, IMPACT_COLUMNS, DIRECT_COLUMNS, INPUT_BOUNDS, FORMULA_VERSION, SEPARATION_PATHS, IMPACT_PATHS,
+    calculate_airborne_r_total, calculate_impact_level,
+    calculate_separation_table, calculate_building_impact_table,
+)
+
+CACHE_FORMAT = 1
+DEFAULT_CACHE_DIR = os.environ.get('SONOTEC_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'sonotec-cache'))
+DEFAULT_MAX_BYTES = int(float(os.environ.get('SONOTEC_CACHE_MB', 1024)) * 1024 ** 2)
+# Eviction stops below this share of max_bytes, so a full cache does not evict on every put
+EVICT_TO = 0.9
+# Files without an index row (a process died between writing and indexing) are removed after this
+ORPHAN_SECONDS = 60 * 60
+ENTRY_SUFFIX = '.arrow'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    namespace TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_by_access ON entries (accessed);
+CREATE TABLE IF NOT EXISTS aliases (
+    alias TEXT PRIMARY KEY,
+    key TEXT NOT NULL
+);
+"""
+
+
+# --- Formula fingerprint: formula version, source of sonotec.core and results on fixed probe inputs ---
+# Guarded inputs of the log term and the edge values probed for each of them
+GUARDED_COLUMNS = ('S_s', 'S_i', 'l_0', 'l_f', 'l_ij')
+GUARD_PROBES = (0.0, -1.0, 1e-9, np.inf)
+
+def _probe_inputs(columns, rows, seed):
+    rng = np.random.default_rng(seed)
+    inputs = {c: rng.uniform(*INPUT_BOUNDS.get(c, (0.0, 80.0)), rows) for c in columns}
+    # One row per edge case, otherwise equal to the valid first row, so no other invalid input masks a
+    # change to one guard: NaN in each column, zero / negative / tiny / infinite lengths and areas, and
+    # two negative lengths (a positive log argument)
+    edges = [{c: np.nan} for c in columns]
+    edges += [{c: value} for c in columns if c in GUARDED_COLUMNS for value in GUARD_PROBES]
+    lengths = [c for c in columns if c in GUARDED_COLUMNS and c.startswith('l_')]
+    edges.append(dict.fromkeys(lengths, -1.0))
+    for c in columns:
+        inputs[c] = np.concatenate([inputs[c], [edge.get(c, inputs[c][0]) for edge in edges]])
+    return inputs
+
+# Groups of consecutive rows with one row per path type
+def _labels(n, paths):
+    rows = np.arange(n)
+    return (rows // len(paths)).astype(str), np.asarray(paths)[rows % len(paths)]
+
+@functools.lru_cache(maxsize=None)
+def formula_fingerprint():
+    digest = hashlib.sha256(f'{FORMULA_VERSION}\0'.encode())
+    try:
+        digest.update(inspect.getsource(core).encode())
+    except OSError:
+        # Installed without sources: the version and the probes still apply
+        pass
+    airborne = _probe_inputs(AIRBORNE_COLUMNS + DIRECT_COLUMNS, 32, 12354)
+    impact = _probe_inputs(IMPACT_COLUMNS, 32, 12355)
+    n_airborne, n_impact = len(airborne['l_0']), len(impact['l_0'])
+    results = [
+        [calculate_airborne_r_total({c: airborne[c][i] for c in AIRBORNE_COLUMNS}) for i in range(n_airborne)],
+        [calculate_impact_level({c: impact[c][i] for c in IMPACT_COLUMNS}) for i in range(n_impact)],
+    ]
+    pair, path = _labels(n_airborne, SEPARATION_PATHS)
+    separation = calculate_separation_table({**airborne, 'pair': pair, 'path': path})
+    room, path = _labels(n_impact, IMPACT_PATHS)
+    building_impact = calculate_building_impact_table({**impact, 'room': room, 'path': path})
+    results += [separation['R_w_apparent'], building_impact['Ln_w_apparent'], building_impact['transmission']]
+    for values in results:
+        values = np.asarray(values)
+        digest.update(_column_bytes(values, label=values.dtype.kind not in 'biuf'))
+    return digest.hexdigest()[:16]
+
+
+# --- Normalized column bytes: float64 with one NaN and no -0.0, or NUL-terminated UTF-8 labels ---
+def _column_bytes(values, label=False):
+    if label:
+        return ''.join(f'{v}\0' for v in np.asarray(values).astype(str).tolist()).encode()
+    values = np.asarray(values, dtype=float) + 0.0
+    return np.where(np.isnan(values), np.nan, values).tobytes()
+
+# --- Content hash of a table fed chunk by chunk; neither the chunking nor the column dtypes change it ---
+class TableHasher:
+    def __init__(self, columns, labels=()):
+        self.columns = tuple(labels) + tuple(c for c in columns if c not in labels)
+        self.labels = frozenset(labels)
+        self._digests = {c: hashlib.sha256() for c in self.columns}
+        self._present = dict.fromkeys(self.columns, False)
+        self.rows = 0
+
+    def update(self, chunk):
+        rows = 0
+        for c in self.columns:
+            if c in chunk:
+                self._present[c] = True
+                values = np.asarray(chunk[c])
+                self._digests[c].update(_column_bytes(values, c in self.labels))
+                rows = len(values)
+        self.rows += rows
+
+    def hexdigest(self):
+        digest = hashlib.sha256(f'{self.rows}'.encode())
+        for c in self.columns:
+            digest.update(f'\0{c}\0{self._present[c]:d}'.encode())
+            digest.update(self._digests[c].digest())
+        return digest.hexdigest()
+
+def table_digest(table, columns, labels=()):
+    hasher = TableHasher(columns, labels)
+    hasher.update(table)
+    return hasher.hexdigest()
+
+
+class ResultCache:
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.db_path = os.path.join(directory, 'index.sqlite')
+        with self._db() as db:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.executescript(_SCHEMA)
+
+    # One short-lived connection per operation: safe across threads and processes
+    @contextmanager
+    def _db(self):
+        with closing(sqlite3.connect(self.db_path, timeout=30, isolation_level=None)) as db:
+            yield db
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ENTRY_SUFFIX)
+
+    # --- Keys ---
+    # Content key of a result: calculation name, input table digest, formulas and catalog
+    def key(self, namespace, digest, catalog_version=None):
+        parts = {'format': CACHE_FORMAT, 'namespace': namespace, 'digest': digest,
+                 'formulas': formula_fingerprint(), 'catalog': catalog_version}
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+    # Key of an uploaded file's raw bytes; aliased to the content key once the file was read,
+    # so the same upload is served without parsing it again
+    def source_key(self, namespace, data, file_name, catalog_version=None):
+        extension = os.path.splitext(file_name)[1].lower()
+        return self.key(f'{namespace}:source{extension}', hashlib.sha256(data).hexdigest(), catalog_version)
+
+    def alias(self, alias, key):
+        with self._db() as db:
+            db.execute('INSERT OR REPLACE INTO aliases (alias, key) VALUES (?, ?)', (alias, key))
+
+    # --- Entries: {name: 1-D array} ---
+    def get(self, key):
+        import pyarrow as pa  # optional dependency, only needed for the result cache
+        import pyarrow.ipc as ipc
+
+        with self._db() as db:
+            row = db.execute('SELECT key FROM aliases WHERE alias = ?', (key,)).fetchone()
+            key = row[0] if row else key
+            found = db.execute('UPDATE entries SET accessed = ? WHERE key = ?', (time.time(), key)).rowcount
+        if not found:
+            return None
+        try:
+            reader = ipc.open_file(pa.memory_map(self._path(key)))
+            batch = reader.get_batch(0) if reader.num_record_batches else None
+        except (OSError, pa.ArrowInvalid):
+            # Evicted by another process in the meantime, or a damaged file
+            self._drop([key])
+            return None
+        names = reader.schema.names
+        if batch is None:
+            return {name: np.array([]) for name in names}
+        columns = {}
+        for name, column in zip(names, batch.columns):
+            # Zero-copy for numeric columns (no nulls are ever written); strings and booleans are decoded
+            columns[name] = column.to_numpy(zero_copy_only=False)
+        return columns
+
+    def put(self, key, columns, namespace=''):
+        import pyarrow as pa  # optional dependency, only needed for the result cache
+        import pyarrow.ipc as ipc
+
+        arrays = {}
+        for name, values in columns.items():
+            values = np.asarray(values)
+            arrays[name] = pa.array(values.astype(str) if values.dtype.kind in 'OUS' else values)
+        batch = pa.record_batch(list(arrays.values()), names=list(arrays))
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file, ipc.new_file(file, batch.schema) as writer:
+                writer.write_batch(batch)
+            size = os.path.getsize(tmp_path)
+            # Atomic: readers see the old file or the complete new one, never a partial write
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        now = time.time()
+        with self._db() as db:
+            db.execute('INSERT OR REPLACE INTO entries (key, namespace, size, created, accessed) VALUES (?, ?, ?, ?, ?)',
+                       (key, namespace, size, now, now))
+        self.evict()
+
+    # --- Size bound: least recently used entries first ---
+    def evict(self, max_bytes=None):
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        with self._db() as db:
+            total, = db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()
+            if total <= max_bytes:
+                return 0
+            victims = []
+            for key, size in db.execute('SELECT key, size FROM entries ORDER BY accessed'):
+                if total <= max_bytes * EVICT_TO:
+                    break
+                victims.append(key)
+                total -= size
+        self._drop(victims)
+        self._remove_orphans()
+        return len(victims)
+
+    def _drop(self, keys):
+        with self._db() as db:
+            db.executemany('DELETE FROM entries WHERE key = ?', ((k,) for k in keys))
+            db.executemany('DELETE FROM aliases WHERE key = ?', ((k,) for k in keys))
+        for key in keys:
+            try:
+                # A process that has the file memory-mapped keeps reading it (POSIX)
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def _remove_orphans(self):
+        with self._db() as db:
+            known = {row[0] for row in db.execute('SELECT key FROM entries')}
+        cutoff = time.time() - ORPHAN_SECONDS
+        for name in os.listdir(self.directory):
+            stem, suffix = os.path.splitext(name)
+            if suffix in (ENTRY_SUFFIX, '.tmp') and stem not in known:
+                path = os.path.join(self.directory, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                except OSError:
+                    pass
+
+    def clear(self):
+        with self._db() as db:
+            keys = [row[0] for row in db.execute('SELECT key FROM entries')]
+        self._drop(keys)
+        with self._db() as db:
+            db.execute('DELETE FROM aliases')
+
+    def stats(self):
+        with self._db() as db:
+            entries, size = db.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+        return {'entries': entries, 'bytes': size, 'max_bytes': self.max_bytes, 'directory': self.directory,
+                'formulas': formula_fingerprint()}
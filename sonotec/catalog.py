@@ -0,0 +1,149 @@
+"""SonoTec V2 product catalog with an in-memory index on (junction type, material, load).
+
+All per-variant values are precomputed into dense tables indexed by a key code, so a lookup
+is an array index and comparing every variant across a project is one broadcast operation.
+
+The catalog bundled with the package holds placeholder values (version ``...-placeholder``); point
+``SONOTEC_CATALOG`` at the real catalog file. Results computed from a placeholder catalog are marked
+as such wherever they are shown or written.
+"""
+import csv
+import functools
+import os
+
+import numpy as np
+
+from sonotec.core import FORMULAS
+
+BUNDLED_CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'sonotec_v2_catalog.csv')
+CATALOG_PATH = os.environ.get('SONOTEC_CATALOG', BUNDLED_CATALOG_PATH)
+CATALOG_COLUMNS = ('variant', 'shore_a', 'junction_type', 'material', 'load_min', 'load_max', 'K_ij', 'delta_R', 'cost')
+
+# Formula input replaced by the catalog delta_R, per formula
+VARIANT_DELTA_R_INPUT = {'airborne': 'delta_R_ijw', 'impact': 'delta_R_jw'}
+
+# Versions of catalogs with made-up development values end in this
+PLACEHOLDER_SUFFIX = '-placeholder'
+PLACEHOLDER_NOTICE = 'PLACEHOLDER CATALOG VALUES - NOT FOR PROJECT WORK'
+
+
+def is_placeholder(version):
+    return str(version).endswith(PLACEHOLDER_SUFFIX)
+
+
+# --- Names -> positions via the unique names only (one dict lookup per distinct name, -1 if unknown) ---
+def _index_of(index, names):
+    uniques, inverse = np.unique(np.asarray(names).astype(str), return_inverse=True)
+    positions = np.array([index.get(name, -1) for name in uniques], dtype=np.intp)
+    return positions[inverse.reshape(-1)].reshape(np.shape(names))
+
+
+class ProductCatalog:
+    def __init__(self, rows, version='unversioned'):
+        self.version = version
+        self.placeholder = is_placeholder(version)
+        variants = sorted({(int(r['shore_a']), r['variant']) for r in rows})
+        self.variants = np.array([name for _, name in variants], dtype=object)
+        self.shore_a = np.array([shore for shore, _ in variants])
+        self.junction_types = tuple(sorted({r['junction_type'] for r in rows}))
+        self.materials = tuple(sorted({r['material'] for r in rows}))
+        self._variant_index = {name: i for i, name in enumerate(self.variants)}
+        self._junction_index = {name: i for i, name in enumerate(self.junction_types)}
+        self._material_index = {name: i for i, name in enumerate(self.materials)}
+
+        # Load classes are the intervals between all load range edges of the catalog
+        self.load_edges = np.unique([float(r[c]) for r in rows for c in ('load_min', 'load_max')])
+        n_classes = max(len(self.load_edges) - 1, 0)
+        class_low, class_high = self.load_edges[:-1], self.load_edges[1:]
+
+        # Dense tables (junction, material, load class, variant); NaN where a variant does not apply
+        shape = (len(self.junction_types), len(self.materials), n_classes, len(self.variants))
+        self.K_ij = np.full(shape, np.nan)
+        self.delta_R = np.full(shape, np.nan)
+        self.cost = np.full(shape, np.nan)
+        for r in rows:
+            j = self._junction_index[r['junction_type']]
+            m = self._material_index[r['material']]
+            v = self._variant_index[r['variant']]
+            covered = (class_low >= float(r['load_min'])) & (class_high <= float(r['load_max']))
+            self.K_ij[j, m, covered, v] = float(r['K_ij'])
+            self.delta_R[j, m, covered, v] = float(r['delta_R'])
+            self.cost[j, m, covered, v] = float(r['cost'])
+
+        # Flattened per-key views, shape (n_keys, n_variants), shared read-only by every caller
+        self.n_keys = int(np.prod(shape[:3]))
+        for name in ('K_ij', 'delta_R', 'cost'):
+            table = getattr(self, name).reshape(self.n_keys, len(self.variants))
+            table.flags.writeable = False
+            setattr(self, name, table)
+
+    # --- Load -> load class (-1 outside the catalog range); the top edge belongs to the last class ---
+    def load_class(self, load):
+        load = np.asarray(load, dtype=float)
+        n_classes = len(self.load_edges) - 1
+        classes = np.searchsorted(self.load_edges, load, side='right') - 1
+        classes = np.where(load == self.load_edges[-1], n_classes - 1, classes)
+        return np.where((classes >= 0) & (classes < n_classes), classes, -1)
+
+    # --- (junction type, material, load) -> key code into the per-key tables (-1 if unknown) ---
+    def key_codes(self, junction_type, material, load):
+        junction = _index_of(self._junction_index, junction_type)
+        material = _index_of(self._material_index, material)
+        load_class = self.load_class(load)
+        known = (junction >= 0) & (material >= 0) & (load_class >= 0)
+        n_classes = len(self.load_edges) - 1
+        codes = (junction * len(self.materials) + material) * n_classes + load_class
+        return np.where(known, codes, -1).astype(np.intp)
+
+    # --- Per-key variant values, shape (n, n_variants); rows of unknown keys are all NaN ---
+    def variant_tables(self, codes):
+        codes = np.asarray(codes, dtype=np.intp)
+        known = (codes >= 0)[..., None]
+        safe = np.where(codes >= 0, codes, 0)
+        return tuple(np.where(known, table[safe], np.nan) for table in (self.K_ij, self.delta_R, self.cost))
+
+    # --- Applicable variants for one junction type, material and load ---
+    def lookup(self, junction_type, material, load):
+        K_ij, delta_R, cost = (t[0] for t in self.variant_tables(self.key_codes([junction_type], [material], [load])))
+        applicable = ~np.isnan(K_ij)
+        return {'variant': self.variants[applicable], 'shore_a': self.shore_a[applicable],
+                'K_ij': K_ij[applicable], 'delta_R': delta_R[applicable], 'cost': cost[applicable]}
+
+    # --- Path results for every variant at once, shape (n_paths, n_variants) ---
+    # The catalog K_ij and delta_R replace the path's own values; NaN where a variant does not apply.
+    def compare_variants(self, formula, table, codes):
+        columns, engine = FORMULAS[formula]
+        delta_column = VARIANT_DELTA_R_INPUT[formula]
+        inputs = {c: np.asarray(table[c], dtype=float) for c in columns}
+        inputs['K_ij'] = np.zeros_like(inputs['K_ij'])
+        inputs[delta_column] = np.zeros_like(inputs[delta_column])
+        base, _ = engine(*(inputs[c] for c in columns))
+
+        K_ij, delta_R, _ = self.variant_tables(codes)
+        sign = 1 if formula == 'airborne' else -1
+        return base[:, None] + sign * (K_ij + delta_R)
+
+
+# --- Read the catalog CSV; '#' lines are comments, '# catalog_version: x' sets the version ---
+def read_catalog(path=CATALOG_PATH):
+    version = 'unversioned'
+    with open(path, newline='', encoding='utf-8') as file:
+        lines = []
+        for line in file:
+            if line.startswith('#'):
+                if line[1:].strip().startswith('catalog_version:'):
+                    version = line.split(':', 1)[1].strip()
+                continue
+            lines.append(line)
+    rows = list(csv.DictReader(lines))
+    if rows:
+        missing = [c for c in CATALOG_COLUMNS if c not in rows[0]]
+        if missing:
+            raise ValueError(f"Catalog file is missing column(s): {', '.join(missing)}")
+    return ProductCatalog(rows, version)
+
+
+# --- One shared catalog instance per process ---
+@functools.lru_cache(maxsize=None)
+def load_catalog(path=CATALOG_PATH):
+    return read_catalog(path)
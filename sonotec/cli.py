@@ -0,0 +1,259 @@
+"""Command-line entry point: ``python -m sonotec <command> ...``."""
+import argparse
+import csv
+import os
+import sys
+
+import numpy as np
+
+from sonotec.core import (
+    AIRBORNE_COLUMNS, IMPACT_COLUMNS,
+    calculate_airborne_r_total, calculate_impact_level,
+    calculate_separation_paths, combine_airborne_paths,
+    calculate_impact_paths, combine_impact_paths,
+)
+
+
+# --- Single path: one --<column> option per formula input ---
+def _add_path_inputs(parser, columns):
+    for column in columns:
+        parser.add_argument(f'--{column}', type=float, required=column != 'l_0', default=1.0,
+                            help='reference coupling length in m (default 1.0)' if column == 'l_0' else None)
+
+def _run_airborne(args):
+    R_ij_w = calculate_airborne_r_total({c: getattr(args, c) for c in AIRBORNE_COLUMNS})
+    if np.isnan(R_ij_w):
+        print('Error in calculation: the coupling lengths and the area must be positive.', file=sys.stderr)
+        return 1
+    print(f'R_ij,w = {R_ij_w:.2f} dB')
+    return 0
+
+def _run_impact(args):
+    L_nijw = calculate_impact_level({c: getattr(args, c) for c in IMPACT_COLUMNS})
+    if np.isnan(L_nijw):
+        print('Error in calculation: the coupling lengths and the area must be positive.', file=sys.stderr)
+        return 1
+    print(f'L_n,ij,w = {L_nijw:.2f} dB')
+    return 0
+
+
+# --- Batch: stream a whole path file through the engine ---
+def _run_batch(args):
+    from sonotec.batch import stream_path_file
+
+    out_format = 'parquet' if args.output.endswith('.parquet') else 'csv'
+    with open(args.input, 'rb') as file:
+        stats = stream_path_file(file, args.input, args.mode, args.output, out_format, chunk_rows=args.chunk_rows)
+    peak = 'n/a' if stats['peak_memory_mb'] is None else f"{stats['peak_memory_mb']:.0f} MB"
+    print(f"{stats['rows']:,} {stats['mode']} rows ({stats['invalid']:,} invalid, {stats['warnings']:,} with warnings) "
+          f"in {stats['seconds']:.2f} s, {stats['rows_per_second']:,.0f} rows/s, peak memory {peak}", file=sys.stderr)
+    for issue in stats['issues']:
+        print(f"  {issue['severity']:<8} {issue['rows']:>10,}  {issue['message']}", file=sys.stderr)
+    return 0
+
+
+# --- Summation: R'_w per room pair / L'n,w per receiving room ---
+def _read_keyed_paths(path, key, compute):
+    from sonotec.batch import read_path_chunks
+
+    key_parts, value_parts, direct_parts = [], [], []
+    with open(path, 'rb') as file:
+        for chunk in read_path_chunks(file, path):
+            missing = [c for c in (key, 'path') if c not in chunk.columns]
+            if missing:
+                raise ValueError(f"Missing column(s): {', '.join(missing)}")
+            result = compute(chunk)
+            key_parts.append(chunk[key].astype(str).to_numpy())
+            value_parts.append(result[0])
+            direct_parts.append(result[-1])
+    return np.concatenate(key_parts), np.concatenate(value_parts), np.concatenate(direct_parts)
+
+def _write_columns(columns, output):
+    out = open(output, 'w', newline='') if output else sys.stdout
+    try:
+        writer = csv.writer(out)
+        writer.writerow(columns.keys())
+        writer.writerows(zip(*(np.asarray(v).tolist() for v in columns.values())))
+    finally:
+        if output:
+            out.close()
+
+def _run_separation(args):
+    pair, R_path, _ = _read_keyed_paths(args.input, 'pair', calculate_separation_paths)
+    _write_columns(combine_airborne_paths(pair, R_path), args.output)
+    return 0
+
+def _run_building_impact(args):
+    room, L_path, is_direct = _read_keyed_paths(args.input, 'room', calculate_impact_paths)
+    _write_columns(combine_impact_paths(room, L_path, is_direct), args.output)
+    return 0
+
+
+# --- IFC import: flanking-path table from a building model ---
+def _run_ifc(args):
+    from sonotec.ifc import ifc_path_table
+
+    table, stats = ifc_path_table(args.input, args.formula, args.tolerance)
+    _write_columns(table, args.output)
+    print(f"{stats['lines']:,} lines, {stats['walls']:,} walls, {stats['slabs']:,} slabs "
+          f"({stats['unresolved']:,} without supported geometry), {stats['junctions']:,} junctions, "
+          f"{len(table['path']):,} paths", file=sys.stderr)
+    return 0
+
+
+# --- Bearing assignment: cheapest variant per junction meeting every target ---
+def _run_assign(args):
+    import pandas as pd
+    from sonotec.assignment import AssignmentProblem, optimize_assignment, assignment_tables
+    from sonotec.batch import read_path_chunks
+    from sonotec.catalog import load_catalog
+
+    with open(args.input, 'rb') as file:
+        table = pd.concat(read_path_chunks(file, args.input), ignore_index=True)
+    if 'target' in table:
+        target = pd.to_numeric(table['target'], errors='coerce').fillna(args.target).to_numpy()
+    else:
+        target = args.target
+    catalog = load_catalog()
+    if catalog.placeholder:
+        print(f'Warning: catalog version {catalog.version} holds placeholder values, not product data; '
+              'set SONOTEC_CATALOG to the SonoTec V2 catalog file.', file=sys.stderr)
+    problem = AssignmentProblem(args.formula, table, catalog, target, args.objective)
+    assignment, info = optimize_assignment(problem, args.restarts, args.kicks, args.time_limit, args.workers)
+    junctions, groups, summary = assignment_tables(problem, assignment)
+    _write_columns(junctions, args.output)
+    if args.groups_output:
+        _write_columns(groups, args.groups_output)
+    print(f"{summary['bearings']:,} of {summary['junctions']:,} junctions with a bearing, cost {summary['cost']:,.2f}; "
+          f"{summary['unreachable']:,} of {summary['groups']:,} {problem.key}s cannot reach the target; "
+          f"{info['restarts']} searches on {info['workers']} processes in {info['seconds']:.2f} s", file=sys.stderr)
+    return 0
+
+
+# --- PDF calculation reports: one per room pair / receiving room, or one per project ---
+def _run_report(args):
+    import pandas as pd
+    from sonotec.batch import read_path_chunks
+    from sonotec.report import DEFAULT_ASSET_DIR, generate_reports
+
+    with open(args.input, 'rb') as file:
+        table = pd.concat(read_path_chunks(file, args.input), ignore_index=True)
+    _, stats = generate_reports(args.formula, table, args.output_dir, args.scope, args.project, args.workers,
+                                args.asset_dir or DEFAULT_ASSET_DIR)
+    print(f"{stats['reports']:,} reports ({stats['pages']:,} pages) in {stats['seconds']:.2f} s on {stats['workers']} "
+          f"process(es); {stats['assets_rendered']:,} formula/chart assets rendered, {stats['assets_reused']:,} reused",
+          file=sys.stderr)
+    if stats['watermark']:
+        print('Warning: the path file has K_ij / delta R values from a placeholder catalog (catalog_version); '
+              'every page is marked as not for project work.', file=sys.stderr)
+    return 0
+
+
+# --- Background job workers outside the Streamlit server ---
+def _run_worker(args):
+    from sonotec.jobs import DEFAULT_JOB_DIR, JobQueue
+
+    queue = JobQueue(args.job_dir or DEFAULT_JOB_DIR, args.per_owner)
+    workers = queue.start_workers(args.workers or os.cpu_count() or 1)
+    print(f"{len(workers)} job worker(s) on {queue.db_path}, at most {args.per_owner} running job(s) per owner",
+          file=sys.stderr)
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+# --- HTTP batch API ---
+def _run_serve(args):
+    from sonotec.api import run
+
+    return run(args.host, args.port, args.workers)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m sonotec', description='SonoTec V2 EN ISO 12354 calculations.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    airborne = commands.add_parser('airborne', help='flanking sound reduction index R_ij,w of one path')
+    _add_path_inputs(airborne, AIRBORNE_COLUMNS)
+    airborne.set_defaults(run=_run_airborne)
+
+    impact = commands.add_parser('impact', help='normalized flanking impact level L_n,ij,w of one path')
+    _add_path_inputs(impact, IMPACT_COLUMNS)
+    impact.set_defaults(run=_run_impact)
+
+    batch = commands.add_parser('batch', help='compute every row of a CSV/XLSX/Parquet path file')
+    batch.add_argument('input')
+    batch.add_argument('output', help='output file (.parquet, otherwise gzip-compressed CSV)')
+    batch.add_argument('--mode', choices=['auto', 'airborne', 'impact'], default='auto')
+    batch.add_argument('--chunk-rows', type=int, default=50_000)
+    batch.set_defaults(run=_run_batch)
+
+    separation = commands.add_parser('separation', help="apparent R'_w per room pair (Dd + flanking paths)")
+    separation.add_argument('input')
+    separation.add_argument('-o', '--output', help='CSV output file (default: stdout)')
+    separation.set_defaults(run=_run_separation)
+
+    building_impact = commands.add_parser('building-impact', help="apparent L'n,w per receiving room")
+    building_impact.add_argument('input')
+    building_impact.add_argument('-o', '--output', help='CSV output file (default: stdout)')
+    building_impact.set_defaults(run=_run_building_impact)
+
+    ifc = commands.add_parser('ifc', help='flanking-path table (areas, junction lengths) from an IFC model')
+    ifc.add_argument('input')
+    ifc.add_argument('-o', '--output', help='CSV output file (default: stdout)')
+    ifc.add_argument('--formula', choices=['airborne', 'impact'], default='airborne',
+                     help='separation table (airborne) or building impact table (impact)')
+    ifc.add_argument('--tolerance', type=float, default=0.02, help='gap in m up to which elements touch')
+    ifc.set_defaults(run=_run_ifc)
+
+    assign = commands.add_parser('assign', help='cheapest bearing variant per junction meeting every target')
+    assign.add_argument('input', help="separation (airborne) or building impact path file with a 'junction' column")
+    assign.add_argument('-o', '--output', help='CSV output file per junction (default: stdout)')
+    assign.add_argument('--groups-output', help='CSV output file per room pair / receiving room')
+    assign.add_argument('--formula', choices=['airborne', 'impact'], default='airborne')
+    assign.add_argument('--target', type=float, required=True,
+                        help="minimum R'_w (airborne) or maximum L'n,w (impact) in dB; a 'target' column overrides it")
+    assign.add_argument('--objective', choices=['cost', 'count'], default='cost',
+                        help='minimize material cost (catalog cost x junction length) or the number of bearings')
+    assign.add_argument('--restarts', type=int, help='independent searches (default: CPU count)')
+    assign.add_argument('--kicks', type=int, default=100, help='perturbations per search')
+    assign.add_argument('--time-limit', type=float, help='seconds per search')
+    assign.add_argument('--workers', type=int, help='worker processes (default: CPU count)')
+    assign.set_defaults(run=_run_assign)
+
+    report = commands.add_parser('report', help='PDF calculation reports with the substituted formulas')
+    report.add_argument('input', help='separation (airborne) or building impact path file')
+    report.add_argument('-o', '--output-dir', default='reports')
+    report.add_argument('--formula', choices=['airborne', 'impact'], default='airborne')
+    report.add_argument('--scope', choices=['group', 'project'], default='group',
+                        help='one PDF per room pair / receiving room (group) or one for the whole file (project)')
+    report.add_argument('--project', default='Project', help='project name on every page and in the file names')
+    report.add_argument('--workers', type=int, help='worker processes (default: CPU count)')
+    report.add_argument('--asset-dir', help='cache of rendered formulas and charts shared between runs')
+    report.set_defaults(run=_run_report)
+
+    worker = commands.add_parser('worker', help='run background jobs submitted from the app (see sonotec/jobs.py)')
+    worker.add_argument('--workers', type=int, help='worker processes (default: CPU count)')
+    worker.add_argument('--per-owner', type=int, default=1, help='running jobs per owner (user) at most')
+    worker.add_argument('--job-dir', default=None, help='job database and files (default: $SONOTEC_JOB_DIR or the temp directory)')
+    worker.set_defaults(run=_run_worker)
+
+    serve = commands.add_parser('serve', help='local HTTP/JSON batch API (see sonotec/api.py)')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8502)
+    serve.add_argument('--workers', type=int, help='worker processes for large batches (default: CPU count)')
+    serve.set_defaults(run=_run_serve)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.run(args)
+    except (OSError, ValueError) as e:
+        print(f'Error in calculation: {e}', file=sys.stderr)
+        return 1
@@ -0,0 +1,216 @@
+"""Headless EN ISO 12354 calculation core: path formulas and energetic summation.
+
+Imports only NumPy, so it can be used from batch jobs and services without Streamlit or pandas.
+"""
+import numpy as np
+
+# Version of the formulas and guards in this module; bump it with every change to a result. It is
+# part of the result cache keys (sonotec.cache), together with a hash of this file.
+FORMULA_VERSION = 2
+
+# --- Column sets used by the vectorized engine ---
+AIRBORNE_COLUMNS = ('R_iw', 'R_jw', 'delta_R_ijw', 'K_ij', 'S_s', 'l_0', 'l_f')
+IMPACT_COLUMNS = ('L_neq0w', 'delta_Lw', 'R_iw', 'R_jw', 'delta_R_jw', 'K_ij', 'S_i', 'l_0', 'l_ij')
+
+
+# --- Shared log term 10*log10(S / (l_0 * l)) over whole columns ---
+def _coupling_log_term(S, l_0, l):
+    S = np.asarray(S, dtype=float)
+    l_0 = np.asarray(l_0, dtype=float)
+    l = np.asarray(l, dtype=float)
+
+    # Same guards as the row functions: l_0 == 0, l == 0, S <= 0, log argument <= 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_arg = S / (l_0 * l)
+        valid = (l_0 != 0) & (l != 0) & (S > 0) & (log_arg > 0)
+        log_term = 10 * np.log10(np.where(valid, log_arg, 1.0))
+    return log_term, valid
+
+
+# --- Vectorized AIRBORNE engine: whole columns in, (R_Total, valid) out ---
+def calculate_airborne_r_total_vectorized(R_iw, R_jw, delta_R_ijw, K_ij, S_s, l_0, l_f):
+    log_term, valid = _coupling_log_term(S_s, l_0, l_f)
+    with np.errstate(over='ignore', invalid='ignore'):
+        R_Total = ((np.asarray(R_iw, dtype=float) + np.asarray(R_jw, dtype=float)) / 2) \
+            + np.asarray(delta_R_ijw, dtype=float) + np.asarray(K_ij, dtype=float) + log_term
+    # Overflowing and infinite results are invalid too, and like every invalid row come back as NaN
+    ok = valid & np.isfinite(R_Total)
+    return np.where(ok, R_Total, np.nan), ok
+
+# --- Vectorized IMPACT engine: whole columns in, (L_nijw, valid) out ---
+def calculate_impact_level_vectorized(L_neq0w, delta_Lw, R_iw, R_jw, delta_R_jw, K_ij, S_i, l_0, l_ij):
+    log_term, valid = _coupling_log_term(S_i, l_0, l_ij)
+    with np.errstate(over='ignore', invalid='ignore'):
+        L_nijw = np.asarray(L_neq0w, dtype=float) - np.asarray(delta_Lw, dtype=float) \
+            + ((np.asarray(R_iw, dtype=float) - np.asarray(R_jw, dtype=float)) / 2) \
+            - np.asarray(delta_R_jw, dtype=float) - np.asarray(K_ij, dtype=float) - log_term
+    ok = valid & np.isfinite(L_nijw)
+    return np.where(ok, L_nijw, np.nan), ok
+
+# --- Table helpers: any DataFrame / mapping holding the engine columns ---
+def calculate_airborne_table(table):
+    return calculate_airborne_r_total_vectorized(*(table[c] for c in AIRBORNE_COLUMNS))
+
+def calculate_impact_table(table):
+    return calculate_impact_level_vectorized(*(table[c] for c in IMPACT_COLUMNS))
+
+
+# --- Formula registry: name -> (input columns, vectorized engine) ---
+FORMULAS = {
+    'airborne': (AIRBORNE_COLUMNS, calculate_airborne_r_total_vectorized),
+    'impact': (IMPACT_COLUMNS, calculate_impact_level_vectorized),
+}
+
+# --- Input ranges accepted by the calculator number_inputs (min, max) ---
+INPUT_BOUNDS = {
+    'R_iw': (0.0, 80.0),
+    'R_jw': (0.0, 80.0),
+    'delta_R_ijw': (0.0, 50.0),
+    'K_ij': (0.0, 50.0),
+    'S_s': (0.01, 100.0),
+    'l_0': (0.1, 10.0),
+    'l_f': (0.01, 10.0),
+    'L_neq0w': (0.0, 120.0),
+    'delta_Lw': (0.0, 50.0),
+    'delta_R_jw': (0.0, 50.0),
+    'S_i': (0.01, 100.0),
+    'l_ij': (0.01, 10.0),
+}
+
+
+# --- Calculation function for AIRBORNE sound (single row, thin wrapper) ---
+def calculate_airborne_r_total(row):
+    R_Total, _ = calculate_airborne_r_total_vectorized(*(row[c] for c in AIRBORNE_COLUMNS))
+    return R_Total[()]
+
+# --- Calculation function for IMPACT sound (single row, thin wrapper) ---
+def calculate_impact_level(row):
+    L_nijw, _ = calculate_impact_level_vectorized(*(row[c] for c in IMPACT_COLUMNS))
+    return L_nijw[()]
+
+# --- Group keys -> dense integer codes (one sort, no per-group Python loop) ---
+def _group_codes(keys):
+    uniques, codes = np.unique(np.asarray(keys), return_inverse=True)
+    return uniques, codes.reshape(-1)
+
+# --- Energetic sum of dB values per group, log-sum-exp style ---
+# sign = -1 combines transmission (R values: -10*log10(sum 10^(-R/10))),
+# sign = +1 combines levels (L values: 10*log10(sum 10^(L/10))).
+# A group with any non-finite member is returned as NaN. Rows outside the optional
+# include mask do not contribute at all; a group with no included rows is NaN.
+def _energetic_sum(codes, n_groups, values, sign, include=None):
+    exponent = sign * np.asarray(values, dtype=float) / 10
+    finite = np.isfinite(exponent)
+    if include is not None:
+        finite = finite | ~include
+        exponent = np.where(include, exponent, np.nan)
+    exponent = np.where(finite & ~np.isnan(exponent), exponent, -np.inf)
+    finite_rows = finite if include is None else finite & include
+
+    # Shift every group by its largest exponent so 10**x never overflows or underflows to 0
+    peak = np.full(n_groups, -np.inf)
+    np.maximum.at(peak, codes, exponent)
+    with np.errstate(invalid='ignore'):
+        scaled = np.where(finite_rows, 10 ** (exponent - peak[codes]), 0.0)
+    total = np.bincount(codes, weights=scaled, minlength=n_groups)
+
+    invalid = np.bincount(codes, weights=~finite, minlength=n_groups) > 0
+    valid = ~invalid & (total > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        combined = sign * 10 * (peak + np.log10(total))
+    return np.where(valid, combined, np.nan), valid
+
+
+# --- SEPARATION (EN ISO 12354-1): direct path Dd plus flanking paths Ff, Fd, Df ---
+SEPARATION_PATHS = ('Dd', 'Ff', 'Fd', 'Df')
+DIRECT_COLUMNS = ('R_sw', 'delta_R_Ddw')
+
+# Formula 19: R_Dd,w = R_s,w + delta_R_Dd,w
+def calculate_direct_r_vectorized(R_sw, delta_R_Ddw):
+    with np.errstate(over='ignore', invalid='ignore'):
+        R_Ddw = np.asarray(R_sw, dtype=float) + np.asarray(delta_R_Ddw, dtype=float)
+    ok = np.isfinite(R_Ddw)
+    return np.where(ok, R_Ddw, np.nan), ok
+
+# --- R_ij,w for every row of a separation table (Dd rows use Formula 19, the rest Formula 20) ---
+def calculate_separation_paths(table):
+    path = np.asarray(table['path']).astype(str)
+    is_direct = path == 'Dd'
+    is_flanking = np.isin(path, SEPARATION_PATHS[1:])
+    R_path = np.full(len(path), np.nan)
+
+    if is_direct.any():
+        missing = [c for c in DIRECT_COLUMNS if c not in table]
+        if missing:
+            raise ValueError(f"Missing column(s) for Dd paths: {', '.join(missing)}")
+        R_Ddw, _ = calculate_direct_r_vectorized(*(np.asarray(table[c], dtype=float)[is_direct] for c in DIRECT_COLUMNS))
+        R_path[is_direct] = R_Ddw
+
+    if is_flanking.any():
+        missing = [c for c in AIRBORNE_COLUMNS if c not in table]
+        if missing:
+            raise ValueError(f"Missing column(s) for flanking paths: {', '.join(missing)}")
+        R_ijw, _ = calculate_airborne_r_total_vectorized(*(np.asarray(table[c], dtype=float)[is_flanking] for c in AIRBORNE_COLUMNS))
+        R_path[is_flanking] = R_ijw
+
+    # Rows with an unknown path label stay NaN and invalidate their pair
+    return R_path, np.isfinite(R_path)
+
+# --- Apparent R'_w = -10*log10(sum 10^(-R/10)) per room pair ---
+def combine_airborne_paths(pair, R_path):
+    pairs, codes = _group_codes(pair)
+    R_apparent, valid = _energetic_sum(codes, len(pairs), R_path, sign=-1)
+    n_paths = np.bincount(codes, minlength=len(pairs))
+    return {'pair': pairs, 'R_w_apparent': R_apparent, 'n_paths': n_paths, 'valid': valid}
+
+def calculate_separation_table(table):
+    R_path, _ = calculate_separation_paths(table)
+    return combine_airborne_paths(table['pair'], R_path)
+
+# --- BUILDING IMPACT (EN ISO 12354-2): direct path d plus flanking paths ij per receiving room ---
+IMPACT_PATHS = ('d', 'ij', 'Df', 'DFf')
+IMPACT_DIRECT_COLUMNS = ('L_neq0w', 'delta_Lw', 'delta_R_jw')
+
+# L_n,d,w = L_n,eq,0,w - delta_L_w - delta_L_d,w (delta_R_jw holds the lining on the receiving side)
+def calculate_direct_impact_vectorized(L_neq0w, delta_Lw, delta_R_jw):
+    with np.errstate(over='ignore', invalid='ignore'):
+        L_ndw = np.asarray(L_neq0w, dtype=float) - np.asarray(delta_Lw, dtype=float) - np.asarray(delta_R_jw, dtype=float)
+    ok = np.isfinite(L_ndw)
+    return np.where(ok, L_ndw, np.nan), ok
+
+# --- L_n,ij,w for every row of a building impact table (d rows are the direct path) ---
+def calculate_impact_paths(table):
+    path = np.asarray(table['path']).astype(str)
+    is_direct = path == 'd'
+    is_flanking = np.isin(path, IMPACT_PATHS[1:])
+    L_path = np.full(len(path), np.nan)
+
+    if is_direct.any():
+        missing = [c for c in IMPACT_DIRECT_COLUMNS if c not in table]
+        if missing:
+            raise ValueError(f"Missing column(s) for direct impact paths: {', '.join(missing)}")
+        L_ndw, _ = calculate_direct_impact_vectorized(*(np.asarray(table[c], dtype=float)[is_direct] for c in IMPACT_DIRECT_COLUMNS))
+        L_path[is_direct] = L_ndw
+
+    if is_flanking.any():
+        missing = [c for c in IMPACT_COLUMNS if c not in table]
+        if missing:
+            raise ValueError(f"Missing column(s) for flanking impact paths: {', '.join(missing)}")
+        L_nijw, _ = calculate_impact_level_vectorized(*(np.asarray(table[c], dtype=float)[is_flanking] for c in IMPACT_COLUMNS))
+        L_path[is_flanking] = L_nijw
+
+    return L_path, np.isfinite(L_path), is_direct
+
+# --- Apparent L'n,w = 10*log10(10^(Ln,d/10) + sum 10^(Ln,ij/10)) per receiving room ---
+# Rooms with a direct path are vertical transmission; rooms reached only by flanking paths are diagonal.
+def combine_impact_paths(room, L_path, is_direct):
+    rooms, codes = _group_codes(room)
+    L_apparent, valid = _energetic_sum(codes, len(rooms), L_path, sign=1)
+    n_paths = np.bincount(codes, minlength=len(rooms))
+    has_direct = np.bincount(codes, weights=is_direct, minlength=len(rooms)) > 0
+    return {'room': rooms, 'Ln_w_apparent': L_apparent, 'n_paths': n_paths,
+            'transmission': np.where(has_direct, 'vertical', 'diagonal'), 'valid': valid}
+
+def calculate_building_impact_table(table):
+    L_path, _, is_direct = calculate_impact_paths(table)
+    return combine_impact_paths(table['room'], L_path, is_direct)
@@ -0,0 +1,385 @@
+"""Streaming IFC (ISO 10303-21 STEP) import: wall / slab areas and junction lengths.
+
+The file is read once, line by line. Only the entity types needed for walls, slabs, their
+placements, extruded body geometry and base quantities are kept; Cartesian points and directions
+go into flat arrays with a sorted id index, so a 1 GB model does not become millions of Python
+objects. Elements are reduced to world-space bounding boxes, junctions are found by a sort-and-sweep
+over the boxes, and the junctions are turned into a flanking-path table for the separation or
+building impact calculators (acoustic inputs are left empty for the user to fill in).
+
+Supported body geometry: IfcExtrudedAreaSolid with a rectangle or polyline profile, also inside
+IfcBooleanClippingResult. Elements with other geometry keep their area from the base quantities
+(if any) but take part in no junction.
+"""
+import re
+from array import array
+
+import numpy as np
+
+from sonotec.core import AIRBORNE_COLUMNS, DIRECT_COLUMNS, IMPACT_COLUMNS, IMPACT_DIRECT_COLUMNS
+
+ELEMENT_KINDS = {
+    'IFCWALL': 'wall', 'IFCWALLSTANDARDCASE': 'wall', 'IFCWALLELEMENTEDCASE': 'wall',
+    'IFCSLAB': 'slab', 'IFCSLABSTANDARDCASE': 'slab', 'IFCSLABELEMENTEDCASE': 'slab',
+}
+POINT_TYPES = {b'IFCCARTESIANPOINT', b'IFCDIRECTION'}
+INDEXED_TYPES = {kind.encode() for kind in ELEMENT_KINDS} | {
+    b'IFCLOCALPLACEMENT', b'IFCAXIS2PLACEMENT3D', b'IFCAXIS2PLACEMENT2D',
+    b'IFCPRODUCTDEFINITIONSHAPE', b'IFCSHAPEREPRESENTATION',
+    b'IFCEXTRUDEDAREASOLID', b'IFCBOOLEANCLIPPINGRESULT', b'IFCBOOLEANRESULT',
+    b'IFCRECTANGLEPROFILEDEF', b'IFCARBITRARYCLOSEDPROFILEDEF', b'IFCPOLYLINE',
+    b'IFCRELDEFINESBYPROPERTIES', b'IFCELEMENTQUANTITY', b'IFCQUANTITYAREA', b'IFCSIUNIT',
+}
+SI_PREFIXES = {None: 1.0, 'MILLI': 1e-3, 'CENTI': 1e-2, 'DECI': 1e-1, 'KILO': 1e3}
+# Base quantity names holding the acoustically relevant area, in order of preference
+AREA_QUANTITIES = {'wall': ('NetSideArea', 'GrossSideArea'), 'slab': ('NetArea', 'GrossArea')}
+
+JUNCTION_TOLERANCE = 0.02   # m, boxes closer than this touch
+EDGE_CLUSTER_GAP = 0.5      # m, junctions of one element further apart than this are separate edges
+
+
+# --- STEP argument lists: refs -> int, numbers -> float, strings / enums -> str, $ / * -> None ---
+_TOKEN = re.compile(r"""\s*(?:#(\d+)|'((?:[^']|'')*)'|\.([A-Z_][A-Z0-9_]*)\.|([-+]?\d+\.?\d*(?:[Ee][-+]?\d+)?)"""
+                    r"""|([$*])|([A-Z][A-Z0-9_]*)\s*\(|(\()|(\))|,)""")
+
+def parse_arguments(text):
+    stack = [([], False)]
+    for match in _TOKEN.finditer(text):
+        ref, string, enum, number, empty, typed, opened, closed = match.groups()
+        values = stack[-1][0]
+        if ref is not None:
+            values.append(int(ref))
+        elif string is not None:
+            values.append(string.replace("''", "'"))
+        elif enum is not None:
+            values.append(enum)
+        elif number is not None:
+            values.append(float(number))
+        elif empty is not None:
+            values.append(None)
+        elif typed is not None or opened is not None:
+            # Typed values such as IFCLABEL('x') collapse to their single value
+            stack.append(([], typed is not None))
+        elif closed is not None and len(stack) > 1:
+            inner, is_typed = stack.pop()
+            stack[-1][0].append(inner[0] if is_typed and inner else inner)
+    return stack[0][0]
+
+
+class IfcModel:
+    def __init__(self):
+        self.entities = {}
+        self.length_scale = 1.0
+        self.area_scale = 1.0
+        self.lines = 0
+        self._point_ids = array('q')
+        self._point_xyz = array('d')
+
+    # --- Single pass over the DATA section ---
+    def read(self, file):
+        pending = b''
+        point_ids, point_xyz, entities = self._point_ids, self._point_xyz, self.entities
+        for raw in file:
+            self.lines += 1
+            if pending:
+                raw = pending + raw
+            line = raw.strip()
+            if not line.endswith(b';'):
+                # Entities may span several lines; a line of only a comment or header is dropped
+                pending = raw if line[:1] == b'#' or pending else b''
+                continue
+            pending = b''
+            if line[:1] != b'#':
+                continue
+            eq = line.find(b'=')
+            paren = line.find(b'(', eq)
+            kind = line[eq + 1:paren].strip()
+
+            if kind in POINT_TYPES:
+                coords = line[paren + 1:line.rfind(b')')].strip(b'() ').split(b',')
+                point_ids.append(int(line[1:eq]))
+                point_xyz.extend((float(coords[0]), float(coords[1]) if len(coords) > 1 else 0.0,
+                                  float(coords[2]) if len(coords) > 2 else 0.0))
+            elif kind in INDEXED_TYPES:
+                args = parse_arguments(line[paren + 1:line.rfind(b')')].decode('latin-1'))
+                entities[int(line[1:eq])] = (kind.decode(), args)
+
+        ids = np.frombuffer(point_ids, dtype=np.int64) if point_ids else np.empty(0, dtype=np.int64)
+        xyz = np.frombuffer(point_xyz, dtype=float).reshape(-1, 3)
+        # Exporters write ids in increasing order; only sort (and copy) when they did not
+        if len(ids) > 1 and not (ids[1:] > ids[:-1]).all():
+            order = np.argsort(ids, kind='stable')
+            ids, xyz = ids[order], xyz[order]
+        self.point_ids, self.point_xyz = ids, xyz
+        self._read_units()
+        return self
+
+    def _read_units(self):
+        for kind, args in self.entities.values():
+            if kind == 'IFCSIUNIT' and args[1] in ('LENGTHUNIT', 'AREAUNIT'):
+                scale = SI_PREFIXES.get(args[2], 1.0)
+                if args[1] == 'LENGTHUNIT':
+                    self.length_scale = scale
+                else:
+                    self.area_scale = scale ** 2
+
+    def point(self, ref, default=(0.0, 0.0, 0.0)):
+        if ref is None:
+            return np.array(default, dtype=float)
+        k = np.searchsorted(self.point_ids, ref)
+        if k == len(self.point_ids) or self.point_ids[k] != ref:
+            raise KeyError(f'#{ref} is not a point or direction')
+        return self.point_xyz[k]
+
+    # --- Placements -> 4x4 matrices (project length units) ---
+    def axis_placement(self, ref):
+        matrix = np.eye(4)
+        if ref is None:
+            return matrix
+        kind, args = self.entities[ref]
+        if kind == 'IFCAXIS2PLACEMENT2D':
+            z, x = np.array([0.0, 0.0, 1.0]), self.point(args[1] if len(args) > 1 else None, (1.0, 0.0, 0.0))
+        else:
+            z = self.point(args[1], (0.0, 0.0, 1.0))
+            x = self.point(args[2], (1.0, 0.0, 0.0))
+        z = z / np.linalg.norm(z)
+        x = x - np.dot(x, z) * z
+        x = x / np.linalg.norm(x)
+        matrix[:3, 0], matrix[:3, 1], matrix[:3, 2] = x, np.cross(z, x), z
+        matrix[:3, 3] = self.point(args[0])
+        return matrix
+
+    def world_placement(self, ref, cache):
+        if ref is None:
+            return np.eye(4)
+        if ref not in cache:
+            relative_to, relative = self.entities[ref][1][:2]
+            cache[ref] = self.world_placement(relative_to, cache) @ self.axis_placement(relative)
+        return cache[ref]
+
+    # --- Body geometry -> corner points in the element's coordinate system ---
+    def profile_corners(self, ref):
+        kind, args = self.entities[ref]
+        if kind == 'IFCRECTANGLEPROFILEDEF':
+            half_x, half_y = args[3] / 2, args[4] / 2
+            corners = np.array([[-half_x, -half_y], [half_x, -half_y], [half_x, half_y], [-half_x, half_y]])
+            position = self.axis_placement(args[2])
+        elif kind == 'IFCARBITRARYCLOSEDPROFILEDEF' and self.entities.get(args[2], ('',))[0] == 'IFCPOLYLINE':
+            corners = np.array([self.point(p)[:2] for p in self.entities[args[2]][1][0]])
+            position = np.eye(4)
+        else:
+            return None
+        points = np.column_stack([corners, np.zeros(len(corners)), np.ones(len(corners))])
+        return points @ position.T
+
+    def solid_corners(self, ref):
+        kind, args = self.entities.get(ref, ('', ()))
+        if kind in ('IFCBOOLEANCLIPPINGRESULT', 'IFCBOOLEANRESULT'):
+            return self.solid_corners(args[1])
+        if kind != 'IFCEXTRUDEDAREASOLID':
+            return None
+        base = self.profile_corners(args[0]) if args[0] in self.entities else None
+        if base is None:
+            return None
+        direction = self.point(args[2])
+        top = base.copy()
+        top[:, :3] += direction / np.linalg.norm(direction) * args[3]
+        return np.vstack([base, top]) @ self.axis_placement(args[1]).T
+
+    def body_corners(self, ref):
+        if ref not in self.entities:
+            return None
+        parts = []
+        for representation in self.entities[ref][1][2]:
+            kind, args = self.entities.get(representation, ('', ()))
+            if kind != 'IFCSHAPEREPRESENTATION' or args[1] not in ('Body', None):
+                continue
+            parts.extend(c for c in map(self.solid_corners, args[3]) if c is not None)
+        return np.vstack(parts) if parts else None
+
+    # --- Base quantities: element id -> {quantity name: area in m2} ---
+    def element_areas(self):
+        areas = {}
+        for kind, args in self.entities.values():
+            if kind != 'IFCRELDEFINESBYPROPERTIES':
+                continue
+            quantity_set = self.entities.get(args[5], ('', ()))
+            if quantity_set[0] != 'IFCELEMENTQUANTITY':
+                continue
+            values = {}
+            for q in quantity_set[1][5]:
+                q_kind, q_args = self.entities.get(q, ('', ()))
+                if q_kind == 'IFCQUANTITYAREA' and q_args[3] is not None:
+                    values[q_args[0]] = q_args[3] * self.area_scale
+            for element in args[4]:
+                areas.setdefault(element, {}).update(values)
+        return areas
+
+    # --- Walls and slabs as column arrays with world bounding boxes in m ---
+    def elements(self):
+        quantities = self.element_areas()
+        placements = {}
+        ids, names, kinds, areas, lows, highs, resolved = [], [], [], [], [], [], []
+        for ref, (kind, args) in self.entities.items():
+            element_kind = ELEMENT_KINDS.get(kind)
+            if element_kind is None:
+                continue
+            try:
+                corners = self.body_corners(args[6])
+                if corners is not None:
+                    corners = (corners @ self.world_placement(args[5], placements).T)[:, :3] * self.length_scale
+            except (KeyError, IndexError, TypeError, ValueError, ZeroDivisionError):
+                corners = None
+            low = corners.min(axis=0) if corners is not None else np.full(3, np.nan)
+            high = corners.max(axis=0) if corners is not None else np.full(3, np.nan)
+
+            known = quantities.get(ref, {})
+            area = next((known[q] for q in AREA_QUANTITIES[element_kind] if q in known), None)
+            if area is None:
+                # Without base quantities: the two largest box dimensions
+                area = float(np.prod(np.sort(high - low)[1:]))
+            ids.append(ref)
+            names.append(f"{args[2] or kind.title()} #{ref}")
+            kinds.append(element_kind)
+            areas.append(area)
+            lows.append(low)
+            highs.append(high)
+            resolved.append(corners is not None)
+
+        return {
+            'id': np.array(ids, dtype=np.int64), 'name': np.array(names, dtype=object),
+            'kind': np.array(kinds, dtype=object), 'area': np.array(areas, dtype=float),
+            'low': np.array(lows, dtype=float).reshape(-1, 3), 'high': np.array(highs, dtype=float).reshape(-1, 3),
+            'resolved': np.array(resolved, dtype=bool),
+        }
+
+
+def read_ifc(file):
+    if isinstance(file, str):
+        with open(file, 'rb') as handle:
+            return IfcModel().read(handle)
+    return IfcModel().read(file)
+
+
+# --- Junctions: element pairs whose boxes meet along an edge (sort-and-sweep on x) ---
+def find_junctions(elements, tolerance=JUNCTION_TOLERANCE):
+    usable = np.flatnonzero(elements['resolved'])
+    order = usable[np.argsort(elements['low'][usable, 0], kind='stable')]
+    low, high = elements['low'][order], elements['high'][order]
+    thickness = (high - low).min(axis=1)
+    ends = np.searchsorted(low[:, 0], high[:, 0] + tolerance, side='right')
+
+    a_parts, b_parts, low_parts, high_parts = [], [], [], []
+    for k in range(len(order)):
+        others = np.arange(k + 1, ends[k])
+        if not len(others):
+            continue
+        contact_low = np.maximum(low[k], low[others])
+        contact_high = np.minimum(high[k], high[others])
+        extent = np.sort(contact_high - contact_low, axis=1)
+        # Edge contact: touching, long in one direction and no wider than the thicker element
+        edge = ((extent[:, 0] >= -tolerance) & (extent[:, 2] > tolerance)
+                & (extent[:, 1] <= np.maximum(thickness[k], thickness[others]) + tolerance))
+        a_parts.append(np.full(edge.sum(), order[k]))
+        b_parts.append(order[others[edge]])
+        low_parts.append(contact_low[edge])
+        high_parts.append(contact_high[edge])
+
+    a = np.concatenate(a_parts) if a_parts else np.empty(0, dtype=np.intp)
+    b = np.concatenate(b_parts) if b_parts else np.empty(0, dtype=np.intp)
+    contact_low = np.concatenate(low_parts) if low_parts else np.empty((0, 3))
+    contact_high = np.concatenate(high_parts) if high_parts else np.empty((0, 3))
+    size = contact_high - contact_low
+    return {'a': a, 'b': b, 'low': contact_low, 'high': contact_high,
+            'axis': size.argmax(axis=1), 'length': size.max(axis=1, initial=0.0)}
+
+
+# --- Junctions of one separating element s grouped into edges; partners split by side of s ---
+def _separating_edges(elements, junctions, s, partner, junction, tolerance, edge_gap):
+    low, high = elements['low'], elements['high']
+    thin = int(np.argmin(high[s] - low[s]))
+    axis = junctions['axis'][junction]
+    below = low[partner, thin] < low[s, thin] - tolerance
+    above = high[partner, thin] > high[s, thin] + tolerance
+    keep = (below | above) & (axis != thin)
+
+    edges = []
+    for edge_axis in np.unique(axis[keep]):
+        on_axis = np.flatnonzero(keep & (axis == edge_axis))
+        # Position of the edge in the plane of s, across the edge direction
+        across = 3 - thin - int(edge_axis)
+        center = (junctions['low'][junction[on_axis], across] + junctions['high'][junction[on_axis], across]) / 2
+        order = np.argsort(center, kind='stable')
+        breaks = np.flatnonzero(np.diff(center[order]) > edge_gap) + 1
+        for group in np.split(on_axis[order], breaks):
+            j = junction[group]
+            edges.append(list(zip(partner[group], junctions['low'][j, edge_axis], junctions['high'][j, edge_axis],
+                                  below[group], above[group])))
+    return edges
+
+
+# --- Flanking-path table for the separation ('airborne') or building impact ('impact') calculator ---
+# One pair (airborne) or receiving room (impact) per separating element; coupling lengths in m.
+def flanking_path_table(elements, junctions, formula='airborne', tolerance=JUNCTION_TOLERANCE, edge_gap=EDGE_CLUSTER_GAP):
+    names, areas = elements['name'], elements['area']
+
+    # Junctions of every element, via one sort instead of a scan per element
+    n_junctions = len(junctions['a'])
+    element = np.concatenate([junctions['a'], junctions['b']])
+    partners = np.concatenate([junctions['b'], junctions['a']])
+    junction_ids = np.tile(np.arange(n_junctions), 2)
+    order = np.argsort(element, kind='stable')
+    element, partners, junction_ids = element[order], partners[order], junction_ids[order]
+    starts = np.searchsorted(element, np.arange(len(names) + 1))
+
+    rows = []
+    for s in np.flatnonzero(elements['resolved']):
+        if formula == 'impact' and elements['kind'][s] != 'slab':
+            continue
+        label = names[s]
+        span = slice(starts[s], starts[s + 1])
+        edges = _separating_edges(elements, junctions, s, partners[span], junction_ids[span], tolerance, edge_gap)
+        # Facades, ground slabs and roofs have rooms on one side only and separate nothing
+        sides = {(below, above) for edge in edges for *_, below, above in edge}
+        if not any(below for below, _ in sides) or not any(above for _, above in sides):
+            continue
+        if formula == 'airborne':
+            rows.append((label, 'Dd', label, label, areas[s], np.nan))
+            for edge in edges:
+                source = [(e, lo, hi) for e, lo, hi, below, _ in edge if below]
+                receiving = [(e, lo, hi) for e, lo, hi, _, above in edge if above]
+                for F, lo_F, hi_F in source:
+                    for f, lo_f, hi_f in receiving:
+                        # F and f couple over the part of the edge they share
+                        shared = min(hi_F, hi_f) - max(lo_F, lo_f)
+                        if shared > tolerance:
+                            rows.append((label, 'Ff', names[F], names[f], areas[s], shared))
+                rows.extend((label, 'Fd', names[F], label, areas[s], hi - lo) for F, lo, hi in source)
+                rows.extend((label, 'Df', label, names[f], areas[s], hi - lo) for f, lo, hi in receiving)
+        else:
+            # Impact on slab s reaches the room below through s itself (d) and the walls below it (ij)
+            rows.append((label, 'd', label, label, areas[s], np.nan))
+            for edge in edges:
+                rows.extend((label, 'ij', label, names[j], areas[s], hi - lo) for j, lo, hi, below, _ in edge if below)
+
+    key, area_col, length_col = ('pair', 'S_s', 'l_f') if formula == 'airborne' else ('room', 'S_i', 'l_ij')
+    columns = list(zip(*rows)) if rows else [()] * 6
+    table = {key: np.array(columns[0], dtype=object), 'path': np.array(columns[1], dtype=object),
+             'element_i': np.array(columns[2], dtype=object), 'element_j': np.array(columns[3], dtype=object),
+             area_col: np.array(columns[4], dtype=float), 'l_0': np.ones(len(rows)),
+             length_col: np.array(columns[5], dtype=float)}
+    # Acoustic inputs are not in the model: left empty for the user to fill in
+    inputs = AIRBORNE_COLUMNS + DIRECT_COLUMNS if formula == 'airborne' else IMPACT_COLUMNS + IMPACT_DIRECT_COLUMNS
+    for column in dict.fromkeys(inputs):
+        table.setdefault(column, np.full(len(rows), np.nan))
+    return table
+
+
+def ifc_path_table(file, formula='airborne', tolerance=JUNCTION_TOLERANCE):
+    model = read_ifc(file)
+    elements = model.elements()
+    junctions = find_junctions(elements, tolerance)
+    stats = {'lines': model.lines, 'walls': int((elements['kind'] == 'wall').sum()),
+             'slabs': int((elements['kind'] == 'slab').sum()), 'unresolved': int((~elements['resolved']).sum()),
+             'junctions': len(junctions['a'])}
+    return flanking_path_table(elements, junctions, formula, tolerance), stats
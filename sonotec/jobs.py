@@ -0,0 +1,385 @@
+"""Background jobs: long batch, sweep, Monte Carlo, assignment and report runs in worker processes.
+
+Jobs are rows of a SQLite database (WAL mode) next to one directory per job for its input and
+output files, so they outlive the browser session that submitted them and can be followed from
+any page load that knows the owner token. Worker processes claim queued jobs in a transaction,
+run them and write throttled progress, partial results and the final result (pickled) back.
+Because the database holds pickles, the job directory must be private to the user running the app:
+it is created with mode 0700, and a directory or database owned by another user is refused.
+
+Fairness: a worker only claims a job of an owner that has fewer than ``max_per_owner`` jobs
+running, owners with the fewest running jobs first. Workers run at a lower CPU priority and every
+job runs single-process, so background work never takes more cores than there are workers and
+interactive calculations of the Streamlit server keep precedence.
+
+    python -m sonotec worker --workers 4     # workers outside the Streamlit server
+"""
+import multiprocessing
+import os
+import pickle
+import re
+import shutil
+import sqlite3
+import stat
+import tempfile
+import time
+import uuid
+from contextlib import closing, contextmanager
+
+import numpy as np
+
+DEFAULT_JOB_DIR = os.environ.get('SONOTEC_JOB_DIR', os.path.join(tempfile.gettempdir(), 'sonotec-jobs'))
+ACTIVE_STATES = ('queued', 'running')
+FINISHED_STATES = ('done', 'failed', 'cancelled')
+MAX_RUNNING_PER_OWNER = 1
+# Progress is written (and cancellation checked) at most this often per job
+PROGRESS_INTERVAL = 0.5
+POLL_INTERVAL = 0.5
+WORKER_NICENESS = 10
+# A job whose worker died this many times is failed instead of queued again
+MAX_ATTEMPTS = 3
+JOB_RETENTION_SECONDS = 7 * 24 * 60 * 60
+# Uploaded inputs are saved as input.<extension>; the browser's file name is only used as a label
+INPUT_EXTENSIONS = ('.csv', '.xlsx', '.parquet')
+_FILE_NAME = re.compile(r'[A-Za-z0-9_-]+(\.[A-Za-z0-9]+)*')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    label TEXT NOT NULL,
+    params BLOB NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT,
+    partial BLOB,
+    result BLOB,
+    error TEXT,
+    cancel INTEGER NOT NULL DEFAULT 0,
+    worker INTEGER,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, owner);
+CREATE INDEX IF NOT EXISTS jobs_by_owner ON jobs (owner, created);
+"""
+
+_COLUMNS = ('id', 'owner', 'kind', 'label', 'status', 'progress', 'message', 'error', 'cancel', 'attempts',
+            'created', 'started', 'finished')
+
+
+class JobCancelled(Exception):
+    pass
+
+
+# --- Job directory: anyone who can write the database could make the app unpickle arbitrary data ---
+def _private_directory(directory):
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    if os.name != 'posix':
+        return
+    info = os.lstat(directory)
+    if stat.S_ISLNK(info.st_mode) or info.st_uid != os.getuid():
+        raise PermissionError(f'Job directory {directory} is a link or belongs to another user; '
+                              'set SONOTEC_JOB_DIR to a private directory')
+    if info.st_mode & 0o077:
+        os.chmod(directory, 0o700)
+    for name in ('jobs.sqlite', 'jobs.sqlite-wal', 'jobs.sqlite-shm'):
+        path = os.path.join(directory, name)
+        if os.path.lexists(path) and os.lstat(path).st_uid != os.getuid():
+            raise PermissionError(f'Job database {path} belongs to another user; '
+                                  'set SONOTEC_JOB_DIR to a private directory')
+
+# --- File names inside a job directory: plain names only, never a path ---
+def input_file_name(file_name):
+    extension = os.path.splitext(file_name)[1].lower()
+    if extension not in INPUT_EXTENSIONS:
+        raise ValueError(f"Unsupported file type '{extension}', expected one of {', '.join(INPUT_EXTENSIONS)}")
+    return 'input' + extension
+
+def _checked_name(name):
+    if not _FILE_NAME.fullmatch(name):
+        raise ValueError(f"Invalid file name '{name}' for a job file")
+    return name
+
+
+# --- Handle passed to a running job: progress, partial results and cancellation ---
+class Job:
+    def __init__(self, queue, job_id):
+        self.queue, self.id = queue, job_id
+        self.directory = queue.job_directory(job_id)
+        self._written = 0.0
+
+    def path(self, name):
+        return os.path.join(self.directory, _checked_name(name))
+
+    # fraction None keeps the last fraction (e.g. a file whose length in rows is unknown).
+    # Raises JobCancelled once the job was cancelled.
+    def progress(self, fraction=None, message=None, partial=None):
+        now = time.monotonic()
+        if now - self._written < PROGRESS_INTERVAL and fraction != 1.0:
+            return
+        self._written = now
+        blob = None if partial is None else pickle.dumps(partial, pickle.HIGHEST_PROTOCOL)
+        with self.queue._db() as db:
+            db.execute('UPDATE jobs SET progress = COALESCE(?, progress), message = COALESCE(?, message), '
+                       'partial = COALESCE(?, partial) WHERE id = ?',
+                       (None if fraction is None else float(fraction), message, blob, self.id))
+            cancelled, = db.execute('SELECT cancel FROM jobs WHERE id = ?', (self.id,)).fetchone()
+        if cancelled:
+            raise JobCancelled()
+
+
+class JobQueue:
+    def __init__(self, directory=DEFAULT_JOB_DIR, max_per_owner=MAX_RUNNING_PER_OWNER):
+        _private_directory(directory)
+        self.directory = directory
+        self.db_path = os.path.join(directory, 'jobs.sqlite')
+        self.max_per_owner = max_per_owner
+        self.workers = []
+        with self._db() as db:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.executescript(_SCHEMA)
+
+    # One short-lived connection per operation: safe across the server's threads and the worker processes
+    @contextmanager
+    def _db(self):
+        with closing(sqlite3.connect(self.db_path, timeout=30, isolation_level=None)) as db:
+            yield db
+
+    @contextmanager
+    def _transaction(self):
+        with self._db() as db:
+            db.execute('BEGIN IMMEDIATE')
+            try:
+                yield db
+            except BaseException:
+                db.execute('ROLLBACK')
+                raise
+            db.execute('COMMIT')
+
+    def job_directory(self, job_id):
+        return os.path.join(self.directory, job_id)
+
+    # --- Submitting and following jobs (Streamlit server side) ---
+    # files: {name: bytes} written to the job directory before the job becomes visible to the workers;
+    # names are plain file names such as input_file_name(upload name), never paths
+    def submit(self, owner, kind, params, label='', files=None):
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind '{kind}', expected one of {', '.join(JOB_KINDS)}")
+        files = {_checked_name(name): data for name, data in (files or {}).items()}
+        job_id = uuid.uuid4().hex
+        os.makedirs(self.job_directory(job_id))
+        for name, data in files.items():
+            with open(os.path.join(self.job_directory(job_id), name), 'wb') as file:
+                file.write(data)
+        with self._db() as db:
+            db.execute('INSERT INTO jobs (id, owner, kind, label, params, created) VALUES (?, ?, ?, ?, ?, ?)',
+                       (job_id, owner, kind, label, pickle.dumps(params, pickle.HIGHEST_PROTOCOL), time.time()))
+        return job_id
+
+    def jobs(self, owner):
+        with self._db() as db:
+            rows = db.execute(f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE owner = ? ORDER BY created DESC", (owner,))
+            return [dict(zip(_COLUMNS, row)) for row in rows]
+
+    def active(self, owner):
+        with self._db() as db:
+            count, = db.execute(f"SELECT COUNT(*) FROM jobs WHERE owner = ? AND status IN {ACTIVE_STATES}", (owner,)).fetchone()
+        return count > 0
+
+    def _blob(self, job_id, column):
+        with self._db() as db:
+            row = db.execute(f'SELECT {column} FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return None if row is None or row[0] is None else pickle.loads(row[0])
+
+    def partial(self, job_id):
+        return self._blob(job_id, 'partial')
+
+    def result(self, job_id):
+        return self._blob(job_id, 'result')
+
+    # A queued job is cancelled at once; a running job stops at its next progress report
+    def cancel(self, job_id):
+        with self._db() as db:
+            db.execute("UPDATE jobs SET cancel = 1, status = CASE status WHEN 'queued' THEN 'cancelled' ELSE status END, "
+                       "finished = CASE status WHEN 'queued' THEN ? ELSE finished END "
+                       f"WHERE id = ? AND status IN {ACTIVE_STATES}", (time.time(), job_id))
+
+    def delete(self, job_id):
+        with self._db() as db:
+            deleted = db.execute(f'DELETE FROM jobs WHERE id = ? AND status IN {FINISHED_STATES}', (job_id,)).rowcount
+        if deleted:
+            shutil.rmtree(self.job_directory(job_id), ignore_errors=True)
+        return bool(deleted)
+
+    def prune(self, max_age=JOB_RETENTION_SECONDS):
+        with self._db() as db:
+            old = [row[0] for row in db.execute(f'SELECT id FROM jobs WHERE status IN {FINISHED_STATES} AND finished < ?',
+                                                (time.time() - max_age,))]
+        for job_id in old:
+            self.delete(job_id)
+        return len(old)
+
+    # --- Worker side ---
+    # The next queued job of an owner below the running limit, owners with the fewest running jobs first
+    def claim(self):
+        with self._transaction() as db:
+            row = db.execute(
+                "SELECT id, kind, params FROM jobs AS j WHERE status = 'queued' "
+                "AND (SELECT COUNT(*) FROM jobs WHERE owner = j.owner AND status = 'running') < ? "
+                "ORDER BY (SELECT COUNT(*) FROM jobs WHERE owner = j.owner AND status = 'running'), created LIMIT 1",
+                (self.max_per_owner,)).fetchone()
+            if row is None:
+                return None
+            db.execute("UPDATE jobs SET status = 'running', worker = ?, attempts = attempts + 1, started = ?, "
+                       "message = NULL WHERE id = ?", (os.getpid(), time.time(), row[0]))
+        return row[0], row[1], pickle.loads(row[2])
+
+    def _finish(self, job_id, status, result=None, error=None):
+        blob = None if result is None else pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+        with self._db() as db:
+            db.execute('UPDATE jobs SET status = ?, result = ?, error = ?, finished = ?, '
+                       "progress = CASE ? WHEN 'done' THEN 1 ELSE progress END WHERE id = ?",
+                       (status, blob, error, time.time(), status, job_id))
+
+    def run_next(self):
+        claimed = self.claim()
+        if claimed is None:
+            return False
+        job_id, kind, params = claimed
+        try:
+            result = JOB_KINDS[kind](params, Job(self, job_id))
+        except JobCancelled:
+            self._finish(job_id, 'cancelled')
+        except Exception as e:
+            self._finish(job_id, 'failed', error=str(e) or type(e).__name__)
+        else:
+            self._finish(job_id, 'done', result)
+        return True
+
+    # Running jobs whose worker process is gone (server restart, crash) are queued again
+    def recover(self):
+        with self._transaction() as db:
+            for job_id, pid, attempts, cancel in db.execute(
+                    "SELECT id, worker, attempts, cancel FROM jobs WHERE status = 'running'").fetchall():
+                if _process_alive(pid):
+                    continue
+                if cancel or attempts >= MAX_ATTEMPTS:
+                    db.execute('UPDATE jobs SET status = ?, error = ?, finished = ? WHERE id = ?',
+                               ('cancelled' if cancel else 'failed',
+                                None if cancel else 'The worker process stopped while running this job.', time.time(), job_id))
+                else:
+                    db.execute("UPDATE jobs SET status = 'queued', worker = NULL, progress = 0 WHERE id = ?", (job_id,))
+
+    def start_workers(self, n):
+        self.recover()
+        self.prune()
+        context = multiprocessing.get_context('spawn')
+        for _ in range(n):
+            worker = context.Process(target=work, args=(self.directory, self.max_per_owner, os.getpid()), daemon=True)
+            worker.start()
+            self.workers.append(worker)
+        return self.workers
+
+
+def _process_alive(pid):
+    if pid is None:
+        return False
+    if os.name == 'nt':
+        # os.kill(pid, 0) would terminate the process on Windows; jobs are recovered only on POSIX
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+# --- Worker process: run jobs until the process that started it exits ---
+def work(directory=DEFAULT_JOB_DIR, max_per_owner=MAX_RUNNING_PER_OWNER, parent=None):
+    if hasattr(os, 'nice'):
+        os.nice(WORKER_NICENESS)
+    queue = JobQueue(directory, max_per_owner)
+    while parent is None or os.getppid() == parent:
+        if not queue.run_next():
+            queue.recover()
+            time.sleep(POLL_INTERVAL)
+
+
+# --- Job kinds: handler(params, job) -> result; input and output files live in job.directory ---
+def _read_table(path):
+    import pandas as pd
+    from sonotec.batch import read_path_chunks
+
+    with open(path, 'rb') as file:
+        return pd.concat(read_path_chunks(file, os.path.basename(path)), ignore_index=True)
+
+def _batch_job(params, job):
+    from sonotec.batch import stream_path_file
+
+    input_path, output_path = job.path(params['input']), job.path(params['output'])
+    size = os.path.getsize(input_path)
+    with open(input_path, 'rb') as file:
+        def progress(rows, seconds):
+            # The read position is a fair estimate for CSV; the other readers do not read front to back
+            fraction = file.tell() / size if params['input'].endswith('.csv') and size else None
+            job.progress(fraction, f"{rows:,} rows ({rows / seconds if seconds > 0 else 0:,.0f} rows/s)", {'rows': rows})
+        stats = stream_path_file(file, params['input'], params['mode'], output_path, params['format'],
+                                 chunk_rows=params['chunk_rows'], on_progress=progress)
+    return {**stats, 'path': output_path, 'file_name': params['result_name']}
+
+def _sweep_job(params, job):
+    from sonotec.sweep import sweep_summary
+
+    ranges = {c: np.asarray(v, dtype=float) for c, v in params['ranges'].items()}
+    summary = sweep_summary(params['formula'], params['baseline'], ranges, params['max_cells'],
+                            on_progress=lambda fraction: job.progress(fraction, f"{fraction:.0%} of the grid"))
+    return {**summary, 'formula': params['formula']}
+
+def _monte_carlo_job(params, job):
+    from sonotec.uncertainty import monte_carlo_columns
+
+    table = _read_table(job.path(params['input'])) if params.get('input') else None
+    columns = monte_carlo_columns(
+        params['formula'], params['spreads'], params['n_samples'], params['seed'], params['percentiles'],
+        inputs=params.get('inputs'), table=table,
+        on_progress=lambda fraction, columns: job.progress(fraction, f"{fraction:.0%} of the samples", columns))
+    return {'columns': columns, 'samples': params['n_samples'], 'scope': 'building' if table is not None else 'path'}
+
+def _assignment_job(params, job):
+    import pandas as pd
+    from sonotec.assignment import AssignmentProblem, optimize_assignment, assignment_tables
+    from sonotec.catalog import load_catalog
+
+    table = _read_table(job.path(params['input']))
+    target = params['target']
+    if 'target' in table:
+        target = pd.to_numeric(table['target'], errors='coerce').fillna(target).to_numpy()
+    problem = AssignmentProblem(params['formula'], table, load_catalog(), target, params['objective'])
+    assignment, info = optimize_assignment(
+        problem, kicks=params['kicks'], workers=1,
+        on_progress=lambda done, total, cost: job.progress(done / total, f"{done} of {total} searches, best cost {cost:,.0f}",
+                                                           {'cost': cost}))
+    junctions, groups, summary = assignment_tables(problem, assignment)
+    return {'formula': params['formula'], 'junctions': junctions, 'groups': groups, 'summary': summary, 'info': info}
+
+def _reports_job(params, job):
+    from sonotec.report import generate_reports
+
+    table = _read_table(job.path(params['input']))
+    outputs, stats = generate_reports(
+        params['formula'], table, job.path('reports'), params['scope'], params['project'], workers=1,
+        progress=lambda done, total: job.progress(done / total, f"{done:,} / {total:,} reports", {'reports': done}))
+    return {'outputs': outputs, 'scope': params['scope'], **stats}
+
+JOB_KINDS = {
+    'batch': _batch_job,
+    'sweep': _sweep_job,
+    'monte-carlo': _monte_carlo_job,
+    'assignment': _assignment_job,
+    'reports': _reports_job,
+}
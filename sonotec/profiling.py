@@ -0,0 +1,113 @@
+"""Opt-in timing instrumentation for the Streamlit page: ``SONOTEC_PROFILE=1 streamlit run main.py``.
+
+Page sections, calculator reruns and calculations record their wall time into one ``Timings``
+store per server process. Percentiles are taken over the most recent samples of each name; counts
+and sums are cumulative. With ``SONOTEC_PROFILE_FILE`` set, a Prometheus text-format file (for the
+node_exporter textfile collector or any scraper reading files) is rewritten atomically at most
+every few seconds; with ``SONOTEC_PROFILE_LOG`` set, every sample is appended as a JSON line.
+
+When profiling is off, callers use the shared no-op ``DISABLED_SECTION`` instead, so an
+instrumented block costs one flag check.
+"""
+import contextlib
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+
+import numpy as np
+
+PROFILING_ENABLED = os.environ.get('SONOTEC_PROFILE', '').lower() not in ('', '0', 'false', 'no')
+PROFILE_FILE = os.environ.get('SONOTEC_PROFILE_FILE')
+PROFILE_LOG = os.environ.get('SONOTEC_PROFILE_LOG')
+
+SAMPLES_PER_NAME = 2_000
+FLUSH_INTERVAL_SECONDS = 5.0
+QUANTILES = (0.5, 0.9, 0.99)
+
+# Handed out instead of a timed section when profiling is off (reusable, does nothing)
+DISABLED_SECTION = contextlib.nullcontext()
+
+
+class Timings:
+    def __init__(self, max_samples=SAMPLES_PER_NAME, metrics_file=None, log_file=None,
+                 flush_interval=FLUSH_INTERVAL_SECONDS):
+        self.max_samples = max_samples
+        self.metrics_file = metrics_file
+        self.log_file = log_file
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._counts = Counter()
+        self._totals = Counter()
+        self._pending_log = []
+        self._last_flush = time.monotonic()
+
+    def record(self, name, seconds):
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.max_samples)
+            samples.append(seconds)
+            self._counts[name] += 1
+            self._totals[name] += seconds
+            if self.log_file:
+                self._pending_log.append({'time': time.time(), 'name': name, 'ms': round(seconds * 1000, 3)})
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+        if due and (self.metrics_file or self.log_file):
+            self.flush()
+
+    @contextlib.contextmanager
+    def section(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+            self._totals.clear()
+
+    # --- Per name: cumulative count / total, percentiles over the recent window ---
+    def snapshot(self):
+        with self._lock:
+            windows = {name: np.fromiter(samples, dtype=float) for name, samples in self._samples.items()}
+            counts, totals = dict(self._counts), dict(self._totals)
+        rows = []
+        for name in sorted(windows):
+            quantiles = np.quantile(windows[name], QUANTILES) * 1000
+            rows.append({'name': name, 'count': counts[name], 'total_s': totals[name],
+                         **{f'p{round(q * 100)}_ms': v for q, v in zip(QUANTILES, quantiles)},
+                         'max_ms': windows[name].max() * 1000})
+        return rows
+
+    def prometheus_text(self):
+        lines = ['# HELP sonotec_section_seconds Wall time of page sections, calculator reruns and calculations.',
+                 '# TYPE sonotec_section_seconds summary']
+        for row in self.snapshot():
+            label = row['name'].replace('\\', '\\\\').replace('"', '\\"')
+            for q in QUANTILES:
+                lines.append(f'sonotec_section_seconds{{name="{label}",quantile="{q}"}} '
+                             f"{row[f'p{round(q * 100)}_ms'] / 1000:.6f}")
+            lines.append(f'sonotec_section_seconds_sum{{name="{label}"}} {row["total_s"]:.6f}')
+            lines.append(f'sonotec_section_seconds_count{{name="{label}"}} {row["count"]}')
+        return '\n'.join(lines) + '\n'
+
+    # --- Metrics file via write-and-rename (scrapers never see a half-written file); log is appended ---
+    def flush(self):
+        with self._lock:
+            self._last_flush = time.monotonic()
+            pending, self._pending_log = self._pending_log, []
+        if self.metrics_file:
+            tmp_path = f'{self.metrics_file}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w') as f:
+                f.write(self.prometheus_text())
+            os.replace(tmp_path, self.metrics_file)
+        if self.log_file and pending:
+            with open(self.log_file, 'a') as f:
+                f.writelines(json.dumps(entry) + '\n' for entry in pending)
+
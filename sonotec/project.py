@@ -0,0 +1,283 @@
+"""Projects: a building's full path table with its results, saved to disk and edited incrementally.
+
+A project keeps every path of a separation (EN ISO 12354-1) or building impact (EN ISO 12354-2)
+table as columns, together with the result of each path and a 64-bit hash of its inputs. An edit
+re-evaluates only the rows whose hash changed and re-combines only the room pairs / receiving
+rooms those rows belong to.
+
+Project files are uncompressed Arrow IPC (pyarrow is an optional dependency, only needed to save
+and load). ``load_project`` memory-maps the file and uses the numeric columns in place; a column
+is copied into memory only when it is first edited.
+"""
+import json
+import os
+import time
+
+import numpy as np
+
+from sonotec.core import (
+    AIRBORNE_COLUMNS, DIRECT_COLUMNS, IMPACT_COLUMNS, SEPARATION_PATHS, IMPACT_PATHS,
+    calculate_separation_paths, calculate_impact_paths, _group_codes, _energetic_sum,
+)
+
+PROJECT_FORMAT = 1
+PROJECT_EXTENSION = '.sonotec'
+
+# Per project kind: grouping column, path labels, inputs, per-path result, apparent total, sum sign
+PROJECT_KINDS = {
+    'separation': {
+        'group': 'pair', 'paths': SEPARATION_PATHS, 'inputs': AIRBORNE_COLUMNS + DIRECT_COLUMNS,
+        'result': 'R_ij_w', 'total': 'R_w_apparent', 'sign': -1,
+    },
+    'building-impact': {
+        'group': 'room', 'paths': IMPACT_PATHS, 'inputs': IMPACT_COLUMNS,
+        'result': 'L_nij_w', 'total': 'Ln_w_apparent', 'sign': 1,
+    },
+}
+
+_HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+def detect_project_kind(columns):
+    columns = set(columns)
+    for kind, spec in PROJECT_KINDS.items():
+        if {spec['group'], 'path'} <= columns:
+            return kind
+    raise ValueError("A project table needs a 'pair' column (separation) or a 'room' column (building impact), "
+                     "plus a 'path' column.")
+
+
+# --- Group and path labels as Python strings, so an edit can set a label of any length ---
+def _labels(values):
+    return np.asarray(values).astype(str).astype(object)
+
+
+# --- 64-bit hash of the path label and the input values of every row ---
+# -0.0 and all NaN payloads hash like 0.0 and NaN, so equal values always give equal hashes.
+def _row_hashes(path_codes, inputs):
+    h = np.asarray(path_codes).astype(np.uint64)
+    for values in inputs:
+        values = np.asarray(values, dtype=float) + 0.0
+        bits = np.where(np.isnan(values), np.nan, values).view(np.uint64)
+        h = (h ^ bits) * _HASH_MULTIPLIER
+        h ^= h >> np.uint64(29)
+    return h
+
+
+class Project:
+    def __init__(self, kind, columns, result=None, row_hash=None, name='project', group_codes=None):
+        self.kind = kind
+        self.spec = PROJECT_KINDS[kind]
+        self.name = name
+        # group, path and input columns; arrays may be read-only views of a mapped file
+        self.columns = columns
+        self.n_rows = len(columns['path'])
+        self._path_index = {label: i for i, label in enumerate(self.spec['paths'])}
+
+        if result is None or row_hash is None:
+            self.result = np.full(self.n_rows, np.nan)
+            self.is_direct = np.zeros(self.n_rows, dtype=bool)
+            self.row_hash = self._hashes(slice(None))
+            self._evaluate(np.arange(self.n_rows))
+        else:
+            self.result = result
+            self.is_direct = columns['path'] == self.spec['paths'][0]
+            self.row_hash = row_hash
+        self._index_groups(group_codes)
+
+    def __len__(self):
+        return self.n_rows
+
+    @property
+    def input_columns(self):
+        return self.spec['inputs']
+
+    def _path_codes(self, labels):
+        uniques, inverse = np.unique(np.asarray(labels).astype(str), return_inverse=True)
+        codes = np.array([self._path_index.get(label, len(self._path_index)) for label in uniques], dtype=np.intp)
+        return codes[inverse.reshape(-1)]
+
+    def _hashes(self, rows):
+        return _row_hashes(self._path_codes(self.columns['path'][rows]),
+                           (self.columns[c][rows] for c in self.input_columns))
+
+    # --- Copy-on-write: mapped columns become writable arrays on their first edit ---
+    def _writable(self, column):
+        values = self.columns[column]
+        if not (isinstance(values, np.ndarray) and values.flags.writeable):
+            values = self.columns[column] = np.array(values)
+        return values
+
+    def _evaluate(self, rows):
+        if len(rows) == 0:
+            return
+        table = {c: self.columns[c][rows] for c in ('path', *self.input_columns)}
+        if self.kind == 'separation':
+            result, _ = calculate_separation_paths(table)
+            is_direct = table['path'] == self.spec['paths'][0]
+        else:
+            result, _, is_direct = calculate_impact_paths(table)
+        if not self.result.flags.writeable:
+            self.result = np.array(self.result)
+        self.result[rows] = result
+        self.is_direct[rows] = is_direct
+
+    # --- Rows sorted by group, so the members of any set of groups are contiguous slices ---
+    def _index_groups(self, group_codes=None):
+        self.groups, self.codes = group_codes or _group_codes(self.columns[self.spec['group']])
+        n_groups = len(self.groups)
+        self._order = np.argsort(self.codes, kind='stable')
+        self.n_paths = np.bincount(self.codes, minlength=n_groups)
+        self._starts = np.cumsum(self.n_paths) - self.n_paths
+        self.total = np.full(n_groups, np.nan)
+        self.valid = np.zeros(n_groups, dtype=bool)
+        self.has_direct = np.zeros(n_groups, dtype=bool)
+        self._combine(np.arange(n_groups))
+
+    def _combine(self, group_ids):
+        counts = self.n_paths[group_ids]
+        offsets = np.cumsum(counts) - counts
+        rows = self._order[np.repeat(self._starts[group_ids] - offsets, counts) + np.arange(counts.sum())]
+        local = np.repeat(np.arange(len(group_ids)), counts)
+        total, valid = _energetic_sum(local, len(group_ids), self.result[rows], self.spec['sign'])
+        self.total[group_ids] = total
+        self.valid[group_ids] = valid
+        self.has_direct[group_ids] = np.bincount(local, weights=self.is_direct[rows], minlength=len(group_ids)) > 0
+
+    # --- Re-evaluate the given rows where their hash changed, then re-combine their groups ---
+    def _refresh(self, rows, started):
+        new_hash = self._hashes(rows)
+        differs = new_hash != self.row_hash[rows]
+        changed = rows[differs]
+        if len(changed):
+            if not self.row_hash.flags.writeable:
+                self.row_hash = np.array(self.row_hash)
+            self.row_hash[changed] = new_hash[differs]
+            self._evaluate(changed)
+            groups = np.unique(self.codes[changed])
+            self._combine(groups)
+        else:
+            groups = changed
+        return {'changed_rows': len(changed), 'groups': len(groups), 'seconds': time.perf_counter() - started}
+
+    # --- Set one column on some rows (a scalar or one value per row) ---
+    def edit(self, rows, column, values):
+        started = time.perf_counter()
+        rows = np.atleast_1d(np.asarray(rows, dtype=np.intp))
+        if column == self.spec['group']:
+            # Moving paths between groups changes the grouping itself: re-index and re-combine everything
+            self._writable(column)[rows] = values
+            self._index_groups()
+            return {'changed_rows': len(rows), 'groups': len(self.groups), 'seconds': time.perf_counter() - started}
+        if column not in self.columns:
+            raise ValueError(f"Unknown column '{column}'")
+        self._writable(column)[rows] = values
+        return self._refresh(rows, started)
+
+    # --- Take over an edited copy of the whole table (same rows); only changed rows are re-evaluated ---
+    def update(self, table):
+        started = time.perf_counter()
+        if len(table['path']) != self.n_rows:
+            raise ValueError(f"Expected {self.n_rows:,} rows, got {len(table['path']):,}; "
+                             "build a new project to add or remove paths")
+        group = self.spec['group']
+        new_group = _labels(table[group])
+        if not np.array_equal(new_group, self.columns[group]):
+            self.columns[group] = new_group
+            self._index_groups()
+
+        new_columns = {'path': _labels(table['path']),
+                       **{c: np.asarray(table[c], dtype=float) for c in self.input_columns}}
+        new_hash = _row_hashes(self._path_codes(new_columns['path']), (new_columns[c] for c in self.input_columns))
+        rows = np.flatnonzero(new_hash != self.row_hash)
+        for column, values in new_columns.items():
+            if len(rows):
+                self._writable(column)[rows] = values[rows]
+        return self._refresh(rows, started)
+
+    def path_table(self):
+        return {**self.columns, self.spec['result']: self.result, 'valid': np.isfinite(self.result)}
+
+    def totals_table(self):
+        totals = {self.spec['group']: self.groups, self.spec['total']: np.where(self.valid, self.total, np.nan),
+                  'n_paths': self.n_paths}
+        if self.kind == 'building-impact':
+            totals['transmission'] = np.where(self.has_direct, 'vertical', 'diagonal')
+        return {**totals, 'valid': self.valid}
+
+    # --- One record batch of columns plus the project description in the schema metadata ---
+    def save(self, target):
+        import pyarrow as pa  # optional dependency, only needed for project files
+        import pyarrow.ipc as ipc
+
+        arrays = {
+            self.spec['group']: pa.array(self.columns[self.spec['group']], pa.string()).dictionary_encode(),
+            'path': pa.array(self.columns['path'], pa.string()).dictionary_encode(),
+            **{c: pa.array(np.asarray(self.columns[c], dtype=float)) for c in self.input_columns},
+            self.spec['result']: pa.array(self.result),
+            'row_hash': pa.array(self.row_hash),
+        }
+        metadata = {'format': PROJECT_FORMAT, 'kind': self.kind, 'name': self.name}
+        batch = pa.record_batch(list(arrays.values()), names=list(arrays))
+        schema = batch.schema.with_metadata({'sonotec.project': json.dumps(metadata)})
+        with ipc.new_file(target, schema) as writer:
+            writer.write_batch(batch.replace_schema_metadata(schema.metadata))
+
+
+# --- New project from a separation / building impact path table (missing inputs start as NaN) ---
+def project_from_table(table, kind=None, name='project'):
+    kind = kind or detect_project_kind(table.keys() if isinstance(table, dict) else table.columns)
+    spec = PROJECT_KINDS[kind]
+    n_rows = len(table['path'])
+    columns = {
+        spec['group']: _labels(table[spec['group']]),
+        'path': _labels(table['path']),
+        **{c: np.array(table[c], dtype=float) if c in table else np.full(n_rows, np.nan) for c in spec['inputs']},
+    }
+    return Project(kind, columns, name=name)
+
+
+# --- Open a project file: file paths are memory-mapped, bytes / file objects are read in place ---
+def load_project(source):
+    import pyarrow as pa  # optional dependency, only needed for project files
+    import pyarrow.ipc as ipc
+
+    if isinstance(source, (str, os.PathLike)):
+        source = pa.memory_map(os.fspath(source))
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        source = pa.BufferReader(source)
+    reader = ipc.open_file(source)
+    raw = (reader.schema.metadata or {}).get(b'sonotec.project')
+    if raw is None:
+        raise ValueError("Not a SonoTec project file.")
+    metadata = json.loads(raw)
+    if metadata.get('format') != PROJECT_FORMAT:
+        raise ValueError(f"Unsupported project format {metadata.get('format')} (expected {PROJECT_FORMAT}).")
+
+    spec = PROJECT_KINDS[metadata['kind']]
+    table = reader.read_all()
+    batch = table.combine_chunks().to_batches()[0] if table.num_rows else None
+
+    def column(name):
+        if batch is None:
+            return np.array([], dtype=object if name in (spec['group'], 'path') else float)
+        # Zero-copy for the numeric columns (no nulls are ever written); labels are decoded
+        return batch.column(name).to_numpy(zero_copy_only=False)
+
+    columns = {name: column(name) for name in ('path', *spec['inputs'])}
+    columns['path'] = _labels(columns['path'])
+    group_codes = None
+    if batch is not None:
+        # The dictionary holds each group label once: sort it and remap the indices instead of sorting all rows
+        encoded = batch.column(spec['group'])
+        labels = _labels(encoded.dictionary.to_numpy(zero_copy_only=False))
+        order = np.argsort(labels)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        codes = rank[encoded.indices.to_numpy(zero_copy_only=False)]
+        group_codes = (labels[order], codes)
+        columns[spec['group']] = labels[order][codes]
+    else:
+        columns[spec['group']] = column(spec['group'])
+    return Project(metadata['kind'], columns, result=column(spec['result']), row_hash=column('row_hash'),
+                   name=metadata.get('name', 'project'), group_codes=group_codes)
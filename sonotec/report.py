@@ -0,0 +1,392 @@
+"""Calculation reports: PDF per room pair / receiving room, or one per project.
+
+Every report shows the EN ISO 12354 formulas with the path's values substituted, the path table,
+a chart of the path results and the apparent total. All results are computed up front with the
+vectorized engine; the worker processes only lay out and render pages.
+
+Rendered formulas and charts are PNG assets stored under the SHA-256 of their content, so an asset
+is rendered once and then shared by every report, process and batch run that needs it (identical
+junctions repeat the same substituted formula many times in one building). Pages are drawn with
+matplotlib (optional dependency, only needed for reports) without pyplot, so no global figure state
+is shared between reports.
+
+A path table with a ``catalog_version`` column whose values come from a placeholder catalog gets a
+watermark on every page.
+"""
+import functools
+import hashlib
+import os
+import re
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from sonotec.core import (
+    AIRBORNE_COLUMNS, DIRECT_COLUMNS, IMPACT_COLUMNS,
+    calculate_separation_paths, combine_airborne_paths, calculate_impact_paths, combine_impact_paths, _group_codes,
+)
+from sonotec.catalog import PLACEHOLDER_NOTICE, is_placeholder
+
+# Bump when the look of an asset changes, so cached assets of older versions are not reused
+ASSET_VERSION = 1
+ASSET_DPI = 300
+DEFAULT_ASSET_DIR = os.path.join(tempfile.gettempdir(), 'sonotec-report-assets')
+LOGO_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'eurotec-logo-2.png')
+REPORT_SCOPES = ('group', 'project')
+
+# A4 portrait, all layout in inches
+PAGE_WIDTH, PAGE_HEIGHT, MARGIN = 8.27, 11.69, 0.7
+TABLE_ROW_HEIGHT = 0.22
+# Energetic sum terms per formula line before the sum wraps
+SUM_TERMS_PER_LINE = 4
+
+# Mathtext labels of the table columns
+COLUMN_LABELS = {
+    'path': 'Path', 'R_iw': r'$R_{i,w}$', 'R_jw': r'$R_{j,w}$', 'delta_R_ijw': r'$\Delta R_{ij,w}$',
+    'K_ij': r'$K_{ij}$', 'S_s': r'$S_s$', 'l_0': r'$l_0$', 'l_f': r'$l_f$', 'R_sw': r'$R_{s,w}$',
+    'delta_R_Ddw': r'$\Delta R_{Dd,w}$', 'L_neq0w': r'$L_{n,eq,0,w}$', 'delta_Lw': r'$\Delta L_w$',
+    'delta_R_jw': r'$\Delta R_{j,w}$', 'S_i': r'$S_i$', 'l_ij': r'$l_{ij}$',
+    'R_ij_w': r'$R_{ij,w}$ [dB]', 'L_nij_w': r'$L_{n,ij,w}$ [dB]',
+}
+
+# Per formula: grouping column, table columns, per-path result, titles and formulas
+_REPORT_SPEC = {
+    'airborne': {
+        'group': 'pair', 'columns': AIRBORNE_COLUMNS + DIRECT_COLUMNS, 'result': 'R_ij_w',
+        'total': "R'_{w}", 'sign': -1, 'title': 'Airborne sound insulation (EN ISO 12354-1)', 'group_label': 'Room pair',
+        'formulas': (
+            r"R'_{w} = -10 \log_{10}\left(10^{-R_{Dd,w}/10} + \sum_{F=f} 10^{-R_{Ff,w}/10} + \sum_{f} 10^{-R_{Df,w}/10} + \sum_{F} 10^{-R_{Fd,w}/10}\right)",
+            r"R_{Dd,w} = R_{s,w} + \Delta R_{Dd,w}",
+            r"R_{ij,w} = \frac{R_{i,w} + R_{j,w}}{2} + \Delta R_{ij,w} + K_{ij} + 10 \log_{10}\left(\frac{S_s}{l_0 \times l_f}\right)",
+        ),
+    },
+    'impact': {
+        'group': 'room', 'columns': IMPACT_COLUMNS, 'result': 'L_nij_w',
+        'total': "L'_{n,w}", 'sign': 1, 'title': 'Impact sound insulation (EN ISO 12354-2)', 'group_label': 'Receiving room',
+        'formulas': (
+            r"L'_{n,w} = 10 \log_{10}\left(10^{L_{n,d,w}/10} + \sum_{j} 10^{L_{n,ij,w}/10}\right)",
+            r"L_{n,d,w} = L_{n,eq,0,w} - \Delta L_w - \Delta L_{d,w}",
+            r"L_{n,ij,w} = L_{n,eq,0,w} - \Delta L_w + \frac{R_{i,w} - R_{j,w}}{2} - \Delta R_{j,w} - K_{ij} - 10 \log_{10}\left(\frac{S_i}{l_0 \times l_{ij}}\right)",
+        ),
+    },
+}
+
+
+# --- Substituted formulas of one path (same form as the calculators' "Calculation details") ---
+def _f(value):
+    return f'{value:.2f}' if np.isfinite(value) else r'\mathrm{n/a}'
+
+def _result(value):
+    return rf'{value:.2f}\ \mathrm{{dB}}' if np.isfinite(value) else r'\mathrm{invalid}'
+
+def path_formula(formula, row, result):
+    if formula == 'airborne' and row['path'] == 'Dd':
+        return rf"R_{{Dd,w}} = {_f(row['R_sw'])} + {_f(row['delta_R_Ddw'])} = {_result(result)}"
+    if formula == 'airborne':
+        return (rf"R_{{{row['path']},w}} = \frac{{{_f(row['R_iw'])} + {_f(row['R_jw'])}}}{{2}} + {_f(row['delta_R_ijw'])} "
+                rf"+ {_f(row['K_ij'])} + 10 \log_{{10}}\left(\frac{{{_f(row['S_s'])}}}{{{_f(row['l_0'])} \times {_f(row['l_f'])}}}\right)"
+                rf" = {_result(result)}")
+    if row['path'] == 'd':
+        return (rf"L_{{n,d,w}} = {_f(row['L_neq0w'])} - {_f(row['delta_Lw'])} - {_f(row['delta_R_jw'])}"
+                rf" = {_result(result)}")
+    return (rf"L_{{n,{row['path']},w}} = {_f(row['L_neq0w'])} - {_f(row['delta_Lw'])} "
+            rf"+ \frac{{{_f(row['R_iw'])} - {_f(row['R_jw'])}}}{{2}} - {_f(row['delta_R_jw'])} - {_f(row['K_ij'])} "
+            rf"- 10 \log_{{10}}\left(\frac{{{_f(row['S_i'])}}}{{{_f(row['l_0'])} \times {_f(row['l_ij'])}}}\right)"
+            rf" = {_result(result)}")
+
+# --- Energetic sum with the path results substituted, wrapped into lines of a few terms ---
+def total_formula_lines(formula, results, total):
+    spec = _REPORT_SPEC[formula]
+    sign = '-' if spec['sign'] < 0 else ''
+    terms = [rf'10^{{{sign}{_f(r)}/10}}' for r in results]
+    lines = [' + '.join(terms[i:i + SUM_TERMS_PER_LINE]) for i in range(0, len(terms), SUM_TERMS_PER_LINE)] or ['']
+    # Plain parentheses: \left( ... \right) cannot span several rendered lines
+    lines = [f'+ {line}' if i else line for i, line in enumerate(lines)]
+    lines[0] = rf"{spec['total']} = {sign}10 \log_{{10}}({lines[0]}"
+    lines[-1] = rf"{lines[-1]}) = {_result(total)}"
+    return lines
+
+
+# --- Content-addressed asset store: sha256(version, kind, content) -> PNG file ---
+class AssetCache:
+    def __init__(self, directory=DEFAULT_ASSET_DIR):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.rendered = 0
+        self.reused = 0
+
+    def _asset(self, kind, content, render):
+        digest = hashlib.sha256(f'{ASSET_VERSION}\0{ASSET_DPI}\0{kind}\0{content}'.encode()).hexdigest()
+        path = os.path.join(self.directory, f'{digest}.png')
+        if os.path.exists(path):
+            self.reused += 1
+        else:
+            # Render to a private file and rename: concurrent workers never see a half-written asset
+            fd, tmp_path = tempfile.mkstemp(suffix='.png', dir=self.directory)
+            try:
+                with os.fdopen(fd, 'wb') as file:
+                    render(file)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            self.rendered += 1
+        return _read_png(path)
+
+    def formula(self, latex, size=11):
+        from matplotlib.font_manager import FontProperties
+        from matplotlib.mathtext import math_to_image
+
+        return self._asset('formula', f'{size}\0{latex}', lambda file: math_to_image(
+            f'${latex}$', file, prop=FontProperties(size=size), dpi=ASSET_DPI, format='png'))
+
+    def path_chart(self, formula, labels, results, total):
+        # Drawn from the rounded values it is keyed by
+        results, total = np.round(results, 2), round(float(total), 2)
+        content = f"{formula}\0{'|'.join(labels)}\0{results.tolist()}\0{total}"
+        return self._asset('path_chart', content, lambda file: _draw_path_chart(file, formula, labels, results, total))
+
+# Decoded assets are kept per process, so a worker decodes a shared asset once for all its reports
+@functools.lru_cache(maxsize=2048)
+def _read_png(path):
+    from matplotlib.image import imread
+
+    return imread(path)
+
+def _draw_path_chart(file, formula, labels, results, total):
+    from matplotlib.figure import Figure
+
+    spec = _REPORT_SPEC[formula]
+    fig = Figure(figsize=(4.5, 0.22 * len(labels) + 0.8))
+    ax = fig.add_subplot()
+    positions = np.arange(len(labels))
+    ax.barh(positions, np.where(np.isfinite(results), results, 0.0), color='#4a7ab5')
+    if np.isfinite(total):
+        ax.axvline(total, color='#c0392b', linestyle='--', label=f"${spec['total']}$ = {total:.1f} dB")
+        ax.legend(loc='lower right', fontsize=8)
+    ax.set_yticks(positions, labels, fontsize=8)
+    ax.invert_yaxis()
+    ax.set_xlabel(f"{COLUMN_LABELS[spec['result']]}", fontsize=8)
+    ax.tick_params(axis='x', labelsize=8)
+    fig.tight_layout()
+    fig.savefig(file, format='png', dpi=ASSET_DPI)
+
+
+# --- Flow layout: blocks are stacked top-down and start a new page when they do not fit ---
+# Everything on a page is drawn into one full-page Axes in inch coordinates (an Axes per block
+# costs more than drawing the block).
+class _Document:
+    def __init__(self, pdf, assets, title, watermark=None):
+        self.pdf, self.assets, self.title, self.watermark = pdf, assets, title, watermark
+        self.fig = self.ax = None
+        self.y = 0.0
+        self.pages = 0
+
+    def _new_page(self):
+        from matplotlib.figure import Figure
+
+        self.finish_page()
+        self.fig = Figure(figsize=(PAGE_WIDTH, PAGE_HEIGHT))
+        self.ax = self.fig.add_axes((0, 0, 1, 1))
+        self.ax.set_axis_off()
+        self.ax.set_xlim(0, PAGE_WIDTH)
+        self.ax.set_ylim(0, PAGE_HEIGHT)
+        self.ax.set_autoscale_on(False)
+        self.pages += 1
+        self.y = PAGE_HEIGHT - MARGIN
+        if self.watermark:
+            self.ax.text(PAGE_WIDTH / 2, PAGE_HEIGHT / 2, self.watermark, rotation=55, ha='center', va='center',
+                         fontsize=22, weight='bold', color='#cc0000', alpha=0.2)
+        if os.path.exists(LOGO_PATH):
+            self._place(_read_png(LOGO_PATH), MARGIN, 0.4)
+        self.ax.text(PAGE_WIDTH - MARGIN, self.y, self.title, ha='right', va='top', fontsize=9, color='#555555')
+        self.ax.text(PAGE_WIDTH / 2, MARGIN / 2, f'Page {self.pages}', ha='center', va='center', fontsize=8, color='#555555')
+        self.y -= 0.65
+
+    def finish_page(self):
+        if self.fig is not None:
+            self.pdf.savefig(self.fig)
+            self.fig = self.ax = None
+
+    def _fit(self, height):
+        if self.fig is None or self.y - height < MARGIN:
+            self._new_page()
+
+    # Image of its natural size (pixels / ASSET_DPI), scaled down to the content width if needed
+    def _place(self, image, x, height=None):
+        pixel_height, pixel_width = image.shape[:2]
+        width = pixel_width / pixel_height * height if height else pixel_width / ASSET_DPI
+        height = height or pixel_height / ASSET_DPI
+        max_width = PAGE_WIDTH - x - MARGIN
+        if width > max_width:
+            width, height = max_width, height * max_width / width
+        self.ax.imshow(image, extent=(x, x + width, self.y - height, self.y), aspect='auto', interpolation='none')
+        return height
+
+    def image(self, image, indent=0.0, gap=0.12):
+        self._fit(min(image.shape[0] / ASSET_DPI, PAGE_HEIGHT - 3 * MARGIN))
+        self.y -= self._place(image, MARGIN + indent) + gap
+
+    def text(self, text, size=10, weight='normal', gap=0.1):
+        height = size / 72 * 1.4
+        self._fit(height)
+        self.ax.text(MARGIN, self.y, text, ha='left', va='top', fontsize=size, weight=weight)
+        self.y -= height + gap
+
+    # Table split over as many pages as needed, the header repeated on every page
+    def table(self, header, rows, gap=0.2):
+        column_x = np.linspace(MARGIN, PAGE_WIDTH - MARGIN, len(header) + 1)
+        centers = (column_x[:-1] + column_x[1:]) / 2
+        start = 0
+        while start < len(rows):
+            self._fit(3 * TABLE_ROW_HEIGHT)
+            fit_rows = max(1, int((self.y - MARGIN) / TABLE_ROW_HEIGHT) - 1)
+            chunk = rows[start:start + fit_rows]
+            top, bottom = self.y, self.y - (len(chunk) + 1) * TABLE_ROW_HEIGHT
+            self.ax.fill_between(column_x[[0, -1]], top - TABLE_ROW_HEIGHT, top, color='#e8eef6', linewidth=0)
+            lines = top - TABLE_ROW_HEIGHT * np.arange(len(chunk) + 2)
+            self.ax.hlines(lines, column_x[0], column_x[-1], colors='#888888', linewidth=0.3)
+            self.ax.vlines(column_x, bottom, top, colors='#888888', linewidth=0.3)
+            for i, cells in enumerate([header, *chunk]):
+                y = top - (i + 0.5) * TABLE_ROW_HEIGHT
+                for x, cell in zip(centers, cells):
+                    self.ax.text(x, y, cell, ha='center', va='center', fontsize=7)
+            self.y = bottom - gap
+            start += len(chunk)
+
+
+# --- One room pair / receiving room: path table, substituted formulas, chart and total ---
+def _draw_group(doc, formula, group, columns, results, total):
+    spec = _REPORT_SPEC[formula]
+    paths = columns['path']
+    doc.text(f"{spec['group_label']} {group}", size=13, weight='bold')
+
+    header = [COLUMN_LABELS[c] for c in ('path', *spec['columns'], spec['result'])]
+    rows = [[paths[i], *(_cell(columns[c][i]) for c in spec['columns']), _cell(results[i])] for i in range(len(paths))]
+    doc.table(header, rows)
+
+    doc.text('Path results', size=10, weight='bold')
+    for i in range(len(paths)):
+        row = {'path': paths[i], **{c: columns[c][i] for c in spec['columns']}}
+        doc.image(doc.assets.formula(path_formula(formula, row, results[i]), size=10), indent=0.15, gap=0.08)
+    doc.image(doc.assets.path_chart(formula, list(paths), results, total), indent=0.15)
+
+    doc.text(f"Apparent {'sound reduction index' if formula == 'airborne' else 'impact sound pressure level'}", size=10, weight='bold')
+    for line in total_formula_lines(formula, results, total):
+        doc.image(doc.assets.formula(line, size=10), indent=0.15, gap=0.06)
+    doc.text('Result: ' + (f'{total:.2f} dB' if np.isfinite(total) else 'invalid (check the paths marked n/a)'),
+             size=11, weight='bold', gap=0.3)
+
+def _cell(value):
+    return '–' if not np.isfinite(value) else f'{value:.2f}'
+
+# --- Worker: one PDF file from its sections; returns (output, pages, assets rendered, assets reused) ---
+def write_report(formula, output, title, sections, summary=None, asset_dir=DEFAULT_ASSET_DIR, watermark=None):
+    from matplotlib.backends.backend_pdf import PdfPages
+
+    spec = _REPORT_SPEC[formula]
+    assets = AssetCache(asset_dir)
+    with PdfPages(output, metadata={'Title': title, 'Creator': 'SonoTec V2 calculator'}) as pdf:
+        doc = _Document(pdf, assets, title, watermark)
+        doc.text(spec['title'], size=15, weight='bold', gap=0.15)
+        for latex in spec['formulas']:
+            doc.image(assets.formula(latex), gap=0.1)
+        doc.y -= 0.15
+        if summary is not None:
+            doc.text(f"Summary ({len(summary[0]):,} {spec['group_label'].lower()}s)", size=13, weight='bold')
+            doc.table([spec['group_label'], 'Paths', f"${spec['total']}$ [dB]"],
+                      [[g, str(n), _cell(t)] for g, n, t in zip(*summary)])
+        for group, columns, results, total in sections:
+            _draw_group(doc, formula, group, columns, results, total)
+        doc.finish_page()
+    return output, doc.pages, assets.rendered, assets.reused
+
+
+# --- Whole table: path results and totals in one vectorized pass, then sections per group ---
+def report_sections(formula, table):
+    spec = _REPORT_SPEC[formula]
+    missing = [c for c in (spec['group'], 'path') if c not in table]
+    if missing:
+        raise ValueError(f"Missing column(s): {', '.join(missing)}")
+    if formula == 'airborne':
+        results, _ = calculate_separation_paths(table)
+        totals = combine_airborne_paths(np.asarray(table['pair']).astype(str), results)['R_w_apparent']
+    else:
+        results, _, is_direct = calculate_impact_paths(table)
+        totals = combine_impact_paths(np.asarray(table['room']).astype(str), results, is_direct)['Ln_w_apparent']
+
+    n = len(results)
+    columns = {'path': np.asarray(table['path']).astype(str)}
+    for c in spec['columns']:
+        columns[c] = np.asarray(table[c], dtype=float) if c in table else np.full(n, np.nan)
+
+    # Rows of each group are contiguous after one stable sort by group code
+    groups, codes = _group_codes(np.asarray(table[spec['group']]).astype(str))
+    order = np.argsort(codes, kind='stable')
+    starts = np.searchsorted(codes[order], np.arange(len(groups) + 1))
+    for g, group in enumerate(groups):
+        rows = order[starts[g]:starts[g + 1]]
+        yield str(group), {c: v[rows] for c, v in columns.items()}, results[rows], float(totals[g])
+
+
+# --- Watermark text when any path's K_ij / ΔR came from a placeholder catalog, else None ---
+def catalog_watermark(table):
+    if 'catalog_version' not in table:
+        return None
+    versions = np.unique(np.asarray(table['catalog_version']).astype(str))
+    return PLACEHOLDER_NOTICE if any(is_placeholder(v) for v in versions) else None
+
+def _file_name(text):
+    return re.sub(r'[^A-Za-z0-9._-]+', '_', text).strip('_') or 'report'
+
+# --- Many reports in parallel: one PDF per group (scope 'group') or one for the project ---
+def generate_reports(formula, table, output_dir, scope='group', project='Project', workers=None,
+                     asset_dir=DEFAULT_ASSET_DIR, progress=None):
+    if scope not in REPORT_SCOPES:
+        raise ValueError(f"Unknown report scope '{scope}', expected one of {', '.join(REPORT_SCOPES)}")
+    started = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    sections = list(report_sections(formula, table))
+    watermark = catalog_watermark(table)
+    group_label = _REPORT_SPEC[formula]['group_label']
+    if scope == 'group':
+        jobs, names = [], set()
+        for section in sections:
+            # Labels that only differ in characters a file name cannot hold, or in case (case-insensitive
+            # file systems), get a counter appended until the name is unused, so no report overwrites another
+            base = name = f'{_file_name(project)}_{_file_name(section[0])}'
+            suffix = 0
+            while name.lower() in names:
+                suffix += 1
+                name = f'{base}_{suffix}'
+            names.add(name.lower())
+            jobs.append((formula, os.path.join(output_dir, f'{name}.pdf'), f'{project} · {group_label} {section[0]}',
+                         [section], None, asset_dir, watermark))
+    else:
+        summary = ([s[0] for s in sections], [len(s[2]) for s in sections], [s[3] for s in sections])
+        jobs = [(formula, os.path.join(output_dir, f'{_file_name(project)}.pdf'), project, sections, summary, asset_dir,
+                 watermark)]
+
+    workers = min(workers or os.cpu_count() or 1, len(jobs)) or 1
+    outputs, pages, rendered, reused = [], 0, 0, 0
+    if workers > 1:
+        with ProcessPoolExecutor(workers) as pool:
+            futures = [pool.submit(write_report, *job) for job in jobs]
+            for done, future in enumerate(as_completed(futures), 1):
+                output, n_pages, n_rendered, n_reused = future.result()
+                outputs.append(output)
+                pages, rendered, reused = pages + n_pages, rendered + n_rendered, reused + n_reused
+                if progress:
+                    progress(done, len(jobs))
+    else:
+        for done, job in enumerate(jobs, 1):
+            output, n_pages, n_rendered, n_reused = write_report(*job)
+            outputs.append(output)
+            pages, rendered, reused = pages + n_pages, rendered + n_rendered, reused + n_reused
+            if progress:
+                progress(done, len(jobs))
+    return sorted(outputs), {'reports': len(outputs), 'pages': pages, 'assets_rendered': rendered,
+                             'assets_reused': reused, 'workers': workers, 'seconds': time.perf_counter() - started,
+                             'watermark': watermark}
@@ -0,0 +1,104 @@
+"""Target-driven (inverse) design: minimum K_ij / delta R needed to reach a target R'_w or L'n,w.
+
+Both path formulas are linear in K_ij and delta R with a unit coefficient (+1 for airborne
+R_ij,w, -1 for impact L_n,ij,w), so every requirement is solved in closed form, batched over
+all paths and all room pairs at once.
+"""
+import numpy as np
+
+from sonotec.core import FORMULAS, _group_codes, _energetic_sum
+
+# Inputs that can be solved for, per formula (all enter the formula with a unit coefficient)
+SOLVABLE_INPUTS = {
+    'airborne': ('K_ij', 'delta_R_ijw'),
+    'impact': ('K_ij', 'delta_R_jw'),
+}
+
+# Sign of the result with respect to the solved input / of the energetic sum
+_SIGN = {'airborne': -1, 'impact': 1}
+
+
+def _check_solve_for(formula, solve_for):
+    if solve_for not in SOLVABLE_INPUTS[formula]:
+        raise ValueError(f"Can only solve {formula} paths for {' or '.join(SOLVABLE_INPUTS[formula])}, not '{solve_for}'")
+
+
+# --- Per path: input value needed so the path alone reaches the target ---
+# Airborne: R_ij,w >= target; impact: L_n,ij,w <= target.
+def solve_path(formula, table, target, solve_for='K_ij'):
+    _check_solve_for(formula, solve_for)
+    columns, engine = FORMULAS[formula]
+    result, valid = engine(*(table[c] for c in columns))
+    target = np.asarray(target, dtype=float)
+
+    increment = target - result if formula == 'airborne' else result - target
+    required = np.asarray(table[solve_for], dtype=float) + increment
+    return {'result': result, 'increment': increment, 'required': required,
+            'met': valid & (increment <= 0), 'valid': valid}
+
+
+# --- Per room pair / receiving room: uniform uplift of all adjustable paths to reach the target ---
+# group:       pair (airborne) or receiving room (impact) of every path
+# path_result: R_ij,w / L_n,ij,w of every path (direct paths included)
+# adjustable:  paths whose K_ij / delta R can be raised (usually the flanking paths at bearings)
+# target:      scalar or per-path target; the most demanding value of a group is used
+def solve_groups(formula, group, path_result, adjustable, target):
+    sign = _SIGN[formula]
+    groups, codes = _group_codes(group)
+    n = len(groups)
+    path_result = np.asarray(path_result, dtype=float)
+    adjustable = np.asarray(adjustable, dtype=bool)
+
+    target = np.broadcast_to(np.asarray(target, dtype=float), path_result.shape)
+    group_target = np.full(n, -np.inf if formula == 'airborne' else np.inf)
+    (np.maximum if formula == 'airborne' else np.minimum).at(group_target, codes, target)
+
+    current, valid = _energetic_sum(codes, n, path_result, sign)
+    fixed, _ = _energetic_sum(codes, n, path_result, sign, include=~adjustable)
+    adjusted, _ = _energetic_sum(codes, n, path_result, sign, include=adjustable)
+    has_fixed = np.bincount(codes, weights=~adjustable, minlength=n) > 0
+    has_adjustable = np.bincount(codes, weights=adjustable, minlength=n) > 0
+    # An empty subset means "no transmission": +inf dB for R, -inf dB for L
+    fixed = np.where(has_fixed, fixed, -sign * np.inf)
+
+    # Margin of the fixed paths to the target: they alone must already stay below it
+    margin = -sign * (fixed - group_target)
+    feasible = valid & (margin > 0) & has_adjustable
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        # Airborne: x = (T - R_adj) - 10*log10(1 - 10^((T - R_fixed)/10)), impact mirrored
+        share = np.log1p(-10 ** (-margin / 10)) / np.log(10)
+        increment = -sign * (group_target - adjusted) - 10 * share
+    increment = np.where(feasible, np.maximum(increment, 0.0), np.nan)
+
+    # Groups without adjustable paths are either already met or cannot be fixed by bearings
+    met = valid & (-sign * (current - group_target) >= 0)
+    increment = np.where(~has_adjustable & met, 0.0, increment)
+    feasible = feasible | (~has_adjustable & met)
+    return {'group': groups, 'apparent': np.where(valid, current, np.nan), 'target': group_target,
+            'increment': increment, 'feasible': feasible, 'met': met, 'codes': codes}
+
+
+# --- Required input value per path after the group uplift, and its most demanding value per group ---
+def required_path_values(solution, current_values, adjustable):
+    codes = solution['codes']
+    required = np.asarray(current_values, dtype=float) + solution['increment'][codes]
+    required = np.where(adjustable, required, np.nan)
+    group_required = np.full(len(solution['group']), -np.inf)
+    np.fmax.at(group_required, codes, required)
+    group_required[np.isinf(group_required)] = np.nan
+    return required, group_required
+
+
+# --- Cheapest variant whose value meets every requirement (-1 if none does) ---
+def select_cheapest_variant(required, variant_values, variant_cost):
+    required = np.asarray(required, dtype=float)
+    variant_values = np.asarray(variant_values, dtype=float)
+    variant_cost = np.asarray(variant_cost, dtype=float)
+    if variant_values.size == 0:
+        return np.full(required.shape, -1, dtype=np.intp)
+
+    meets = variant_values >= required[..., None]
+    cost = np.where(meets, variant_cost, np.inf)
+    choice = np.argmin(cost, axis=-1)
+    return np.where(np.isfinite(np.take_along_axis(cost, choice[..., None], axis=-1)[..., 0]) & ~np.isnan(required),
+                    choice, -1)
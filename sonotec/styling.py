@@ -0,0 +1,20 @@
+"""Results table styling shared by the Streamlit page and the benchmarks (needs pandas)."""
+from pandas.io.formats.style import Styler
+
+
+# --- Styling function (reusable for any table) ---
+# Column-level CSS rules instead of a per-row callback; only numeric columns are formatted.
+# issues (aligned with df, e.g. from sonotec.validation.describe_codes) replaces "Invalid" in the
+# result column with the reason, formatted once per distinct reason on the page.
+def style_table(df, final_col_name, issues=None):
+    column_styles = {
+        col: [{'selector': 'td', 'props': 'background-color: #008080; color: white' if col == final_col_name else 'background-color: #F5F5DC'}]
+        for col in df.columns
+    }
+    numeric_cols = list(df.select_dtypes('number').columns)
+    styler = Styler(df, cell_ids=False).set_table_styles(column_styles).format("{:.8f}", subset=numeric_cols, na_rep="Invalid")
+    if issues is not None and final_col_name in numeric_cols:
+        reasons = issues.where(df[final_col_name].isna() & (issues != ''))
+        for reason, rows in reasons.groupby(reasons).groups.items():
+            styler.format("{:.8f}", subset=(rows, [final_col_name]), na_rep=f"Invalid: {reason}")
+    return styler
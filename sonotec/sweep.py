@@ -0,0 +1,163 @@
+"""Parameter sweeps and one-at-a-time sensitivity for the airborne and impact path formulas."""
+import itertools
+
+import numpy as np
+
+from sonotec.core import FORMULAS
+
+SWEEP_CHUNK_POINTS = 1_000_000
+
+
+# --- Blocks of a grid with at most chunk_points points: whole trailing axes while they fit, part of the
+# next axis, single indexes of the axes before it. Yields one tuple of slices per block. ---
+def _blocks(shape, chunk_points):
+    block = [1] * len(shape)
+    size = 1
+    for axis in reversed(range(len(shape))):
+        block[axis] = min(shape[axis], max(1, chunk_points // size))
+        size *= block[axis]
+        if block[axis] < shape[axis]:
+            break
+    for start in itertools.product(*(range(0, n, b) for n, b in zip(shape, block))):
+        yield tuple(slice(s, min(s + b, n)) for s, b, n in zip(start, block, shape))
+
+
+# --- Full Cartesian grid over the swept inputs, block by block with broadcasting ---
+# fixed:  {column: scalar} for every formula input that is not swept
+# ranges: {column: 1-D array of values}; the grid has one axis per swept input, in this order
+# Yields (index, block) with block = grid[index] and at most chunk_points points, so every temporary
+# stays bounded whatever the shape; on_progress(fraction) is called after every block
+def grid_slabs(formula, fixed, ranges, chunk_points=SWEEP_CHUNK_POINTS, dtype=np.float32, on_progress=None):
+    columns, engine = FORMULAS[formula]
+    axes = list(ranges)
+    unknown = [c for c in axes if c not in columns]
+    if unknown:
+        raise ValueError(f"Unknown {formula} input(s): {', '.join(unknown)}")
+    missing = [c for c in columns if c not in ranges and c not in fixed]
+    if missing:
+        raise ValueError(f"Missing fixed value(s) for: {', '.join(missing)}")
+
+    values = [np.asarray(ranges[c], dtype=float).ravel() for c in axes]
+    shape = tuple(len(v) for v in values)
+    if 0 in shape:
+        return
+
+    total, done = int(np.prod(shape, dtype=np.int64)), 0
+    for index in _blocks(shape, chunk_points):
+        inputs = {column: v[index[axis]].reshape([-1 if a == axis else 1 for a in range(len(axes))])
+                  for axis, (column, v) in enumerate(zip(axes, values))}
+        args = [inputs[c] if c in inputs else fixed[c] for c in columns]
+        block, _ = engine(*args)
+        block_shape = tuple(i.stop - i.start for i in index)
+        yield index, np.broadcast_to(block, block_shape).astype(dtype)
+        done += int(np.prod(block_shape, dtype=np.int64))
+        if on_progress is not None:
+            on_progress(done / total)
+
+# --- The whole grid in one array; holds every point, so only for grids known to be small ---
+def evaluate_grid(formula, fixed, ranges, chunk_points=SWEEP_CHUNK_POINTS, dtype=np.float32, on_progress=None):
+    result = np.empty(tuple(len(np.asarray(v).ravel()) for v in ranges.values()), dtype=dtype)
+    for index, block in grid_slabs(formula, fixed, ranges, chunk_points, dtype, on_progress):
+        result[index] = block
+    return result
+
+
+# --- Worst case over the axes that are not plotted (lowest R_ij,w / highest L_n,ij,w) ---
+def worst_case(formula, values, keep_axes):
+    reduce = np.nanmin if formula == 'airborne' else np.nanmax
+    drop = tuple(a for a in range(values.ndim) if a not in keep_axes)
+    with np.errstate(all='ignore'):
+        return reduce(values, axis=drop) if drop else values
+
+
+# --- Block-wise downsampling of a 1-D/2-D result to at most max_cells per axis ---
+# Each block keeps its worst case so a downsampled heatmap never looks better than the full grid.
+def downsample(formula, values, axis_values, max_cells=100):
+    out_axes = []
+    for axis, v in enumerate(axis_values):
+        values, starts = _downsample_axis(formula, values, axis, max_cells)
+        out_axes.append(np.asarray(v)[starts])
+    return values, out_axes
+
+def _block_starts(n, max_cells):
+    return np.linspace(0, n, max_cells, endpoint=False).astype(np.intp) if n > max_cells else slice(None)
+
+def _downsample_axis(formula, values, axis, max_cells):
+    starts = _block_starts(values.shape[axis], max_cells)
+    if isinstance(starts, slice):
+        return values, starts
+    reduce = np.fmin.reduceat if formula == 'airborne' else np.fmax.reduceat
+    return reduce(values, starts, axis=axis), starts
+
+
+# --- Tornado sensitivity: swing of the result when one input moves from low to high ---
+# baseline: {column: value} for every input; ranges: {column: (low, high)}
+def sensitivity(formula, baseline, ranges):
+    columns, engine = FORMULAS[formula]
+    swept = list(ranges)
+
+    # 1 baseline scenario + a low and a high scenario per swept input, evaluated in one call
+    n = 1 + 2 * len(swept)
+    scenarios = {c: np.full(n, float(baseline[c])) for c in columns}
+    for i, column in enumerate(swept):
+        low, high = ranges[column]
+        scenarios[column][1 + 2 * i] = low
+        scenarios[column][2 + 2 * i] = high
+    result, _ = engine(*(scenarios[c] for c in columns))
+
+    low_result, high_result = result[1::2], result[2::2]
+    swing = high_result - low_result
+    order = np.argsort(-np.abs(np.nan_to_num(swing, nan=-np.inf)), kind='stable')
+    return {
+        'input': np.asarray(swept, dtype=object)[order],
+        'low': np.array([ranges[c][0] for c in swept], dtype=float)[order],
+        'high': np.array([ranges[c][1] for c in swept], dtype=float)[order],
+        'result_low': low_result[order],
+        'result_high': high_result[order],
+        'swing': swing[order],
+        'baseline': result[0],
+    }
+
+
+# --- What the explorer shows: worst-case view of the first two swept inputs, tornado and range ---
+# The grid is never held: each block is reduced to its worst case over the other inputs and folded into
+# the downsampling cells of the second plotted input as it is evaluated, so at most
+# (first axis x max_cells) values are kept besides one block.
+def sweep_summary(formula, baseline, ranges, max_cells=100, on_progress=None, chunk_points=SWEEP_CHUNK_POINTS):
+    axes = list(ranges)
+    if any(len(np.asarray(v).ravel()) == 0 for v in ranges.values()):
+        raise ValueError('Every swept input needs at least one value')
+    plot_axes = (0, 1) if len(axes) > 1 else (0,)
+    extreme = np.fmin if formula == 'airborne' else np.fmax
+    reduce = np.fmin.reduceat if formula == 'airborne' else np.fmax.reduceat
+    n_rows = len(ranges[axes[0]])
+    if len(plot_axes) > 1:
+        n_columns = len(ranges[axes[1]])
+        starts = _block_starts(n_columns, max_cells)
+        # Downsampling cell of every value of the second plotted input
+        cell = np.arange(n_columns) if isinstance(starts, slice) else np.searchsorted(starts, np.arange(n_columns), 'right') - 1
+        view = np.full((n_rows, cell[-1] + 1), np.nan)
+    else:
+        view = np.full(n_rows, np.nan)
+    low, high = np.nan, np.nan
+    for index, block in grid_slabs(formula, baseline, ranges, chunk_points, on_progress=on_progress):
+        worst = worst_case(formula, block, plot_axes)
+        rows = index[0]
+        if len(plot_axes) > 1:
+            # The block's columns fall into consecutive cells: reduce each run, then fold it in
+            cells, first = np.unique(cell[index[1]], return_index=True)
+            worst = reduce(worst, first, axis=1)
+            view[rows, cells] = extreme(view[rows, cells], worst)
+        else:
+            view[rows] = extreme(view[rows], worst)
+        low = np.fmin(low, np.fmin.reduce(block, axis=None))
+        high = np.fmax(high, np.fmax.reduce(block, axis=None))
+    view, _ = _downsample_axis(formula, view, 0, max_cells)
+    view_axes = [np.asarray(ranges[axes[a]])[_block_starts(len(ranges[axes[a]]), max_cells)] for a in plot_axes]
+    tornado = sensitivity(formula, baseline, {c: (v[0], v[-1]) for c, v in ranges.items()})
+    return {
+        'axes': [axes[a] for a in plot_axes], 'view': view, 'view_axes': view_axes,
+        'tornado': {k: v for k, v in tornado.items() if k != 'baseline'}, 'baseline': float(tornado['baseline']),
+        'n_points': int(np.prod([len(v) for v in ranges.values()], dtype=np.int64)),
+        'min': float(low), 'max': float(high),
+    }
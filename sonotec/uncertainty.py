@@ -0,0 +1,290 @@
+"""Monte Carlo uncertainty propagation for R_ij,w / L_n,ij,w and the combined R'_w / L'n,w.
+
+Samples are drawn in fixed-size chunks, each from its own child of one SeedSequence, so a run
+is reproducible for a given seed whether it executes in one process or is split across a pool.
+Percentiles come from per-path histograms around the nominal value with a fixed number of bins,
+whose width follows each path's scatter in a short pilot run. Memory is paths x HISTOGRAM_BINS
+counts however many samples are drawn, and only the bins a chunk touches are updated.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from sonotec.core import FORMULAS, _group_codes, _energetic_sum, calculate_separation_paths, calculate_impact_paths
+
+DISTRIBUTIONS = ('normal', 'uniform', 'triangular')
+
+# Upper bound on samples x paths evaluated at once
+CHUNK_ELEMENTS = 2_000_000
+# Blocks per process when partial results are reported
+PROGRESS_BLOCKS = 10
+# Histogram bins per path; a path's histogram spans SPAN_STDS pilot standard deviations (at least
+# MIN_SPAN dB) on either side of its nominal value, samples beyond it count in the outermost bins
+# (reported as clipped samples)
+HISTOGRAM_BINS = 256
+SPAN_STDS = 6.0
+MIN_SPAN = 0.5
+PILOT_SAMPLES = 512
+
+_SIGN = {'airborne': -1, 'impact': 1}
+
+
+# --- Zero-mean scatter of one input: width is the standard deviation (normal) or half-width ---
+def _draw(rng, kind, width, shape):
+    if kind == 'normal':
+        return rng.standard_normal(shape) * width
+    if kind == 'uniform':
+        return rng.uniform(-1.0, 1.0, shape) * width
+    if kind == 'triangular':
+        return rng.triangular(-1.0, 0.0, 1.0, shape) * width
+    raise ValueError(f"Unknown distribution '{kind}', expected one of {', '.join(DISTRIBUTIONS)}")
+
+
+# --- Per-column histograms centred on the nominal values, mergeable across chunks and processes ---
+# span: half-width per column; the bin width is span / (n_bins / 2), so every column has n_bins bins
+class _Histograms:
+    def __init__(self, center, span, n_bins=HISTOGRAM_BINS):
+        self.center = np.asarray(center, dtype=float)
+        self.n_bins = n_bins
+        self.resolution = 2 * np.broadcast_to(np.asarray(span, dtype=float), self.center.shape) / n_bins
+        self.counts = np.zeros((len(self.center), n_bins), dtype=np.int64)
+        self.total = np.zeros(len(self.center))
+        self.total_sq = np.zeros(len(self.center))
+        self.n = np.zeros(len(self.center), dtype=np.int64)
+        self.invalid = np.zeros(len(self.center), dtype=np.int64)
+        self.clipped = np.zeros(len(self.center), dtype=np.int64)
+
+    def add(self, values):
+        finite = np.isfinite(values)
+        bins = np.floor((values - self.center) / self.resolution + self.n_bins / 2)
+        # Samples beyond the span are kept in the outermost bins, and counted
+        self.clipped += (finite & ((bins < 0) | (bins > self.n_bins - 1))).sum(axis=0)
+        bins = np.clip(np.where(finite, bins, 0), 0, self.n_bins - 1).astype(np.intp)
+        flat = (np.arange(values.shape[1]) * self.n_bins + bins)[finite]
+        # Only the touched bins: no temporary the size of all histograms per chunk
+        np.add.at(self.counts.reshape(-1), flat, 1)
+        clean = np.where(finite, values, 0.0)
+        self.total += clean.sum(axis=0)
+        self.total_sq += (clean ** 2).sum(axis=0)
+        self.n += finite.sum(axis=0)
+        self.invalid += (~finite).sum(axis=0)
+
+    def merge(self, other):
+        self.counts += other.counts
+        self.total += other.total
+        self.total_sq += other.total_sq
+        self.n += other.n
+        self.invalid += other.invalid
+        self.clipped += other.clipped
+
+    def summary(self, percentiles):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = self.total / self.n
+            std = np.sqrt(np.maximum(self.total_sq / self.n - mean ** 2, 0.0))
+        cumulative = np.cumsum(self.counts, axis=1)
+        lower_edge = self.center[:, None] + (np.arange(self.n_bins) - self.n_bins / 2) * self.resolution[:, None]
+        result = np.full((len(self.center), len(percentiles)), np.nan)
+        for k, q in enumerate(percentiles):
+            rank = q / 100 * self.n
+            idx = np.argmax(cumulative >= rank[:, None], axis=1)
+            before = np.take_along_axis(cumulative, idx[:, None] - 1, axis=1)[:, 0] * (idx > 0)
+            in_bin = self.counts[np.arange(len(idx)), idx]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                fraction = np.clip((rank - before) / in_bin, 0.0, 1.0)
+            value = lower_edge[np.arange(len(idx)), idx] + fraction * self.resolution
+            result[:, k] = np.where(self.n > 0, value, np.nan)
+        return {'mean': mean, 'std': std, 'percentiles': result, 'samples': self.n, 'invalid': self.invalid,
+                'resolution': self.resolution, 'clipped': self.clipped}
+
+
+# --- Building table -> flanking-formula inputs, with direct paths embedded as neutral-geometry rows ---
+# Direct rows get K_ij = 0 and S = l_0 = l = 1, so the flanking formula reduces to
+# R_s,w + delta_R_Dd,w (airborne) or L_n,eq,0,w - delta_L_w - delta_L_d,w (impact).
+def building_inputs(formula, table):
+    columns, _ = FORMULAS[formula]
+    if formula == 'airborne':
+        _, valid = calculate_separation_paths(table)
+        is_direct = np.asarray(table['path']).astype(str) == 'Dd'
+    else:
+        _, valid, is_direct = calculate_impact_paths(table)
+    inputs = {c: np.asarray(table[c], dtype=float) if c in table else np.full(len(is_direct), np.nan) for c in columns}
+
+    if formula == 'airborne' and is_direct.any():
+        R_sw = np.asarray(table['R_sw'], dtype=float)
+        inputs['R_iw'] = np.where(is_direct, R_sw, inputs['R_iw'])
+        inputs['R_jw'] = np.where(is_direct, R_sw, inputs['R_jw'])
+        inputs['delta_R_ijw'] = np.where(is_direct, np.asarray(table['delta_R_Ddw'], dtype=float), inputs['delta_R_ijw'])
+    elif formula == 'impact' and is_direct.any():
+        inputs['R_iw'] = np.where(is_direct, 0.0, inputs['R_iw'])
+        inputs['R_jw'] = np.where(is_direct, 0.0, inputs['R_jw'])
+    neutral = ('K_ij', 'S_s', 'l_0', 'l_f') if formula == 'airborne' else ('K_ij', 'S_i', 'l_0', 'l_ij')
+    for column, value in zip(neutral, (0.0, 1.0, 1.0, 1.0)):
+        inputs[column] = np.where(is_direct, value, inputs[column])
+    # Unknown path labels stay invalid
+    inputs['K_ij'] = np.where(valid | is_direct, inputs['K_ij'], np.nan)
+    return inputs, is_direct
+
+
+# --- size samples of every path, and of every group when group_info is given: (samples, paths/groups) ---
+def _sample(formula, inputs, spreads, group_info, rng, size):
+    columns, engine = FORMULAS[formula]
+    n_paths = len(inputs[columns[0]])
+    sampled = dict(inputs)
+    for column, (kind, width) in spreads.items():
+        sampled[column] = inputs[column] + _draw(rng, kind, np.asarray(width, dtype=float), (size, n_paths))
+    values, _ = engine(*(np.broadcast_to(sampled[c], (size, n_paths)) for c in columns))
+    if group_info is None:
+        return values, None
+
+    # Energetic sum per group and sample, relative to the nominal group value for stability
+    order, starts, group_nominal, codes_sorted = group_info
+    sign = _SIGN[formula]
+    reference = group_nominal[codes_sorted]
+    with np.errstate(over='ignore', invalid='ignore'):
+        energy = 10 ** (sign * (values[:, order] - reference) / 10)
+        combined = sign * 10 * np.log10(np.add.reduceat(energy, starts, axis=1)) + group_nominal
+    return values, combined
+
+# --- Histogram half-widths from a pilot run, so the bins follow each path's (and group's) scatter ---
+# The pilot is drawn in chunks of chunk samples, like the run itself.
+def _pilot_spans(formula, inputs, spreads, group_info, seed, chunk):
+    rng = np.random.default_rng(seed)
+    sums = [None, None]
+    for start in range(0, PILOT_SAMPLES, chunk):
+        for k, values in enumerate(_sample(formula, inputs, spreads, group_info, rng, min(chunk, PILOT_SAMPLES - start))):
+            if values is None:
+                continue
+            finite = np.isfinite(values)
+            clean = np.where(finite, values, 0.0)
+            part = np.array([finite.sum(axis=0), clean.sum(axis=0), (clean ** 2).sum(axis=0)])
+            sums[k] = part if sums[k] is None else sums[k] + part
+    spans = []
+    for total in sums:
+        if total is None:
+            spans.append(None)
+            continue
+        n, mean_sum, sq_sum = total
+        with np.errstate(divide='ignore', invalid='ignore'):
+            std = np.sqrt(np.maximum(sq_sum / n - (mean_sum / n) ** 2, 0.0))
+        # Paths without a valid pilot sample keep the smallest span
+        spans.append(np.maximum(SPAN_STDS * np.nan_to_num(std), MIN_SPAN))
+    return spans
+
+# --- Worker: a contiguous range of chunks, returns partial histograms ---
+def _simulate_chunks(formula, inputs, spreads, group_info, chunk_seeds, chunk_sizes, spans):
+    columns, engine = FORMULAS[formula]
+    nominal, _ = engine(*(inputs[c] for c in columns))
+    paths = _Histograms(nominal, spans[0])
+    groups = None if group_info is None else _Histograms(group_info[2], spans[1])
+
+    for seed, size in zip(chunk_seeds, chunk_sizes):
+        values, combined = _sample(formula, inputs, spreads, group_info, np.random.default_rng(seed), size)
+        paths.add(values)
+        if groups is not None:
+            groups.add(combined)
+    return paths, groups
+
+
+# --- Monte Carlo run over all paths (and optionally their room pairs / receiving rooms) ---
+# table:   formula inputs per path (nominal values)
+# spreads: {column: (distribution, width)}; width is a scalar or one value per path
+# group:   optional pair/room key per path for the energetically combined result
+# on_progress(fraction, partial) gets the result over the samples drawn so far; the chunks are then
+# processed in several blocks per process so the partial results arrive regularly.
+def simulate(formula, table, spreads, n_samples=1_000_000, seed=0, group=None, percentiles=(5, 50, 95),
+             processes=1, on_progress=None):
+    columns, engine = FORMULAS[formula]
+    inputs = {c: np.asarray(table[c], dtype=float) for c in columns}
+    n_paths = len(inputs[columns[0]])
+    unknown = [c for c in spreads if c not in columns]
+    if unknown:
+        raise ValueError(f"Unknown {formula} input(s): {', '.join(unknown)}")
+    for kind, _ in spreads.values():
+        if kind not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution '{kind}', expected one of {', '.join(DISTRIBUTIONS)}")
+
+    group_info = group_keys = None
+    if group is not None:
+        nominal, _ = engine(*(inputs[c] for c in columns))
+        group_keys, codes = _group_codes(group)
+        group_nominal, _ = _energetic_sum(codes, len(group_keys), nominal, _SIGN[formula])
+        order = np.argsort(codes, kind='stable')
+        starts = np.searchsorted(codes[order], np.arange(len(group_keys)))
+        group_info = (order, starts, np.nan_to_num(group_nominal), codes[order])
+
+    # Fixed chunk layout: depends only on the sample and path counts, never on the process count
+    chunk = max(1, CHUNK_ELEMENTS // max(n_paths, 1))
+    sizes = [min(chunk, n_samples - start) for start in range(0, n_samples, chunk)]
+    # One more child seeds the pilot run that sets the histogram spans
+    *seeds, pilot_seed = np.random.SeedSequence(seed).spawn(len(sizes) + 1)
+    spans = _pilot_spans(formula, inputs, spreads, group_info, pilot_seed, chunk)
+
+    processes = max(1, min(processes, len(sizes)))
+    n_blocks = processes if on_progress is None else min(len(sizes), processes * PROGRESS_BLOCKS)
+    blocks = np.array_split(np.arange(len(sizes)), n_blocks)
+    jobs = [(formula, inputs, spreads, group_info, [seeds[i] for i in b], [sizes[i] for i in b], spans)
+            for b in blocks if len(b)]
+    block_samples = [sum(job[5]) for job in jobs]
+
+    # Histograms are merged block by block in a fixed order, so the sums are rounded the same way in every run
+    merged, done = None, 0
+    def merge(block, result):
+        nonlocal merged, done
+        if merged is None:
+            merged = result
+        else:
+            merged[0].merge(result[0])
+            if merged[1] is not None:
+                merged[1].merge(result[1])
+        done += block_samples[block]
+        if on_progress is not None:
+            on_progress(done / n_samples, _summary(merged, group_info, group_keys, percentiles))
+
+    if processes == 1:
+        for block, job in enumerate(jobs):
+            merge(block, _simulate_chunks(*job))
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            for block, result in enumerate(pool.map(_simulate_chunks, *zip(*jobs))):
+                merge(block, result)
+    return _summary(merged, group_info, group_keys, percentiles)
+
+def _summary(histograms, group_info, group_keys, percentiles):
+    paths, groups = histograms
+    out = {'percentiles': tuple(percentiles), 'nominal': paths.center, 'paths': paths.summary(percentiles)}
+    if groups is not None:
+        out['group'] = group_keys
+        out['group_nominal'] = np.where(np.isfinite(group_info[2]), groups.center, np.nan)
+        out['groups'] = groups.summary(percentiles)
+    return out
+
+
+# --- Result columns per path, or per room pair / receiving room when key is given ---
+def result_columns(run, key=None):
+    if key is None:
+        stats, columns = run['paths'], {'nominal': run['nominal']}
+    else:
+        stats, columns = run['groups'], {key: run['group'], 'nominal': run['group_nominal']}
+    columns.update(mean=stats['mean'], std=stats['std'])
+    for k, q in enumerate(run['percentiles']):
+        columns[f'P{q}'] = stats['percentiles'][:, k]
+    columns['invalid samples'] = stats['invalid']
+    # Bin width of the histogram the percentiles come from, and samples beyond its span
+    columns['resolution'] = stats['resolution']
+    columns['clipped samples'] = stats['clipped']
+    return columns
+
+# --- Calculator run: one path (inputs) or a whole building table (table), as result columns ---
+# on_progress(fraction, partial columns) as for simulate.
+def monte_carlo_columns(formula, spreads, n_samples, seed, percentiles, processes=1, inputs=None, table=None,
+                        on_progress=None):
+    key = None
+    if table is not None:
+        key = 'pair' if formula == 'airborne' else 'room'
+        inputs, is_direct = building_inputs(formula, table)
+        # The K_ij scatter does not apply to direct paths
+        spreads = {c: (kind, np.where(is_direct, 0.0, width) if c == 'K_ij' else width) for c, (kind, width) in spreads.items()}
+    progress = None if on_progress is None else lambda fraction, run: on_progress(fraction, result_columns(run, key))
+    run = simulate(formula, inputs, spreads, n_samples, seed, group=None if key is None else np.asarray(table[key]).astype(str),
+                   percentiles=percentiles, processes=processes, on_progress=progress)
+    return result_columns(run, key)
@@ -0,0 +1,155 @@
+"""Vectorized input validation: one error code per path row and a summary of all rows.
+
+Every check is one bit of a row's code (``uint64``, 0 = no findings), so a 100k-row table is
+checked in a few passes over whole columns and no row is ever handled on its own. Checks are either
+errors, the inputs the engine cannot compute (the row's result is NaN), or warnings, inputs that give
+a result but lie outside the calculator's input ranges or are physically implausible.
+
+    codes, summary = validate_paths('airborne', table)
+    describe_codes('airborne', codes)     # 'S_s ≤ 0; K_ij above 50' per row, '' where there is nothing
+"""
+import functools
+
+import numpy as np
+
+from sonotec.core import AIRBORNE_COLUMNS, IMPACT_COLUMNS, INPUT_BOUNDS
+
+ERROR = 'error'
+WARNING = 'warning'
+
+# Per formula: input columns, the area and coupling length of the log term, the ΔR columns
+VALIDATED_FORMULAS = {
+    'airborne': {'columns': AIRBORNE_COLUMNS, 'area': 'S_s', 'length': 'l_f', 'delta_R': ('delta_R_ijw',)},
+    'impact': {'columns': IMPACT_COLUMNS, 'area': 'S_i', 'length': 'l_ij', 'delta_R': ('delta_R_jw',)},
+}
+
+# Linings improve a flanking path by well under this; larger ΔR values are usually a typo
+DELTA_R_PLAUSIBLE_MAX = 30.0
+
+
+# --- Check registry: bit i of a code is checks(formula)[i] ---
+@functools.lru_cache(maxsize=None)
+def checks(formula):
+    spec = VALIDATED_FORMULAS[formula]
+    area, length = spec['area'], spec['length']
+    registry = [(f'missing:{c}', c, ERROR, f'{c} missing or not a number') for c in spec['columns']]
+    registry += [
+        ('l_0_zero', 'l_0', ERROR, 'l_0 = 0'),
+        (f'{length}_zero', length, ERROR, f'{length} = 0'),
+        (f'{area}_not_positive', area, ERROR, f'{area} ≤ 0'),
+        ('log_argument', length, ERROR, f'{area} / (l_0 · {length}) ≤ 0'),
+    ]
+    for c in spec['columns']:
+        low, high = INPUT_BOUNDS[c]
+        registry += [(f'below:{c}', c, WARNING, f'{c} below {low:g}'), (f'above:{c}', c, WARNING, f'{c} above {high:g}')]
+    registry.append(('K_ij_below_min', 'K_ij', WARNING, f'K_ij below K_ij,min = 10·lg(2·{length}·l_0 / {area})'))
+    registry += [(f'implausible:{c}', c, WARNING, f'{c} above {DELTA_R_PLAUSIBLE_MAX:g} dB') for c in spec['delta_R']]
+    return tuple(registry)
+
+@functools.lru_cache(maxsize=None)
+def severity_mask(formula, severity):
+    return np.uint64(sum(1 << bit for bit, check in enumerate(checks(formula)) if check[2] == severity))
+
+
+# --- Column values as float64; empty and non-numeric cells become NaN ---
+def _numeric(values):
+    values = np.asarray(values)
+    if values.dtype.kind in 'biuf':
+        return values.astype(float, copy=False)
+    import pandas as pd  # optional dependency, only needed for columns read as text
+    return pd.to_numeric(pd.Series(values.reshape(-1)), errors='coerce').to_numpy(dtype=float)
+
+def _rows(table):
+    for column in table.keys():
+        return len(np.asarray(table[column]).reshape(-1))
+    return 0
+
+
+# --- Codes of every row plus the summary; missing columns flag every row ---
+def validate_paths(formula, table):
+    spec = VALIDATED_FORMULAS[formula]
+    registry = checks(formula)
+    n_rows = _rows(table)
+    bit = {name: np.uint64(1 << i) for i, (name, *_) in enumerate(registry)}
+    codes = np.zeros(n_rows, dtype=np.uint64)
+
+    def flag(name, mask):
+        codes[mask] |= bit[name]
+
+    missing_columns = [c for c in spec['columns'] if c not in table]
+    values = {}
+    for c in spec['columns']:
+        values[c] = np.full(n_rows, np.nan) if c in missing_columns else _numeric(table[c])
+        flag(f'missing:{c}', ~np.isfinite(values[c]))
+
+    # Same guards as the engine, each reported on its own; NaN compares False, so a missing value is
+    # reported only as missing
+    area, length, l_0 = values[spec['area']], values[spec['length']], values['l_0']
+    reported = {'l_0': l_0 == 0, spec['length']: length == 0, spec['area']: area <= 0}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        flag('l_0_zero', reported['l_0'])
+        flag(f'{spec["length"]}_zero', reported[spec['length']])
+        flag(f'{spec["area"]}_not_positive', reported[spec['area']])
+        log_arg = area / (l_0 * length)
+        flag('log_argument', (area > 0) & (l_0 != 0) & (length != 0) & (log_arg <= 0))
+
+        # A value already reported as an error is not reported again as out of range
+        for c in spec['columns']:
+            low, high = INPUT_BOUNDS[c]
+            below = values[c] < low
+            flag(f'below:{c}', below & ~reported[c] if c in reported else below)
+            flag(f'above:{c}', values[c] > high)
+
+        # EN ISO 12354-1: K_ij,min = 10 lg(l_f l_0 (1/S_i + 1/S_j)), both elements taken as the given area
+        K_ij_min = 10 * np.log10(2 * length * l_0 / area)
+        flag('K_ij_below_min', (log_arg > 0) & (values['K_ij'] < K_ij_min))
+    for c in spec['delta_R']:
+        flag(f'implausible:{c}', values[c] > DELTA_R_PLAUSIBLE_MAX)
+
+    return codes, summarize(formula, codes, missing_columns)
+
+# --- Rows per check from the distinct codes (a table has few), not one pass per check ---
+def summarize(formula, codes, missing_columns=()):
+    registry = checks(formula)
+    unique, counts = np.unique(codes, return_counts=True)
+    bits = (unique[:, None] >> np.arange(len(registry), dtype=np.uint64)) & np.uint64(1)
+    per_check = counts @ bits.astype(np.int64)
+    errors = (codes & severity_mask(formula, ERROR)) != 0
+    return {
+        'rows': len(codes),
+        'errors': int(errors.sum()),
+        'warnings': int((~errors & ((codes & severity_mask(formula, WARNING)) != 0)).sum()),
+        'missing_columns': list(missing_columns),
+        'checks': {registry[i][0]: int(n) for i, n in enumerate(per_check) if n},
+    }
+
+# --- Merge the summaries of several chunks of one table ---
+def combine_summaries(summaries):
+    combined = {'rows': 0, 'errors': 0, 'warnings': 0, 'missing_columns': [], 'checks': {}}
+    for summary in summaries:
+        for key in ('rows', 'errors', 'warnings'):
+            combined[key] += summary[key]
+        combined['missing_columns'] += [c for c in summary['missing_columns'] if c not in combined['missing_columns']]
+        for name, n in summary['checks'].items():
+            combined['checks'][name] = combined['checks'].get(name, 0) + n
+    return combined
+
+# --- Summary as table rows: check, column, severity, message, rows (errors first, most rows first) ---
+def summary_rows(formula, summary):
+    registry = {name: (column, severity, message) for name, column, severity, message in checks(formula)}
+    rows = [{'check': name, 'column': registry[name][0], 'severity': registry[name][1], 'message': registry[name][2],
+             'rows': n} for name, n in summary['checks'].items()]
+    return sorted(rows, key=lambda r: (r['severity'] != ERROR, -r['rows']))
+
+
+# --- Row messages, formatted once per distinct code ---
+def describe_codes(formula, codes, severity=None):
+    registry = checks(formula)
+    unique, inverse = np.unique(np.asarray(codes, dtype=np.uint64), return_inverse=True)
+    texts = np.empty(len(unique), dtype=object)
+    texts[:] = ['; '.join(message for bit, (_, _, level, message) in enumerate(registry)
+                          if int(code) >> bit & 1 and severity in (None, level)) for code in unique]
+    return texts[inverse.reshape(-1)]
+
+def is_valid(formula, codes):
+    return (np.asarray(codes, dtype=np.uint64) & severity_mask(formula, ERROR)) == 0
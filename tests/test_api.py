@@ -0,0 +1,110 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from sonotec.api import ARROW_TYPE, BatchServer, encode_json, process
+from sonotec.core import AIRBORNE_COLUMNS, calculate_airborne_r_total
+
+ROW = {'R_iw': 50.0, 'R_jw': 40.0, 'delta_R_ijw': 5.0, 'K_ij': 10.0, 'S_s': 10.0, 'l_0': 1.0, 'l_f': 1.0}
+
+
+# --- Raw HTTP/1.1 exchange with a server on a free port: one response (status, headers, body) per request ---
+def _exchange(*requests):
+    async def run():
+        batch_server = BatchServer(workers=1)
+        server = await asyncio.start_server(batch_server.handle_connection, '127.0.0.1', 0, limit=64 * 1024)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        responses = []
+        try:
+            for request in requests:
+                writer.write(request)
+                await writer.drain()
+                head = await reader.readuntil(b'\r\n\r\n')
+                status_line, *lines = head.decode('latin-1').split('\r\n')
+                headers = {k.lower(): v.strip() for k, _, v in (l.partition(':') for l in lines if l)}
+                body = await reader.readexactly(int(headers['content-length']))
+                responses.append((int(status_line.split()[1]), headers, body))
+        finally:
+            writer.close()
+            server.close()
+            await server.wait_closed()
+        return responses
+    return asyncio.run(run())
+
+def _post(path, payload, headers=''):
+    body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+    return (f'POST {path} HTTP/1.1\r\nHost: test\r\nContent-Type: application/json\r\n{headers}'
+            f'Content-Length: {len(body)}\r\n\r\n').encode() + body
+
+
+def test_column_and_row_json_round_trip():
+    columns = {c: [ROW[c], ROW[c]] for c in AIRBORNE_COLUMNS}
+    columns['l_f'] = [1.0, 0.0]
+    rows = [{c: columns[c][i] for c in AIRBORNE_COLUMNS} for i in range(2)]
+    (status, headers, body), (row_status, _, row_body) = _exchange(_post('/v1/airborne', columns),
+                                                                   _post('/v1/airborne', {'paths': rows}))
+    assert status == row_status == 200 and headers['connection'] == 'keep-alive'
+    result = json.loads(body)
+    assert result == json.loads(row_body)
+    assert result['R_ij_w'][0] == pytest.approx(calculate_airborne_r_total(ROW))
+    # Invalid rows are null, with the reason in error_code
+    assert result['R_ij_w'][1] is None and result['valid'] == [True, False] and result['error_code'][1] != 0
+
+
+def test_overflow_is_null_not_infinity():
+    columns = {c: [ROW[c]] for c in AIRBORNE_COLUMNS}
+    columns['R_iw'] = columns['R_jw'] = [1e308]
+    (status, _, body), = _exchange(_post('/v1/airborne', columns))
+    assert status == 200 and b'Infinity' not in body
+    assert json.loads(body)['R_ij_w'] == [None]
+    assert json.loads(encode_json({'x': np.array([np.inf, -np.inf, np.nan, 1.5])})) == {'x': [None, None, None, 1.5]}
+
+
+def test_separation_totals():
+    table = {'pair': ['a', 'a'], 'path': ['Dd', 'Ff'], 'R_sw': [52.0, None], 'delta_R_Ddw': [0.0, None],
+             **{c: [None, ROW[c]] for c in AIRBORNE_COLUMNS}}
+    (status, _, body), = _exchange(_post('/v1/separation', table))
+    expected = -10 * np.log10(10 ** -5.2 + 10 ** (-calculate_airborne_r_total(ROW) / 10))
+    assert status == 200 and json.loads(body)['R_w_apparent'][0] == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('request_bytes, status', [
+    (_post('/v1/airborne', b'{not json'), 400),
+    (_post('/v1/airborne', {'R_iw': [[1, 2]]}), 400),
+    (_post('/v1/airborne', {'R_iw': ['x']}), 400),
+    (_post('/v1/airborne', {'paths': [1, 2]}), 400),
+    (_post('/v1/airborne', {'R_iw': [1.0]}), 422),
+    (_post('/v1/airborne', {**{c: [1.0] for c in AIRBORNE_COLUMNS}, 'R_iw': [1.0, 2.0]}), 422),
+    (_post('/v1/unknown', {}), 404),
+    (b'GET /v1/airborne HTTP/1.1\r\nHost: test\r\n\r\n', 405),
+    (b'POST /v1/airborne HTTP/1.1\r\nContent-Length: -1\r\n\r\n', 400),
+])
+def test_malformed_requests(request_bytes, status):
+    (answer, _, body), = _exchange(request_bytes)
+    assert answer == status and 'error' in json.loads(body)
+
+
+def test_oversized_header_line_is_answered():
+    request = b'POST /v1/airborne HTTP/1.1\r\nX-Long: ' + b'a' * 100_000 + b'\r\nContent-Length: 0\r\n\r\n'
+    (status, headers, _), = _exchange(request)
+    assert status == 431 and headers['connection'] == 'close'
+
+
+def test_health():
+    (status, _, body), = _exchange(b'GET /v1/health HTTP/1.1\r\nHost: test\r\n\r\n')
+    assert status == 200 and json.loads(body)['status'] == 'ok'
+
+
+def test_arrow_round_trip():
+    pa = pytest.importorskip('pyarrow')
+    table = pa.table({c: [ROW[c]] for c in AIRBORNE_COLUMNS})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    n_rows, content_type, payload = process('/v1/airborne', ARROW_TYPE, ARROW_TYPE, sink.getvalue().to_pybytes())
+    result = pa.ipc.open_stream(payload).read_all()
+    assert n_rows == 1 and content_type == ARROW_TYPE
+    assert result.column('R_ij_w')[0].as_py() == pytest.approx(calculate_airborne_r_total(ROW))
@@ -0,0 +1,95 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from sonotec.assignment import AssignmentProblem, assignment_tables, optimize_assignment
+from sonotec.catalog import ProductCatalog
+from sonotec.core import calculate_separation_table
+
+# Two variants: cheap and moderate, dear and strong; 'X' junctions only take the dear one
+CATALOG = ProductCatalog([
+    {'variant': 'soft', 'shore_a': 40, 'junction_type': 'T', 'material': 'CLT', 'load_min': 0, 'load_max': 100,
+     'K_ij': 16.0, 'delta_R': 2.0, 'cost': 10.0},
+    {'variant': 'hard', 'shore_a': 60, 'junction_type': 'T', 'material': 'CLT', 'load_min': 0, 'load_max': 100,
+     'K_ij': 22.0, 'delta_R': 4.0, 'cost': 25.0},
+    {'variant': 'hard', 'shore_a': 60, 'junction_type': 'X', 'material': 'CLT', 'load_min': 0, 'load_max': 100,
+     'K_ij': 22.0, 'delta_R': 4.0, 'cost': 25.0},
+], version='test')
+N_JUNCTIONS = 7
+N_PAIRS = 6
+# Met only with a mix of both variants
+TARGET = 55.0
+
+
+# Per room pair a Dd path and Ff/Fd/Df over two junctions; junction 0 is an X junction
+def _building(seed=0):
+    rng = np.random.default_rng(seed)
+    edges = np.column_stack([np.arange(N_PAIRS), rng.integers(0, N_JUNCTIONS, N_PAIRS)])
+    junction = np.concatenate([np.full((N_PAIRS, 1), -1), np.repeat(edges, 3, axis=1)], axis=1).reshape(-1)
+    n = len(junction)
+    return {
+        'pair': np.repeat([f'P{i}' for i in range(N_PAIRS)], 7), 'path': np.tile(['Dd'] + ['Ff', 'Fd', 'Df'] * 2, N_PAIRS),
+        'junction': np.where(junction >= 0, np.char.add('J', junction.astype(str)), ''),
+        'junction_type': np.where(junction == 0, 'X', 'T'), 'material': np.full(n, 'CLT'),
+        'load': rng.uniform(10, 50, n),
+        'R_iw': rng.uniform(38, 44, n), 'R_jw': rng.uniform(38, 44, n), 'delta_R_ijw': np.zeros(n),
+        'K_ij': rng.uniform(6, 10, n), 'S_s': np.full(n, 12.0), 'l_0': np.ones(n), 'l_f': rng.uniform(2, 5, n),
+        'R_sw': rng.uniform(58, 62, n), 'delta_R_Ddw': np.zeros(n),
+    }
+
+
+# Apparent R'_w computed from scratch with the chosen variants' K_ij / delta R in the path table
+def _forward(table, problem, assignment):
+    table = {c: np.array(v, copy=True) for c, v in table.items()}
+    variant = dict(zip(problem.junctions, problem.variants[assignment]))
+    for i, junction in enumerate(table['junction']):
+        if variant.get(junction, 'none') != 'none':
+            row = CATALOG.lookup(table['junction_type'][i], 'CLT', table['load'][i])
+            pick = list(row['variant']).index(variant[junction])
+            table['K_ij'][i], table['delta_R_ijw'][i] = row['K_ij'][pick], row['delta_R'][pick]
+    return calculate_separation_table(table)['R_w_apparent']
+
+
+def test_search_finds_the_cheapest_feasible_assignment():
+    table = _building()
+    problem = AssignmentProblem('airborne', table, CATALOG, TARGET)
+    assert problem.reachable.all() and not problem.feasible(np.zeros(problem.n_junctions, dtype=np.intp))
+
+    best = min((cost, options) for options in itertools.product(range(3), repeat=problem.n_junctions)
+               if np.isfinite(cost := problem.cost(np.array(options))) and problem.feasible(np.array(options)))
+    assignment, info = optimize_assignment(problem, restarts=3, kicks=50, workers=1)
+    assert problem.cost(assignment) == pytest.approx(best[0])
+    assert info['greedy_cost'] >= problem.cost(assignment)
+
+    apparent = _forward(table, problem, assignment)
+    assert np.allclose(problem.apparent(assignment), apparent)
+    assert (apparent >= TARGET - 1e-9).all()
+
+    junctions, groups, summary = assignment_tables(problem, assignment)
+    assert groups['met'].all() and summary['cost'] == pytest.approx(best[0])
+    assert np.allclose(groups['without_bearings'], calculate_separation_table(table)['R_w_apparent'])
+    assert junctions['variant'][list(problem.junctions).index('J0')] == 'hard'
+    assert set(junctions['variant']) == {'soft', 'hard'}
+
+
+def test_count_objective_and_unreachable_groups():
+    table = _building()
+    # P0 gets a direct path too weak for the target: it can never be met and does not constrain the search
+    table['R_sw'] = np.where(table['pair'] == 'P0', 40.0, table['R_sw'])
+    problem = AssignmentProblem('airborne', table, CATALOG, TARGET, objective='count')
+    assignment, _ = optimize_assignment(problem, restarts=2, kicks=20, workers=1)
+    _, groups, summary = assignment_tables(problem, assignment)
+    assert list(groups['reachable']) == [False] + [True] * (N_PAIRS - 1)
+    assert summary['unreachable'] == 1 and groups['met'][1:].all() and not groups['met'][0]
+    assert problem.cost(assignment) == summary['bearings']
+
+
+def test_problem_errors():
+    table = _building()
+    with pytest.raises(ValueError, match="Unknown objective"):
+        AssignmentProblem('airborne', table, CATALOG, TARGET, objective='weight')
+    with pytest.raises(ValueError, match='Missing column'):
+        AssignmentProblem('airborne', {c: v for c, v in table.items() if c != 'load'}, CATALOG, TARGET)
+    with pytest.raises(ValueError, match='No flanking path names a junction'):
+        AssignmentProblem('airborne', {**table, 'junction': np.full(len(table['pair']), '')}, CATALOG, TARGET)
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from sonotec.bands import (
+    BANDS_EXTENDED, BANDS_STANDARD, REFERENCE_AIRBORNE, REFERENCE_IMPACT,
+    SPECTRUM_1, SPECTRUM_1_5000, rate_airborne, rate_impact,
+)
+
+# Worked example of the ISO 717-1 procedure (reference curve shift, adaptation terms), 50-5000 Hz
+EXAMPLE_R = np.array([23, 26, 29, 31, 33, 35, 38, 41, 44, 47, 50, 52, 54, 56, 57, 58, 58, 57, 55, 56, 58], dtype=float)
+
+
+def _energetic(levels):
+    return 10 * np.log10(np.sum(10 ** (np.asarray(levels) / 10)))
+
+
+# Table 4 spectra are normalized to 0 dB A-weighted over each frequency range (values rounded to whole dB)
+@pytest.mark.parametrize('spectrum, low, high', [
+    (SPECTRUM_1, 100, 3150), (SPECTRUM_1, 50, 3150), (SPECTRUM_1_5000, 50, 5000), (SPECTRUM_1_5000, 100, 5000),
+])
+def test_spectrum_1_normalized_per_range(spectrum, low, high):
+    part = slice(BANDS_EXTENDED.index(low), BANDS_EXTENDED.index(high) + 1)
+    assert abs(_energetic(spectrum[part])) < 0.05
+
+
+def test_worked_example_airborne():
+    # Unfavourable deviations at the unshifted reference curve: 2+3+4+4+4+4+4+2+1+1 = 29 dB <= 32;
+    # shifted by +1 dB: 40 dB > 32, so R_w is the reference value at 500 Hz, 52 dB.
+    # X_A = -10 lg sum 10^((L_i - R_i)/10): 49.87 (C), 45.26 (C_tr), 49.19 (C_50-3150), 50.01 (C_50-5000),
+    # 41.65 (C_tr,50-3150 and C_tr,50-5000); C = X_A - R_w rounded to whole dB.
+    rating = rate_airborne(EXAMPLE_R, BANDS_EXTENDED)
+    expected = {'R_w': 52, 'C': -2, 'C_tr': -7, 'C_50_3150': -3, 'C_tr_50_3150': -10, 'C_50_5000': -2, 'C_tr_50_5000': -10}
+    assert {name: float(value) for name, value in rating.items()} == expected
+
+
+def test_flat_spectrum_has_no_adaptation_terms():
+    # A spectrum level with frequency rates the same for every range, C = C_50-3150 = C_50-5000 = 0
+    rating = rate_airborne(np.full(len(BANDS_EXTENDED), 40.0), BANDS_EXTENDED)
+    assert rating['R_w'] == 40
+    for name in ('C', 'C_50_3150', 'C_50_5000'):
+        assert rating[name] == 0
+
+
+def test_reference_curves():
+    # The reference curve itself may be shifted by 2 dB (16 bands x 2 dB = 32 dB of deviations)
+    assert rate_airborne(REFERENCE_AIRBORNE)['R_w'] == 54
+    assert rate_impact(REFERENCE_IMPACT)['L_nw'] == 58
+
+
+def _rating_by_steps(values, reference, airborne):
+    # The procedure of the standard: shift in 1 dB steps, keep the deviations <= 32 dB
+    shifts = np.arange(-100, 101)
+    deviations = [np.maximum(reference + s - values if airborne else values - reference - s, 0).sum() for s in shifts]
+    allowed = shifts[np.array(deviations) <= 32]
+    return reference[7] + (allowed.max() if airborne else allowed.min())
+
+
+def test_ratings_match_stepwise_procedure():
+    spectra = np.random.default_rng(717).uniform(10, 90, (500, len(BANDS_STANDARD)))
+    airborne = rate_airborne(spectra)['R_w']
+    impact = rate_impact(spectra)['L_nw']
+    assert np.array_equal(airborne, [_rating_by_steps(v, REFERENCE_AIRBORNE, True) for v in spectra])
+    assert np.array_equal(impact, [_rating_by_steps(v, REFERENCE_IMPACT, False) for v in spectra])
+
+
+def test_missing_band_gives_nan():
+    spectrum = np.array(EXAMPLE_R[3:19])
+    spectrum[4] = np.nan
+    assert np.isnan(rate_airborne(spectrum)['R_w'])
@@ -0,0 +1,64 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sonotec.batch import compute_path_chunk, read_path_chunks, stream_path_file
+from sonotec.core import AIRBORNE_COLUMNS, INPUT_BOUNDS, calculate_airborne_table
+
+CHUNK_ROWS = 100
+
+
+def _airborne_csv(n_rows=350, seed=0):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({c: rng.uniform(*INPUT_BOUNDS[c], n_rows) for c in AIRBORNE_COLUMNS})
+    # Whole numbers in the first chunk are read as int64, later chunks as float64
+    frame['K_ij'] = frame['K_ij'].astype(object)
+    frame.loc[:CHUNK_ROWS - 1, 'K_ij'] = rng.integers(5, 20, CHUNK_ROWS)
+    # A free-text column that is empty in the first chunk
+    frame['note'] = [None] * (n_rows - 10) + ['checked'] * 10
+    frame.loc[CHUNK_ROWS + 5, 'l_f'] = 0.0
+    return frame, frame.to_csv(index=False).encode()
+
+
+def test_chunks_are_read_with_different_types():
+    _, data = _airborne_csv()
+    chunks = list(read_path_chunks(io.BytesIO(data), 'paths.csv', CHUNK_ROWS))
+    assert len(chunks) == 4
+    assert chunks[0]['K_ij'].dtype.kind == 'i' and chunks[1]['K_ij'].dtype.kind == 'f'
+
+
+def test_multi_chunk_parquet_equals_one_pass(tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    frame, data = _airborne_csv()
+    out_path = tmp_path / 'results.parquet'
+    stats = stream_path_file(io.BytesIO(data), 'paths.csv', 'auto', str(out_path), 'parquet', chunk_rows=CHUNK_ROWS)
+    assert stats['mode'] == 'airborne' and stats['rows'] == len(frame) and stats['invalid'] == 1
+
+    result = pq.read_table(out_path)
+    assert result.schema.field('K_ij').type == 'double'
+    assert result.schema.field('note').type == 'string'
+    result = result.to_pandas()
+    # Compared with the file as read in one pass (CSV text rounds the inputs)
+    whole = pd.read_csv(io.BytesIO(data))
+    expected, valid = calculate_airborne_table(whole[list(AIRBORNE_COLUMNS)].astype(float))
+    assert np.array_equal(result['R_ij_w'].to_numpy(), expected, equal_nan=True)
+    assert np.array_equal(result['valid'].to_numpy(), valid)
+    assert result['note'].notna().sum() == 10
+    assert result.loc[CHUNK_ROWS + 5, 'error_code'] != 0
+
+
+def test_multi_chunk_csv_equals_one_pass(tmp_path):
+    frame, data = _airborne_csv()
+    out_path = tmp_path / 'results.csv.gz'
+    stream_path_file(io.BytesIO(data), 'paths.csv', 'airborne', str(out_path), 'csv', chunk_rows=CHUNK_ROWS)
+    result = pd.read_csv(out_path)
+    assert len(result) == len(frame)
+    assert np.allclose(result['R_ij_w'], compute_path_chunk(frame, 'airborne')['R_ij_w'], equal_nan=True)
+
+
+def test_missing_columns():
+    frame, _ = _airborne_csv()
+    with pytest.raises(ValueError, match='Missing column'):
+        compute_path_chunk(frame.drop(columns='K_ij').head(10), 'airborne')
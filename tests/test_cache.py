@@ -0,0 +1,125 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from sonotec import cache, core
+from sonotec.cache import ResultCache, TableHasher, formula_fingerprint, table_digest
+from sonotec.core import AIRBORNE_COLUMNS
+
+pytest.importorskip('pyarrow')
+
+
+@pytest.fixture
+def fresh_fingerprint():
+    formula_fingerprint.cache_clear()
+    yield
+    formula_fingerprint.cache_clear()
+
+
+# Fake clock: every call is one second later, so access order never ties
+@pytest.fixture
+def clock(monkeypatch):
+    ticks = itertools.count(1_000_000)
+    monkeypatch.setattr(cache.time, 'time', lambda: float(next(ticks)))
+
+
+def _guard_without_log_argument(S, l_0, l):
+    S, l_0, l = (np.asarray(v, dtype=float) for v in (S, l_0, l))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_arg = S / (l_0 * l)
+        valid = (l_0 != 0) & (l != 0) & (S > 0)
+        return 10 * np.log10(np.where(valid, np.abs(log_arg), 1.0)), valid
+
+
+def _guard_with_minimum_area(S, l_0, l):
+    S, l_0, l = (np.asarray(v, dtype=float) for v in (S, l_0, l))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_arg = S / (l_0 * l)
+        valid = (l_0 != 0) & (l != 0) & (S > 1e-6) & (log_arg > 0)
+        return 10 * np.log10(np.where(valid, log_arg, 1.0)), valid
+
+
+# A changed guard changes the fingerprint although the file, and so the source hash, stays the same
+@pytest.mark.parametrize('guard', [_guard_without_log_argument, _guard_with_minimum_area])
+def test_fingerprint_follows_guards(monkeypatch, fresh_fingerprint, guard):
+    before = formula_fingerprint()
+    monkeypatch.setattr(core, '_coupling_log_term', guard)
+    formula_fingerprint.cache_clear()
+    assert formula_fingerprint() != before
+
+
+def test_fingerprint_follows_version_and_source(monkeypatch, fresh_fingerprint):
+    before = formula_fingerprint()
+    assert formula_fingerprint() == before
+    monkeypatch.setattr(cache, 'FORMULA_VERSION', core.FORMULA_VERSION + 1)
+    formula_fingerprint.cache_clear()
+    bumped = formula_fingerprint()
+    assert bumped != before
+
+    monkeypatch.setattr(cache.inspect, 'getsource', lambda module: '# edited\n')
+    formula_fingerprint.cache_clear()
+    assert formula_fingerprint() not in (before, bumped)
+
+
+def test_key_follows_fingerprint(monkeypatch, fresh_fingerprint, tmp_path):
+    results = ResultCache(str(tmp_path))
+    key = results.key('airborne', 'digest', catalog_version=1)
+    assert results.key('airborne', 'digest', catalog_version=1) == key
+    assert results.key('airborne', 'digest', catalog_version=2) != key
+    monkeypatch.setattr(cache, 'FORMULA_VERSION', core.FORMULA_VERSION + 1)
+    formula_fingerprint.cache_clear()
+    assert results.key('airborne', 'digest', catalog_version=1) != key
+
+
+# Neither the chunking nor the input dtypes nor extra columns change the digest; a changed value does
+def test_table_digest_is_independent_of_chunking():
+    rng = np.random.default_rng(0)
+    table = {c: rng.uniform(0, 50, 100) for c in AIRBORNE_COLUMNS}
+    table['K_ij'] = np.round(table['K_ij'])
+    table['pair'] = np.repeat(['A', 'B'], 50)
+    digest = table_digest(table, AIRBORNE_COLUMNS, labels=('pair',))
+
+    hasher = TableHasher(AIRBORNE_COLUMNS, labels=('pair',))
+    for start in (0, 7, 60):
+        stop = {0: 7, 7: 60, 60: 100}[start]
+        chunk = {c: v[start:stop] for c, v in table.items()}
+        chunk['K_ij'] = chunk['K_ij'].astype(np.int64)
+        chunk['note'] = np.full(stop - start, 'x')
+        hasher.update(chunk)
+    assert hasher.hexdigest() == digest
+
+    table['l_f'] = table['l_f'].copy()
+    table['l_f'][42] += 1e-9
+    assert table_digest(table, AIRBORNE_COLUMNS, labels=('pair',)) != digest
+
+
+def test_put_get_round_trip(tmp_path):
+    results = ResultCache(str(tmp_path))
+    columns = {'R': np.array([52.5, np.nan, -0.0]), 'valid': np.array([True, False, True]),
+               'pair': np.array(['A', 'B', 'C'])}
+    key = results.key('airborne', 'digest')
+    assert results.get(key) is None
+    results.put(key, columns, 'airborne')
+    hit = results.get(key)
+    assert np.array_equal(hit['R'], columns['R'], equal_nan=True)
+    assert list(hit['valid']) == [True, False, True] and list(hit['pair']) == ['A', 'B', 'C']
+
+    results.alias('upload', key)
+    assert np.array_equal(results.get('upload')['R'], columns['R'], equal_nan=True)
+    assert results.stats()['entries'] == 1
+
+
+# The least recently read entries go first, down to EVICT_TO of max_bytes
+def test_eviction_is_least_recently_used(tmp_path, clock):
+    results = ResultCache(str(tmp_path))
+    keys = [results.key('airborne', f'digest {i}') for i in range(4)]
+    for key in keys:
+        results.put(key, {'R': np.arange(1000.0)})
+    size = results.stats()['bytes'] // 4
+    assert results.get(keys[0]) is not None
+
+    assert results.evict(max_bytes=3 * size) == 2
+    assert [results.get(key) is not None for key in keys] == [True, False, False, True]
+    assert results.stats()['entries'] == 2
+    assert sorted(p.name for p in tmp_path.glob('*.arrow')) == sorted(f'{k}.arrow' for k in (keys[0], keys[3]))
@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+
+from sonotec.core import (
+    AIRBORNE_COLUMNS, IMPACT_COLUMNS, INPUT_BOUNDS,
+    calculate_airborne_r_total, calculate_impact_level,
+    calculate_airborne_r_total_vectorized, calculate_impact_level_vectorized,
+    calculate_separation_table, calculate_building_impact_table,
+)
+
+# Formula 20 (EN ISO 12354-1): R_ij,w = (R_i,w + R_j,w)/2 + ΔR_ij,w + K_ij + 10 lg(S_s / (l_0 l_f))
+AIRBORNE_ROW = {'R_iw': 50.0, 'R_jw': 40.0, 'delta_R_ijw': 5.0, 'K_ij': 10.0, 'S_s': 10.0, 'l_0': 1.0, 'l_f': 1.0}
+# EN ISO 12354-2: L_n,ij,w = L_n,eq,0,w - ΔL_w + (R_i,w - R_j,w)/2 - ΔR_j,w - K_ij - 10 lg(S_i / (l_0 l_ij))
+IMPACT_ROW = {'L_neq0w': 80.0, 'delta_Lw': 20.0, 'R_iw': 50.0, 'R_jw': 40.0, 'delta_R_jw': 3.0, 'K_ij': 10.0,
+              'S_i': 10.0, 'l_0': 1.0, 'l_ij': 1.0}
+
+
+def _random_rows(columns, n, seed):
+    rng = np.random.default_rng(seed)
+    return {c: rng.uniform(*INPUT_BOUNDS[c], n) for c in columns}
+
+
+def test_airborne_path():
+    assert calculate_airborne_r_total(AIRBORNE_ROW) == pytest.approx(45 + 5 + 10 + 10)
+    assert calculate_airborne_r_total({**AIRBORNE_ROW, 'S_s': 20.0, 'l_f': 2.0}) == pytest.approx(70)
+
+
+def test_impact_path():
+    assert calculate_impact_level(IMPACT_ROW) == pytest.approx(80 - 20 + 5 - 3 - 10 - 10)
+
+
+# Each guard on its own: l_0 = 0, l = 0, S ≤ 0 and a non-positive log argument give no result
+@pytest.mark.parametrize('change', [{'l_0': 0.0}, {'length': 0.0}, {'area': 0.0}, {'area': -1.0}, {'l_0': -1.0},
+                                    {'length': -1.0}, {'area': np.nan}])
+def test_guards(change):
+    for row, area, length, function in ((AIRBORNE_ROW, 'S_s', 'l_f', calculate_airborne_r_total),
+                                        (IMPACT_ROW, 'S_i', 'l_ij', calculate_impact_level)):
+        names = {'area': area, 'length': length, 'l_0': 'l_0'}
+        assert np.isnan(function({**row, **{names[k]: v for k, v in change.items()}}))
+
+
+def test_two_negative_lengths_give_a_positive_log_argument():
+    assert calculate_airborne_r_total({**AIRBORNE_ROW, 'l_0': -1.0, 'l_f': -1.0}) == pytest.approx(70)
+
+
+def test_vectorized_matches_rows():
+    airborne = _random_rows(AIRBORNE_COLUMNS, 200, 1)
+    impact = _random_rows(IMPACT_COLUMNS, 200, 2)
+    R, valid = calculate_airborne_r_total_vectorized(*(airborne[c] for c in AIRBORNE_COLUMNS))
+    L, _ = calculate_impact_level_vectorized(*(impact[c] for c in IMPACT_COLUMNS))
+    assert valid.all()
+    assert np.allclose(R, [calculate_airborne_r_total({c: airborne[c][i] for c in AIRBORNE_COLUMNS}) for i in range(200)])
+    assert np.allclose(L, [calculate_impact_level({c: impact[c][i] for c in IMPACT_COLUMNS}) for i in range(200)])
+
+
+def _separation(pair, path, R_sw, R_iw):
+    n = len(path)
+    return {'pair': np.array(pair), 'path': np.array(path), 'R_sw': np.array(R_sw, dtype=float),
+            'delta_R_Ddw': np.zeros(n), **{c: np.full(n, AIRBORNE_ROW[c]) for c in AIRBORNE_COLUMNS if c != 'R_iw'},
+            'R_iw': np.array(R_iw, dtype=float)}
+
+
+def test_separation_energetic_sum():
+    # Dd = 52 dB, three flanking paths of (60 + 40)/2 + 5 + 10 + 10 = 75 dB
+    table = _separation(['a'] * 4 + ['b'] * 2, ['Dd', 'Ff', 'Fd', 'Df', 'Dd', 'Xx'], [52] * 6, [60] * 6)
+    result = calculate_separation_table(table)
+    expected = -10 * np.log10(10 ** -5.2 + 3 * 10 ** -7.5)
+    assert list(result['pair']) == ['a', 'b']
+    assert result['R_w_apparent'][0] == pytest.approx(expected)
+    assert list(result['n_paths']) == [4, 2]
+    # An unknown path label invalidates its pair
+    assert list(result['valid']) == [True, False]
+    assert np.isnan(result['R_w_apparent'][1])
+
+
+def test_energetic_sum_does_not_underflow():
+    # 10^(-R/10) underflows to 0 for R above ~3200 dB; the shifted sum keeps two equal paths at R - 3 dB
+    table = _separation(['a', 'a'], ['Dd', 'Dd'], [4000, 4000], [0, 0])
+    assert calculate_separation_table(table)['R_w_apparent'][0] == pytest.approx(4000 - 10 * np.log10(2))
+
+
+def test_building_impact_transmission():
+    n = 5
+    table = {'room': np.array(['r1', 'r1', 'r1', 'r2', 'r2']), 'path': np.array(['d', 'ij', 'Df', 'ij', 'DFf']),
+             **{c: np.full(n, IMPACT_ROW[c]) for c in IMPACT_COLUMNS}}
+    result = calculate_building_impact_table(table)
+    direct = 80 - 20 - 3
+    flanking = calculate_impact_level(IMPACT_ROW)
+    assert result['Ln_w_apparent'][0] == pytest.approx(10 * np.log10(10 ** (direct / 10) + 2 * 10 ** (flanking / 10)))
+    assert result['Ln_w_apparent'][1] == pytest.approx(flanking + 10 * np.log10(2))
+    assert list(result['transmission']) == ['vertical', 'diagonal']
+
+
+# An overflowing or infinite result is invalid and comes back as NaN, never as inf
+@pytest.mark.parametrize('change, impact_change', [
+    ({'R_iw': 1e308, 'R_jw': 1e308}, {'L_neq0w': 1e308, 'delta_Lw': -1e308}),
+    ({'K_ij': np.inf}, {'K_ij': np.inf}),
+    ({'R_iw': -np.inf}, {'R_iw': -np.inf}),
+])
+def test_overflow_is_invalid(change, impact_change):
+    inputs = {**AIRBORNE_ROW, **change}
+    R, valid = calculate_airborne_r_total_vectorized(*(np.array([inputs[c]]) for c in AIRBORNE_COLUMNS))
+    assert np.isnan(R).all() and not valid.any()
+    impact = {**IMPACT_ROW, **impact_change}
+    L, valid = calculate_impact_level_vectorized(*(np.array([impact[c]]) for c in IMPACT_COLUMNS))
+    assert np.isnan(L).all() and not valid.any()
+
+
+def test_overflowing_direct_path_invalidates_its_pair():
+    table = _separation(['a', 'a'], ['Dd', 'Ff'], [1e308, 52], [60, 60])
+    table['delta_R_Ddw'][0] = 1e308
+    result = calculate_separation_table(table)
+    assert not result['valid'][0] and np.isnan(result['R_w_apparent'][0])
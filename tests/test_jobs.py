@@ -0,0 +1,127 @@
+import os
+
+import pytest
+
+from sonotec import jobs
+from sonotec.jobs import MAX_ATTEMPTS, JobQueue, input_file_name
+
+SWEEP = {'formula': 'airborne', 'max_cells': 20,
+         'baseline': {'R_iw': 50.0, 'R_jw': 45.0, 'delta_R_ijw': 3.0, 'K_ij': 12.0, 'S_s': 12.0, 'l_0': 1.0, 'l_f': 4.0},
+         'ranges': {'K_ij': [0.0, 10.0, 20.0], 'S_s': [6.0, 12.0]}}
+
+
+# 'echo' returns its params after one progress report; 'fail' raises
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    def echo(params, job):
+        job.progress(0.5, 'half way', {'seen': params})
+        return {'params': params, 'files': sorted(os.listdir(job.directory))}
+
+    def fail(params, job):
+        raise RuntimeError('no luck')
+
+    monkeypatch.setattr(jobs, 'PROGRESS_INTERVAL', 0.0)
+    monkeypatch.setitem(jobs.JOB_KINDS, 'echo', echo)
+    monkeypatch.setitem(jobs.JOB_KINDS, 'fail', fail)
+    return JobQueue(str(tmp_path / 'jobs'))
+
+
+def _status(queue, job_id, owner='alice'):
+    return {job['id']: job for job in queue.jobs(owner)}[job_id]
+
+
+def test_run_stores_result_and_error(queue):
+    done = queue.submit('alice', 'echo', {'n': 1}, files={'input.csv': b'a\n1\n'})
+    failed = queue.submit('alice', 'fail', {})
+    assert queue.active('alice') and not queue.active('bob')
+    assert queue.run_next() and queue.run_next() and not queue.run_next()
+
+    assert queue.result(done) == {'params': {'n': 1}, 'files': ['input.csv']}
+    assert queue.partial(done) == {'seen': {'n': 1}}
+    job = _status(queue, done)
+    assert job['status'] == 'done' and job['progress'] == 1 and job['message'] == 'half way' and job['attempts'] == 1
+    job = _status(queue, failed)
+    assert job['status'] == 'failed' and job['error'] == 'no luck' and queue.result(failed) is None
+    assert not queue.active('alice')
+
+
+def test_sweep_job(queue):
+    job_id = queue.submit('alice', 'sweep', SWEEP)
+    queue.run_next()
+    result = queue.result(job_id)
+    assert _status(queue, job_id)['status'] == 'done'
+    assert result['formula'] == 'airborne' and result['n_points'] == 6 and result['view'].shape == (3, 2)
+
+
+# Oldest job first, but never more running jobs per owner than max_per_owner
+def test_claim_is_fair_per_owner(queue):
+    first = queue.submit('alice', 'echo', {})
+    second = queue.submit('alice', 'echo', {})
+    other = queue.submit('bob', 'echo', {})
+    assert queue.claim()[0] == first
+    assert queue.claim()[0] == other
+    assert queue.claim() is None
+    assert _status(queue, second)['status'] == 'queued'
+
+
+def test_cancel(queue):
+    queued = queue.submit('alice', 'echo', {})
+    queue.cancel(queued)
+    job = _status(queue, queued)
+    assert job['status'] == 'cancelled' and job['finished'] is not None
+    assert queue.claim() is None
+
+    # A running job stops at its next progress report
+    running = queue.submit('alice', 'echo', {})
+    job_id, _, _ = queue.claim()
+    assert job_id == running
+    queue.cancel(running)
+    assert _status(queue, running)['status'] == 'running'
+    with pytest.raises(jobs.JobCancelled):
+        jobs.Job(queue, running).progress(0.1)
+
+    # Finished jobs can be deleted, active ones cannot
+    assert queue.delete(queued) and not os.path.exists(queue.job_directory(queued))
+    assert not queue.delete(running)
+
+
+def test_recover_requeues_jobs_of_dead_workers(queue, monkeypatch):
+    crashed = queue.submit('alice', 'echo', {})
+    cancelled = queue.submit('bob', 'echo', {})
+    queue.claim(), queue.claim()
+    queue.cancel(cancelled)
+
+    # The worker is this process, which is alive: nothing changes
+    queue.recover()
+    assert _status(queue, crashed)['status'] == 'running'
+
+    monkeypatch.setattr(jobs, '_process_alive', lambda pid: False)
+    queue.recover()
+    assert _status(queue, crashed)['status'] == 'queued'
+    assert _status(queue, cancelled, 'bob')['status'] == 'cancelled'
+
+    # After MAX_ATTEMPTS lost workers the job fails instead of running again
+    for _ in range(MAX_ATTEMPTS - 1):
+        assert queue.claim()[0] == crashed
+        queue.recover()
+    job = _status(queue, crashed)
+    assert job['status'] == 'failed' and job['attempts'] == MAX_ATTEMPTS and 'worker process stopped' in job['error']
+
+
+def test_file_names_are_checked(queue):
+    assert input_file_name('Building A.XLSX') == 'input.xlsx'
+    with pytest.raises(ValueError, match='Unsupported file type'):
+        input_file_name('paths.exe')
+    with pytest.raises(ValueError, match='Invalid file name'):
+        queue.submit('alice', 'echo', {}, files={'../escape.csv': b''})
+    with pytest.raises(ValueError, match='Unknown job kind'):
+        queue.submit('alice', 'shell', {})
+
+
+@pytest.mark.skipif(os.name != 'posix', reason='permission bits')
+def test_job_directory_is_private(tmp_path):
+    directory = tmp_path / 'shared'
+    directory.mkdir(mode=0o777)
+    os.chmod(directory, 0o777)
+    JobQueue(str(directory))
+    assert directory.stat().st_mode & 0o777 == 0o700
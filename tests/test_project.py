@@ -0,0 +1,113 @@
+import io
+
+import numpy as np
+import pytest
+
+from sonotec.core import INPUT_BOUNDS, calculate_building_impact_table, calculate_separation_table
+from sonotec.project import PROJECT_KINDS, load_project, project_from_table
+
+N_GROUPS = 300
+
+
+def _path_table(kind, seed=0):
+    spec = PROJECT_KINDS[kind]
+    rng = np.random.default_rng(seed)
+    n = N_GROUPS * len(spec['paths'])
+    table = {spec['group']: np.repeat([f'g{i}' for i in range(N_GROUPS)], len(spec['paths'])),
+             'path': np.tile(spec['paths'], N_GROUPS)}
+    table.update({c: rng.uniform(*INPUT_BOUNDS.get(c, (0.0, 60.0)), n) for c in spec['inputs']})
+    return table
+
+
+def _full_recompute(project):
+    table = project.path_table()
+    if project.kind == 'separation':
+        return calculate_separation_table(table)
+    return calculate_building_impact_table(table)
+
+
+def _assert_equal_totals(project):
+    expected = _full_recompute(project)
+    totals = project.totals_table()
+    for name, values in expected.items():
+        if np.asarray(values).dtype.kind == 'f':
+            assert np.allclose(totals[name], values, equal_nan=True, rtol=0, atol=1e-9), name
+        else:
+            assert np.array_equal(totals[name], values), name
+
+
+def _random_edits(project, rng, n_edits=50):
+    columns = project.input_columns
+    for _ in range(n_edits):
+        rows = rng.choice(project.n_rows, rng.integers(1, 20), replace=False)
+        column = columns[rng.integers(len(columns))]
+        # Mostly valid values, some edits that invalidate or restore a path
+        values = rng.choice([np.nan, 0.0, -1.0], len(rows)) if rng.random() < 0.2 else rng.uniform(0.1, 50, len(rows))
+        project.edit(rows, column, values)
+
+
+@pytest.mark.parametrize('kind', list(PROJECT_KINDS))
+def test_edits_equal_full_recompute(kind):
+    project = project_from_table(_path_table(kind), kind)
+    _assert_equal_totals(project)
+    _random_edits(project, np.random.default_rng(1))
+    _assert_equal_totals(project)
+
+
+@pytest.mark.parametrize('kind', list(PROJECT_KINDS))
+def test_edit_recomputes_only_changed_rows(kind):
+    project = project_from_table(_path_table(kind), kind)
+    column = project.input_columns[-1]
+    assert project.edit(5, column, project.columns[column][5])['changed_rows'] == 0
+    stats = project.edit([5, 6], column, 2.5)
+    assert stats['changed_rows'] == 2 and stats['groups'] == 1
+
+
+@pytest.mark.parametrize('kind', list(PROJECT_KINDS))
+def test_regrouping_and_path_labels(kind):
+    project = project_from_table(_path_table(kind), kind)
+    group = PROJECT_KINDS[kind]['group']
+    project.edit([0, 1, 10], group, 'moved')
+    project.edit(4, 'path', 'unknown')
+    _assert_equal_totals(project)
+    assert 'moved' in set(project.totals_table()[group])
+
+
+@pytest.mark.parametrize('kind', list(PROJECT_KINDS))
+def test_update_equals_full_recompute(kind):
+    table = _path_table(kind)
+    project = project_from_table(table, kind)
+    edited = {c: np.array(v) for c, v in table.items()}
+    column = project.input_columns[0]
+    edited[column][::7] += 1.5
+    stats = project.update(edited)
+    assert stats['changed_rows'] == len(edited[column][::7])
+    _assert_equal_totals(project)
+
+
+@pytest.mark.parametrize('kind', list(PROJECT_KINDS))
+def test_saved_project_edits_equal_full_recompute(kind, tmp_path):
+    pytest.importorskip('pyarrow')
+    path = tmp_path / f'{kind}.sonotec'
+    with open(path, 'wb') as file:
+        project_from_table(_path_table(kind), kind, name='House A').save(file)
+
+    project = load_project(str(path))
+    assert project.name == 'House A'
+    _assert_equal_totals(project)
+    # The first edit of a memory-mapped column copies it; the file is not written
+    _random_edits(project, np.random.default_rng(2))
+    _assert_equal_totals(project)
+    assert np.array_equal(load_project(path.read_bytes()).result, project_from_table(_path_table(kind), kind).result,
+                          equal_nan=True)
+
+
+def test_load_rejects_other_files():
+    pa = pytest.importorskip('pyarrow')
+    import pyarrow.ipc as ipc
+    buffer = io.BytesIO()
+    batch = pa.record_batch([pa.array([1.0])], names=['x'])
+    with ipc.new_file(buffer, batch.schema) as writer:
+        writer.write_batch(batch)
+    with pytest.raises(ValueError, match='Not a SonoTec project'):
+        load_project(buffer.getvalue())
@@ -0,0 +1,61 @@
+import os
+
+import numpy as np
+import pytest
+
+from sonotec.core import AIRBORNE_COLUMNS, INPUT_BOUNDS, calculate_separation_table
+from sonotec.report import catalog_watermark, generate_reports, report_sections
+
+pytest.importorskip('matplotlib')
+
+
+def _separation(pairs, seed=0):
+    rng = np.random.default_rng(seed)
+    n = 4 * len(pairs)
+    table = {c: rng.uniform(*INPUT_BOUNDS[c], n) for c in AIRBORNE_COLUMNS}
+    table['l_0'] = np.ones(n)
+    table['pair'] = np.repeat(pairs, 4)
+    table['path'] = np.tile(['Dd', 'Ff', 'Fd', 'Df'], len(pairs))
+    table['R_sw'], table['delta_R_Ddw'] = rng.uniform(50, 60, n), np.zeros(n)
+    return table
+
+
+# Sections come out per pair, in pair order, with the totals of the engine
+def test_sections_match_engine():
+    table = _separation(['B', 'A', 'C'])
+    order = np.random.default_rng(1).permutation(len(table['pair']))
+    table = {c: v[order] for c, v in table.items()}
+    sections = list(report_sections('airborne', table))
+    expected = calculate_separation_table(table)
+    assert [s[0] for s in sections] == ['A', 'B', 'C']
+    assert np.allclose([s[3] for s in sections], expected['R_w_apparent'])
+    assert all(sorted(s[1]['path']) == ['Dd', 'Df', 'Fd', 'Ff'] for s in sections)
+    with pytest.raises(ValueError, match='Missing column'):
+        list(report_sections('airborne', {c: v for c, v in table.items() if c != 'path'}))
+
+
+# Labels that map to the same file name, also after a suffix or in another case, still get one file each
+def test_colliding_names_get_their_own_file(tmp_path):
+    pairs = ['A 1', 'A_1', 'A_1_1', 'a_1', 'A/1']
+    outputs, stats = generate_reports('airborne', _separation(pairs), str(tmp_path / 'out'), project='Tower',
+                                      workers=1, asset_dir=str(tmp_path / 'assets'))
+    names = [os.path.basename(p) for p in outputs]
+    assert stats['reports'] == len(pairs) and len({n.lower() for n in names}) == len(pairs)
+    assert sorted(os.listdir(tmp_path / 'out')) == sorted(names)
+    assert stats['watermark'] is None
+
+
+# A second run renders no asset again; placeholder catalog values put a watermark on the report
+def test_project_report_reuses_assets(tmp_path):
+    table = {**_separation(['P1', 'P2']), 'catalog_version': np.full(8, '0.1-placeholder')}
+    assert catalog_watermark(table) is not None
+    first = generate_reports('airborne', table, str(tmp_path / 'out'), scope='project', workers=1,
+                             asset_dir=str(tmp_path / 'assets'))
+    second = generate_reports('airborne', table, str(tmp_path / 'out'), scope='project', workers=1,
+                              asset_dir=str(tmp_path / 'assets'))
+    assert first[0] == [str(tmp_path / 'out' / 'Project.pdf')] and first[1]['watermark'] == second[1]['watermark']
+    assert first[1]['assets_rendered'] > 0 and second[1]['assets_rendered'] == 0
+    with open(first[0][0], 'rb') as pdf:
+        assert pdf.read(5) == b'%PDF-'
+    with pytest.raises(ValueError, match='Unknown report scope'):
+        generate_reports('airborne', table, str(tmp_path / 'out'), scope='floor')
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from sonotec.core import FORMULAS, INPUT_BOUNDS, combine_airborne_paths, combine_impact_paths
+from sonotec.solver import required_path_values, select_cheapest_variant, solve_groups, solve_path
+
+N_GROUPS = 40
+PATHS_PER_GROUP = 4
+
+
+def _paths(formula, n, seed):
+    rng = np.random.default_rng(seed)
+    columns = FORMULAS[formula][0]
+    return {c: rng.uniform(*INPUT_BOUNDS[c], n) for c in columns}
+
+
+# Setting the solved input to its required value gives exactly the target
+@pytest.mark.parametrize('formula, solve_for, target', [('airborne', 'K_ij', 55.0), ('airborne', 'delta_R_ijw', 55.0),
+                                                        ('impact', 'K_ij', 45.0), ('impact', 'delta_R_jw', 45.0)])
+def test_path_requirement_reaches_target(formula, solve_for, target):
+    columns, engine = FORMULAS[formula]
+    table = _paths(formula, 500, 1)
+    table['l_f' if formula == 'airborne' else 'l_ij'][0] = 0.0
+    solution = solve_path(formula, table, target, solve_for)
+    assert not solution['valid'][0] and not solution['met'][0]
+
+    recomputed, valid = engine(*({**table, solve_for: solution['required']}[c] for c in columns))
+    assert np.allclose(recomputed[valid], target)
+    reached = solution['result'] >= target if formula == 'airborne' else solution['result'] <= target
+    assert np.array_equal(solution['met'], valid & reached)
+
+
+def test_unknown_solved_input():
+    with pytest.raises(ValueError, match='Can only solve airborne paths for K_ij or delta_R_ijw'):
+        solve_path('airborne', _paths('airborne', 3, 0), 50.0, 'R_iw')
+
+
+# Raising every adjustable path of a group by its increment gives exactly the target apparent value
+@pytest.mark.parametrize('formula, target', [('airborne', 56.0), ('impact', 48.0)])
+def test_group_uplift_reaches_target(formula, target):
+    rng = np.random.default_rng(2)
+    n = N_GROUPS * PATHS_PER_GROUP
+    group = np.repeat([f'G{i:02d}' for i in range(N_GROUPS)], PATHS_PER_GROUP)
+    direct = np.tile([True] + [False] * (PATHS_PER_GROUP - 1), N_GROUPS)
+    if formula == 'airborne':
+        path_result = np.where(direct, rng.uniform(55, 75, n), rng.uniform(45, 80, n))
+    else:
+        path_result = np.where(direct, rng.uniform(30, 50, n), rng.uniform(25, 60, n))
+    adjustable = ~direct
+    # One group without adjustable paths
+    adjustable[:PATHS_PER_GROUP] = False
+
+    solution = solve_groups(formula, group, path_result, adjustable, target)
+    increment = solution['increment'][solution['codes']]
+    uplifted = path_result + np.where(adjustable, increment, 0.0) * (1 if formula == 'airborne' else -1)
+    if formula == 'airborne':
+        apparent = combine_airborne_paths(group, uplifted)['R_w_apparent']
+    else:
+        apparent = combine_impact_paths(group, uplifted, direct)['Ln_w_apparent']
+
+    feasible, raised = solution['feasible'], solution['increment'] > 0
+    assert raised.any() and (~feasible).any() and solution['met'].any()
+    assert np.allclose(apparent[feasible & raised], target)
+    met = apparent >= target - 1e-9 if formula == 'airborne' else apparent <= target + 1e-9
+    assert met[feasible].all()
+    # Infeasible with adjustable paths: the direct path alone already misses the target
+    stuck = ~feasible
+    stuck[0] = False
+    direct_only = path_result[direct]
+    assert stuck.any()
+    assert np.all(direct_only[stuck] <= target if formula == 'airborne' else direct_only[stuck] >= target)
+    assert np.isnan(solution['increment'][~feasible]).all()
+
+    required, group_required = required_path_values(solution, np.full(n, 10.0), adjustable)
+    assert np.isnan(required[~adjustable]).all()
+    assert np.allclose(group_required[feasible & raised], 10.0 + solution['increment'][feasible & raised])
+
+
+def test_cheapest_variant():
+    values = np.array([8.0, 12.0, 15.0, 20.0])
+    cost = np.array([1.0, 3.0, 2.0, 5.0])
+    choice = select_cheapest_variant([5.0, 9.0, 13.0, 18.0, 25.0, np.nan], values, cost)
+    assert list(choice) == [0, 2, 2, 3, -1, -1]
+    assert list(select_cheapest_variant([1.0], [], [])) == [-1]
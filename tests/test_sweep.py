@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from sonotec.core import AIRBORNE_COLUMNS, FORMULAS, IMPACT_COLUMNS
+from sonotec.sweep import downsample, evaluate_grid, grid_slabs, sensitivity, sweep_summary, worst_case
+
+BASELINE = {
+    'airborne': {'R_iw': 50.0, 'R_jw': 45.0, 'delta_R_ijw': 3.0, 'K_ij': 12.0, 'S_s': 12.0, 'l_0': 1.0, 'l_f': 4.0},
+    'impact': {'L_neq0w': 80.0, 'delta_Lw': 20.0, 'R_iw': 50.0, 'R_jw': 45.0, 'delta_R_jw': 3.0, 'K_ij': 12.0,
+               'S_i': 12.0, 'l_0': 1.0, 'l_ij': 4.0},
+}
+
+
+def test_grid_matches_engine():
+    ranges = {'K_ij': np.linspace(0, 30, 7), 'S_s': np.linspace(1, 40, 5)}
+    grid = evaluate_grid('airborne', BASELINE['airborne'], ranges, chunk_points=10, dtype=float)
+    K, S = np.meshgrid(ranges['K_ij'], ranges['S_s'], indexing='ij')
+    inputs = {**BASELINE['airborne'], 'K_ij': K, 'S_s': S}
+    expected, _ = FORMULAS['airborne'][1](*(inputs[c] for c in AIRBORNE_COLUMNS))
+    assert np.allclose(grid, expected)
+
+
+# Every block stays within chunk_points, also when one trailing axis alone is larger, and the blocks tile the grid
+@pytest.mark.parametrize('chunk_points', [1, 7, 20, 45, 1000, 10_000])
+def test_blocks_are_bounded(chunk_points):
+    ranges = {'K_ij': np.linspace(0, 30, 2), 'S_s': np.linspace(1, 40, 50), 'l_f': np.linspace(1, 8, 20)}
+    progress = []
+    seen = np.zeros((2, 50, 20), dtype=int)
+    for index, block in grid_slabs('airborne', BASELINE['airborne'], ranges, chunk_points, on_progress=progress.append):
+        assert block.size <= chunk_points and block.shape == seen[index].shape
+        seen[index] += 1
+    assert (seen == 1).all()
+    assert progress[-1] == 1 and np.all(np.diff(progress) > 0)
+
+
+# The streamed summary equals the reduction of the whole grid
+@pytest.mark.filterwarnings('ignore:All-NaN slice')
+@pytest.mark.parametrize('formula, axes', [('airborne', AIRBORNE_COLUMNS[3:6]), ('impact', IMPACT_COLUMNS[5:8]),
+                                           ('airborne', ('K_ij',))])
+@pytest.mark.parametrize('chunk_points', [997, 100_000, 10_000_000])
+def test_summary_equals_full_grid(formula, axes, chunk_points):
+    rng = np.random.default_rng(3)
+    # l_0 and the areas cross zero, so part of the grid has no result
+    ranges = {c: np.linspace(-2, 30, int(rng.integers(150, 250))) for c in axes}
+    grid = evaluate_grid(formula, BASELINE[formula], ranges)
+    plot_axes = (0, 1) if len(axes) > 1 else (0,)
+    view, view_axes = downsample(formula, worst_case(formula, grid, plot_axes), [ranges[axes[a]] for a in plot_axes], 60)
+
+    summary = sweep_summary(formula, BASELINE[formula], ranges, max_cells=60, chunk_points=chunk_points)
+    assert np.array_equal(summary['view'], view, equal_nan=True)
+    assert all(np.array_equal(a, b) for a, b in zip(summary['view_axes'], view_axes))
+    assert summary['view'].shape == (60,) * len(plot_axes)
+    assert summary['n_points'] == grid.size
+    assert summary['min'] == pytest.approx(np.nanmin(grid)) and summary['max'] == pytest.approx(np.nanmax(grid))
+
+
+def test_sensitivity_orders_by_swing():
+    tornado = sensitivity('airborne', BASELINE['airborne'], {'delta_R_ijw': (0, 2), 'K_ij': (0, 20), 'S_s': (6, 24)})
+    assert list(tornado['input']) == ['K_ij', 'S_s', 'delta_R_ijw']
+    assert tornado['swing'][0] == pytest.approx(20)
+    assert tornado['swing'][1] == pytest.approx(10 * np.log10(4))
+
+
+def test_unknown_input():
+    with pytest.raises(ValueError, match='Unknown airborne input'):
+        sweep_summary('airborne', BASELINE['airborne'], {'L_neq0w': np.arange(3.0)})
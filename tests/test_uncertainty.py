@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from sonotec.uncertainty import HISTOGRAM_BINS, SPAN_STDS, _Histograms, monte_carlo_columns
+
+PATH = {'R_iw': 50.0, 'R_jw': 40.0, 'delta_R_ijw': 5.0, 'K_ij': 10.0, 'S_s': 10.0, 'l_0': 1.0, 'l_f': 1.0}
+INPUTS = {c: np.array([v]) for c, v in PATH.items()}
+# z-scores of the normal distribution at 5 % and 95 %
+Z_95 = 1.6448536
+
+
+def test_normal_spread_percentiles():
+    # R_ij,w is linear in K_ij, so its scatter is the K_ij scatter
+    columns = monte_carlo_columns('airborne', {'K_ij': ('normal', 1.8)}, 200_000, 1, (5, 50, 95), inputs=INPUTS)
+    assert columns['nominal'][0] == pytest.approx(70)
+    assert columns['std'][0] == pytest.approx(1.8, rel=0.02)
+    assert columns['P5'][0] == pytest.approx(70 - Z_95 * 1.8, abs=0.05)
+    assert columns['P95'][0] == pytest.approx(70 + Z_95 * 1.8, abs=0.05)
+    # The bins span SPAN_STDS pilot standard deviations either side: about 0.08 dB at 1.8 dB
+    assert columns['resolution'][0] == pytest.approx(2 * SPAN_STDS * 1.8 / HISTOGRAM_BINS, rel=0.1)
+    assert columns['clipped samples'][0] == 0
+
+
+def test_same_seed_same_result_in_any_number_of_processes():
+    spreads = {'K_ij': ('triangular', 3.0), 'R_iw': ('uniform', 2.0)}
+    one = monte_carlo_columns('airborne', spreads, 50_000, 7, (5, 95), inputs=INPUTS)
+    two = monte_carlo_columns('airborne', spreads, 50_000, 7, (5, 95), inputs=INPUTS, processes=2)
+    other = monte_carlo_columns('airborne', spreads, 50_000, 8, (5, 95), inputs=INPUTS)
+    assert all(np.array_equal(one[c], two[c]) for c in one)
+    assert one['P5'][0] != other['P5'][0]
+
+
+def test_building_groups():
+    table = {'pair': np.array(['a', 'a']), 'path': np.array(['Dd', 'Ff']), 'R_sw': np.array([52.0, np.nan]),
+             'delta_R_Ddw': np.array([0.0, np.nan]), **{c: np.array([np.nan, v]) for c, v in PATH.items()}}
+    columns = monte_carlo_columns('airborne', {'K_ij': ('normal', 2.0)}, 20_000, 0, (50,), table=table)
+    assert list(columns['pair']) == ['a']
+    assert columns['nominal'][0] == pytest.approx(-10 * np.log10(10 ** -5.2 + 10 ** -7.0))
+
+
+def test_samples_beyond_the_span_are_counted():
+    histograms = _Histograms(np.array([0.0]), np.array([1.0]))
+    histograms.add(np.array([[-5.0], [0.1], [0.2], [3.0], [np.nan]]))
+    summary = histograms.summary((50,))
+    assert list(summary['clipped']) == [2] and list(summary['invalid']) == [1] and list(summary['samples']) == [4]
+    assert summary['resolution'][0] == pytest.approx(2 / HISTOGRAM_BINS)
+    # The clipped samples still count for the ranks, in the outermost bins
+    assert histograms.counts[0, 0] == 1 and histograms.counts[0, -1] == 1
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from sonotec.core import AIRBORNE_COLUMNS, FORMULAS, IMPACT_COLUMNS
+from sonotec.validation import (
+    ERROR, WARNING, checks, combine_summaries, describe_codes, is_valid, severity_mask, summary_rows, validate_paths,
+)
+
+VALID = {
+    'airborne': {'R_iw': 50.0, 'R_jw': 45.0, 'delta_R_ijw': 3.0, 'K_ij': 12.0, 'S_s': 12.0, 'l_0': 1.0, 'l_f': 4.0},
+    'impact': {'L_neq0w': 80.0, 'delta_Lw': 20.0, 'R_iw': 50.0, 'R_jw': 45.0, 'delta_R_jw': 3.0, 'K_ij': 12.0,
+               'S_i': 12.0, 'l_0': 1.0, 'l_ij': 4.0},
+}
+
+# Row edits of the valid row and the checks they set, nothing else
+AIRBORNE_CASES = [
+    ({}, set()),
+    ({'S_s': 0.0}, {'S_s_not_positive'}),
+    ({'S_s': -3.0}, {'S_s_not_positive'}),
+    ({'l_0': 0.0}, {'l_0_zero'}),
+    ({'l_f': 0.0}, {'l_f_zero'}),
+    ({'l_0': -1.0}, {'log_argument', 'below:l_0'}),
+    ({'l_0': -1.0, 'l_f': -4.0}, {'below:l_0', 'below:l_f'}),
+    ({'K_ij': np.nan}, {'missing:K_ij'}),
+    ({'R_iw': np.inf}, {'missing:R_iw', 'above:R_iw'}),
+    ({'R_jw': 95.0}, {'above:R_jw'}),
+    ({'S_s': 0.001}, {'below:S_s', 'K_ij_below_min'}),
+    ({'K_ij': 2.0, 'S_s': 1.0}, {'K_ij_below_min'}),
+    ({'delta_R_ijw': 35.0}, {'implausible:delta_R_ijw'}),
+]
+
+
+def _table(formula, edits):
+    return {c: np.array([edit.get(c, VALID[formula][c]) for edit in edits]) for c in VALID[formula]}
+
+def _names(formula, code):
+    return {name for bit, (name, *_) in enumerate(checks(formula)) if int(code) >> bit & 1}
+
+
+def test_each_check_sets_its_bit():
+    edits = [edit for edit, _ in AIRBORNE_CASES]
+    codes, summary = validate_paths('airborne', _table('airborne', edits))
+    assert codes.dtype == np.uint64
+    for code, (edit, expected) in zip(codes, AIRBORNE_CASES):
+        assert _names('airborne', code) == expected, edit
+    assert summary['rows'] == len(edits)
+    assert summary['checks']['S_s_not_positive'] == 2 and summary['checks']['K_ij_below_min'] == 2
+    assert len(checks('airborne')) <= 64
+
+
+def test_severity_masks_split_the_bits():
+    for formula in VALID:
+        errors, warnings = severity_mask(formula, ERROR), severity_mask(formula, WARNING)
+        assert errors & warnings == 0
+        assert int(errors | warnings) == (1 << len(checks(formula))) - 1
+
+
+# A row has an error exactly where the engine gives no result
+@pytest.mark.parametrize('formula, columns', [('airborne', AIRBORNE_COLUMNS), ('impact', IMPACT_COLUMNS)])
+def test_errors_match_engine(formula, columns):
+    rng = np.random.default_rng(5)
+    n = 5000
+    table = {c: rng.uniform(-20, 100, n) for c in columns}
+    for c in columns:
+        table[c][rng.random(n) < 0.02] = rng.choice([0.0, np.nan, np.inf, -np.inf])
+    codes, summary = validate_paths(formula, table)
+    _, valid = FORMULAS[formula][1](*(table[c] for c in columns))
+    assert np.array_equal(is_valid(formula, codes), valid)
+    assert summary['errors'] == (~valid).sum()
+
+
+# Chunk summaries add up to the summary of the whole table; text cells are read as numbers or missing
+def test_chunks_and_text_columns():
+    edits = [edit for edit, _ in AIRBORNE_CASES] * 3
+    table = _table('airborne', edits)
+    _, whole = validate_paths('airborne', table)
+    parts = [validate_paths('airborne', {c: v[i:i + 10] for c, v in table.items()})[1] for i in range(0, len(edits), 10)]
+    assert combine_summaries(parts) == whole
+
+    text = {**_table('airborne', [{}, {}, {}]), 'K_ij': np.array(['12', '', 'n/a'], dtype=object)}
+    codes, _ = validate_paths('airborne', text)
+    assert [_names('airborne', c) for c in codes] == [set(), {'missing:K_ij'}, {'missing:K_ij'}]
+
+
+def test_missing_column_flags_every_row():
+    table = _table('impact', [{}, {}])
+    del table['S_i']
+    codes, summary = validate_paths('impact', table)
+    assert summary['missing_columns'] == ['S_i'] and summary['errors'] == 2
+    assert all(_names('impact', c) == {'missing:S_i'} for c in codes)
+
+
+def test_descriptions():
+    codes, summary = validate_paths('airborne', _table('airborne', [{}, {'S_s': 0.0, 'R_jw': 95.0}]))
+    assert list(describe_codes('airborne', codes)) == ['', 'S_s ≤ 0; R_jw above 80']
+    assert list(describe_codes('airborne', codes, WARNING)) == ['', 'R_jw above 80']
+    rows = summary_rows('airborne', summary)
+    assert [row['severity'] for row in rows] == [ERROR, WARNING]
+    assert rows[0] == {'check': 'S_s_not_positive', 'column': 'S_s', 'severity': ERROR, 'message': 'S_s ≤ 0', 'rows': 1}